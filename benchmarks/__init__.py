@@ -0,0 +1,7 @@
+"""
+
+    benchmarks
+    ~~~~~~~~~~
+    Benchmarks to be run from the project's root directory, e.g. 'python -m benchmarks.parse'
+
+"""
@@ -0,0 +1,118 @@
+"""
+
+    benchmarks.ingest
+    ~~~~~~~~~~~~~~~~~
+    Benchmark ingestion of a synthetic multi-GB towers data dump: streaming vs loading it whole
+
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from scraperscrape.ingest import ingest
+from scraperscrape.store import JsonStore, STORES
+
+
+def makedump(path, size, ndjson=False):
+    """Write a synthetic dump of real cities' towers data repeated under made-up city names
+
+    Arguments:
+        path {str} -- a path to write the dump to
+        size {int} -- approximate size of the dump (in bytes)
+
+    Keyword Arguments:
+        ndjson {bool} -- a flag to write newline-delimited JSON instead of a single object (default: {False})
+
+    Returns:
+        int -- number of cities written
+    """
+    sources = list(JsonStore().iter_citydata())
+    count, written = 0, 0
+    with open(path, mode="w", encoding="utf-8") as f:
+        if not ndjson:
+            written += f.write('{"data": {')
+        for i in itertools.count():
+            if written >= size:
+                break
+            data = sources[i % len(sources)]
+            city = "{} {}".format(data["towers"][0]["city"], i)
+            towers = [{**tower, "city": city} for tower in data["towers"]]
+            if ndjson:
+                written += f.write(json.dumps({city: towers}) + "\n")
+            else:
+                written += f.write("{}\n{}: {}".format("," if i else "", json.dumps(city),
+                                                       json.dumps(towers, indent=4)))
+            count += 1
+        if not ndjson:
+            f.write("}}\n")
+    return count
+
+
+def _maxrss():
+    """Get peak resident memory of this process (in MB) if it can be measured"""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def _run(mode, src, dest, store):
+    """Ingest the dump in a fresh worker process, so its peak memory can be measured in isolation"""
+    start = time.perf_counter()
+    if mode == "streaming":
+        count = ingest(src, STORES[store](dest))
+    else:  # the way 'utils.split_json' used to do it
+        with open(src, encoding="utf-8") as f:
+            data = json.load(f)
+        data = data.get("data", data)
+        jsonstore = JsonStore(dest)
+        for city, towers in data.items():
+            jsonstore.write_city(city, {"timestamp": "", "towers": towers})
+        count = len(data)
+    return count, time.perf_counter() - start, _maxrss()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=float, default=2048, help="size of the dump in MB")
+    parser.add_argument("--store", choices=list(STORES), default="json")
+    parser.add_argument("--ndjson", action="store_true", help="make a newline-delimited dump")
+    parser.add_argument("--baseline", action="store_true",
+                        help="also load the dump whole (needs memory of a few times its size)")
+    args = parser.parse_args()
+
+    tempdir = tempfile.mkdtemp()
+    try:
+        src = os.path.join(tempdir, "dump.ndjson" if args.ndjson else "dump.json")
+        cities = makedump(src, int(args.size * 1024 ** 2), args.ndjson)
+        size = os.path.getsize(src) / 1024 ** 2
+        print("Dump: {:.0f} MB, {} cities".format(size, cities))
+
+        modes = ["streaming", "whole"] if args.baseline else ["streaming"]
+        for mode in modes:
+            dest = os.path.join(tempdir, mode)
+            if args.store == "json" or mode == "whole":
+                os.makedirs(dest)
+            else:
+                dest += ".db" if args.store == "sqlite" else ".ndjson"
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                count, elapsed, maxrss = executor.submit(_run, mode, src, dest, args.store).result()
+            print("{:>10}: {} cities in {:.1f} s ({:.1f} MB/s), peak memory: {}".format(
+                mode, count, elapsed, size / elapsed,
+                "{:.0f} MB".format(maxrss) if maxrss is not None else "n/a"))
+    finally:
+        shutil.rmtree(tempdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+
+    benchmarks.parse
+    ~~~~~~~~~~~~~~~~
+    Benchmark extraction of towers data from a city page: full document tree vs streaming extractor
+
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+from bs4 import BeautifulSoup
+
+from scraperscrape.constants import OUTPUT_JSON_PATH
+from scraperscrape import standin
+from scraperscrape.scraper import Scraper, extract_hooked
+
+
+def makepage(city="New York City"):
+    """Make a skyscrapercenter-like city page with real towers data of the city provided
+
+    Keyword Arguments:
+        city {str} -- a name of the city to take towers data from (default: {"New York City"})
+
+    Returns:
+        str -- page contents
+    """
+    with open(os.path.join(OUTPUT_JSON_PATH, "{}.json".format(city.replace(" ", "_")))) as f:
+        return standin.makepage(json.load(f)["towers"])
+
+
+def extract_withsoup(contents):
+    """Extract towers data the way 'Scraper.scrape_city' used to (building a full document tree)"""
+    soup = BeautifulSoup(contents, "lxml")
+    script_tag = next(tag for tag in soup.find_all("script", type="text/javascript")
+                      if Scraper.HOOK in tag.text)
+    result = script_tag.text.strip()
+    result = "".join(result.split(Scraper.HOOK)[1:])[:-1]
+    return json.loads(result)
+
+
+def extract_streaming(contents, chunk_size=16384):
+    """Extract towers data with the streaming extractor fed with chunks as if downloaded"""
+    chunks = (contents[i:i + chunk_size] for i in range(0, len(contents), chunk_size))
+    return extract_hooked(chunks, Scraper.HOOK)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--city", default="New York City")
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+
+    contents = makepage(args.city)
+    assert extract_withsoup(contents) == extract_streaming(contents)
+    print("Page: {:.0f} KB".format(len(contents) / 1024))
+    for name, func in (("soup", extract_withsoup), ("streaming", extract_streaming),
+                       ("streaming (one chunk)", lambda c: extract_hooked([c], Scraper.HOOK))):
+        best = min(timeit.repeat(lambda: func(contents), number=args.number, repeat=3))
+        print("{:>22}: {:8.2f} ms per page".format(name, best * 1000 / args.number))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+
+    benchmarks.scrape
+    ~~~~~~~~~~~~~~~~~
+    Benchmark scraping throughput against a local stand-in for the website at various numbers of workers, latencies and error rates
+
+"""
+
+import argparse
+import time
+
+from requests.adapters import HTTPAdapter
+
+from scraperscrape.fetch import retry_policy
+from scraperscrape.scraper import Scraper
+from scraperscrape.standin import StandIn
+
+
+def run(standin, cities, workers, retries, backoff):
+    """Scrape cities from the stand-in (with caching and throttling off)
+
+    Returns:
+        tuple -- (number of cities scraped, number of towers scraped, elapsed seconds, fetcher's stats)
+    """
+    transport = HTTPAdapter(pool_connections=workers, pool_maxsize=workers,
+                            max_retries=retry_policy(retries, backoff))
+    scraper = Scraper(workers=workers, rate=None, url=standin.url, cache=False,
+                      transport=transport)
+    start = time.perf_counter()
+    scraped, towers = 0, 0
+    for _, _, result in scraper._scrape_cities(0, cities):
+        scraped += 1
+        towers += len(result)
+    return scraped, towers, time.perf_counter() - start, scraper.fetcher.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--cities", type=int, default=50, help="number of cities to scrape")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bandwidth", type=float, default=0, help="bytes per second per response")
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--backoff", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with StandIn(port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                 bandwidth=args.bandwidth, seed=0) as standin:
+        for workers in args.workers:
+            scraped, towers, elapsed, stats = run(standin, args.cities, workers, args.retries,
+                                                  args.backoff)
+            served = dict(standin.stats)
+            standin.stats.clear()
+            print("{:>3} workers: {}/{} cities ({} towers) in {:.2f} s ({:.1f} cities/s), "
+                  "{} requests served ({} failed), {} failed after retries, "
+                  "{:.1f} MB downloaded".format(
+                      workers, scraped, args.cities, towers, elapsed, scraped / elapsed,
+                      served.get("requests", 0), served.get("errors", 0), stats["errors"],
+                      stats["bytes_downloaded"] / 1024 ** 2))
+
+
+if __name__ == "__main__":
+    main()
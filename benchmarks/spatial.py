@@ -0,0 +1,134 @@
+"""
+
+    benchmarks.spatial
+    ~~~~~~~~~~~~~~~~~~
+    Benchmark spatial queries (radius, bounding box and k nearest) against brute-force scans of synthetic data scaled up from the real one
+
+"""
+
+import argparse
+import heapq
+import math
+import random
+import time
+
+from benchmarks.synthetic import scalecity
+from scraperscrape.scraper import City
+from scraperscrape.spatial import EARTH_RADIUS, SpatialIndex
+from scraperscrape.store import JsonStore
+
+
+def makecities(scale, seed=0):
+    """Make cities 'scale' times as many as the stored ones. Copies of a city get its towers shifted to a random spot nearby, so they don't pile up on the original's
+
+    Returns:
+        list -- a list of City objects
+    """
+    rng = random.Random(seed)
+    cities = []
+    for data in JsonStore().iter_citydata():
+        for copy in range(scale):
+            _, copydata = scalecity(data, copy)
+            if copy:
+                dlat, dlon = rng.uniform(-3, 3), rng.uniform(-3, 3)
+                copydata["towers"] = [
+                    {**tower, "latitude": tower["latitude"] + dlat,
+                     "longitude": (tower["longitude"] + dlon + 180) % 360 - 180}
+                    if isinstance(tower.get("latitude"), (int, float))
+                    and isinstance(tower.get("longitude"), (int, float))
+                    and (tower["latitude"], tower["longitude"]) != (0, 0) else tower
+                    for tower in copydata["towers"]]
+            cities.append(City(copydata))
+    return cities
+
+
+def _distances(index, lat, lon):
+    """Distances from a point to all points indexed (in a single scan)"""
+    phi, lam = math.radians(lat), math.radians(lon)
+    cosphi = math.cos(phi)
+    for point, (lat2, lon2) in enumerate(zip(index.lats, index.lons)):
+        phi2 = math.radians(lat2)
+        a = (math.sin((phi2 - phi) / 2) ** 2
+             + cosphi * math.cos(phi2) * math.sin((math.radians(lon2) - lam) / 2) ** 2)
+        yield 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a))), point
+
+
+def brute_radius(index, lat, lon, km, min_height=None):
+    return sorted((distance, point) for distance, point in _distances(index, lat, lon)
+                  if distance <= km and (min_height is None
+                                         or (index.tower(point).height or 0) >= min_height))
+
+
+def brute_nearest(index, lat, lon, k):
+    return heapq.nsmallest(k, _distances(index, lat, lon))
+
+
+def brute_bbox(index, south, west, north, east):
+    return [point for point, (lat, lon) in enumerate(zip(index.lats, index.lons))
+            if south <= lat <= north and west <= lon <= east]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200, help="number of indexed queries")
+    parser.add_argument("--brute", type=int, default=5,
+                        help="number of those also run by brute force (and checked)")
+    parser.add_argument("--km", type=float, default=5.0)
+    parser.add_argument("--min-height", type=float, default=200.0)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    cities, seconds = timed(makecities, args.scale)
+    print("{}x: {} cities made in {:.1f} s".format(args.scale, len(cities), seconds))
+    index, seconds = timed(SpatialIndex, cities)
+    print("Index of {} towers ({} cells) built in {:.2f} s".format(len(index), len(index.cells),
+                                                                    seconds))
+
+    rng = random.Random(1)
+    # query points close to towers, where queries find something
+    points = []
+    for _ in range(args.queries):
+        point = rng.randrange(len(index))
+        points.append((index.lats[point] + rng.uniform(-0.02, 0.02),
+                       index.lons[point] + rng.uniform(-0.02, 0.02)))
+    boxes = [(lat - 0.25, lon - 0.25, lat + 0.25, lon + 0.25) for lat, lon in points]
+
+    queries = {
+        "radius": (lambda p: index.radius(*p, args.km, args.min_height),
+                   lambda p: brute_radius(index, *p, args.km, args.min_height), points),
+        "nearest": (lambda p: index.nearest(*p, args.k),
+                    lambda p: brute_nearest(index, *p, args.k), points),
+        "bbox": (lambda b: index.bbox(*b), lambda b: brute_bbox(index, *b), boxes),
+    }
+    for name, (indexed, brute, inputs) in queries.items():
+        results, seconds = timed(lambda: [indexed(i) for i in inputs])
+        per_indexed = seconds / len(inputs)
+        checked = inputs[:args.brute]
+        expected, seconds = timed(lambda: [brute(i) for i in checked])
+        per_brute = seconds / len(checked)
+        for got, want in zip(results, expected):
+            assert len(got) == len(want), f"{name}: {len(got)} found, {len(want)} expected"
+        print("{:>8}: {:9.3f} ms per query indexed, {:9.1f} ms brute force ({:,.0f}x), "
+              "{:.1f} found on average".format(
+                  name, per_indexed * 1000, per_brute * 1000, per_brute / per_indexed,
+                  sum(map(len, results)) / len(results)))
+
+    # bulk queries pay off for points close to each other, e.g. spread over a single city
+    lat, lon = points[0]
+    dense = [(lat + rng.uniform(-0.1, 0.1), lon + rng.uniform(-0.1, 0.1)) for _ in points]
+    for name, inputs in (("spread", points), ("dense", dense)):
+        _, single = timed(lambda: [index.radius(*p, args.km) for p in inputs])
+        _, bulk = timed(index.radius_bulk, inputs, args.km)
+        print("Bulk radius ({}): {:.3f} ms per query ({:.3f} ms one by one)".format(
+            name, bulk * 1000 / len(inputs), single * 1000 / len(inputs)))
+
+
+if __name__ == "__main__":
+    main()
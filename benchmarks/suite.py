@@ -0,0 +1,233 @@
+"""
+
+    benchmarks.suite
+    ~~~~~~~~~~~~~~~~
+    Benchmark main stages of processing scraped data at synthetic scales: loading, building the world, tiering, writing reports and parsing city pages.
+
+    Each scale is run in a separate workspace directory (with its own settings, 'output' and 'cache') by a fresh process, so stages see nothing cached by previous scales and peak memory is measured in isolation. Results are written to a JSON file that can be compared with results of another commit, e.g.:
+
+        python -m benchmarks.suite --scales 1 10 --output before.json
+        python -m benchmarks.suite --scales 1 10 --output after.json --compare before.json
+
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_tree, make_pages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_CITIES = ["New York City", "Dubai", "Hong Kong", "Warsaw", "Chicago", "Shenzhen", "London",
+               "Moscow", "Toronto", "Sydney"]
+
+
+class Stages:
+    """Runs stages measuring their wall time and (optionally) peak memory allocated"""
+
+    def __init__(self, scale, memory=True):
+        """
+        Arguments:
+            scale {int} -- scale of the data
+
+        Keyword Arguments:
+            memory {bool} -- a flag to trace memory allocations (that slows everything down) (default: {True})
+        """
+        self.scale = scale
+        self.memory = memory
+        self.results = []
+
+    def run(self, stage, func, count, unit):
+        """Run a stage
+
+        Arguments:
+            stage {str} -- a name of the stage
+            func {callable} -- a no-argument callable running the stage
+            count {callable} -- a callable getting number of items processed out of func's result
+            unit {str} -- a name of the items processed
+
+        Returns:
+            object -- func's result
+        """
+        if self.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        peak = None
+        if self.memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        items = count(result)
+        self.results.append({
+            "scale": self.scale,
+            "stage": stage,
+            "seconds": round(seconds, 4),
+            "items": items,
+            "unit": unit,
+            "throughput": round(items / seconds, 1) if seconds else None,
+            "peak_mb": round(peak / 1024 ** 2, 1) if peak is not None else None
+        })
+        print("{:>4}x {:<14} {:9.3f} s {:>12,.0f} {}/s {:>10}".format(
+            self.scale, stage, seconds, items / seconds if seconds else 0, unit,
+            "{:.1f} MB".format(peak / 1024 ** 2) if peak is not None else ""),
+            file=sys.stderr, flush=True)
+        return result
+
+
+def run_stages(scale, pages, memory=True, repeat=1):
+    """Run all stages on data in the current working directory (a workspace)
+
+    Arguments:
+        scale {int} -- scale of the data
+        pages {list} -- paths of recorded city pages
+
+    Keyword Arguments:
+        memory {bool} -- a flag to trace memory allocations (default: {True})
+        repeat {int} -- number of times each page gets parsed (default: {1})
+
+    Returns:
+        list -- results of stages
+    """
+    # imported here, as constants are read relative to the working directory
+    from scraperscrape.countries import COUNTRYMAP
+    from scraperscrape.output import build_reports
+    from scraperscrape.scraper import Scraper, World, extract_hooked, get_tiers, getcities
+
+    len(COUNTRYMAP)  # compiled before, so that it's not measured as part of loading
+    stages = Stages(scale, memory)
+    towers = lambda cities: sum(len(city.table) for city in cities)
+    cities = stages.run("load (cold)", lambda: getcities(merge_subcities=False), towers, "towers")
+    stages.run("load (warm)", getcities, towers, "towers")
+    world = stages.run("world", lambda: World(getcities()), lambda w: len(w.cities), "cities")
+    stages.run("tiers", lambda: [get_tiers(city.towers) for city in cities],
+               lambda _: towers(cities), "towers")
+    stages.run("reports", build_reports,
+               lambda _: sum(len(files) for _, _, files in os.walk(os.path.join("output", "txt"))),
+               "files")
+    del world
+
+    def parse():
+        size = 0
+        for _ in range(repeat):
+            for path in pages:
+                with open(path, encoding="utf-8") as f:
+                    contents = f.read()
+                chunks = (contents[i:i + 16384] for i in range(0, len(contents), 16384))
+                extract_hooked(chunks, Scraper.HOOK)
+                size += len(contents)
+        return size
+
+    stages.run("parse", parse, lambda size: size / 1024 ** 2, "MB")
+    return stages.results
+
+
+def make_workspace(path, scale):
+    """Make a workspace with settings, input and scaled up data
+
+    Arguments:
+        path {str} -- a directory to make the workspace in
+        scale {int} -- scale of the data
+
+    Returns:
+        list -- paths of recorded city pages
+    """
+    shutil.copytree(os.path.join(ROOT, "settings"), os.path.join(path, "settings"))
+    shutil.copytree(os.path.join(ROOT, "input"), os.path.join(path, "input"))
+    with open(os.path.join(path, "settings", "settings.json"), encoding="utf-8") as f:
+        settings = json.load(f)
+    settings["storage"] = "json"
+    with open(os.path.join(path, "settings", "settings.json"), mode="w", encoding="utf-8") as f:
+        json.dump(settings, f, indent=4)
+    for dirs in ("regions", "countries", "cities"):
+        os.makedirs(os.path.join(path, "output", "txt", dirs))
+
+    make_tree(os.path.join(path, "output", "json"), scale)
+    return make_pages(os.path.join(path, "pages"), PAGE_CITIES)
+
+
+def commit():
+    """Get the current commit of the repository if it's known"""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous):
+    """Print ratios of stages' wall times to those of previous results"""
+    before = {(r["scale"], r["stage"]): r["seconds"] for r in previous["results"]}
+    print("Compared with: {}".format(previous.get("commit")))
+    for r in results:
+        old = before.get((r["scale"], r["stage"]))
+        if old:
+            print("{:>4}x {:<14} {:9.3f} s -> {:9.3f} s ({:+.0%})".format(
+                r["scale"], r["stage"], old, r["seconds"], r["seconds"] / old - 1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--output", default="benchmark.json", help="a results file to write")
+    parser.add_argument("--compare", help="a results file to compare with")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="don't trace memory (for more accurate timings)")
+    parser.add_argument("--keep", action="store_true", help="keep workspaces")
+    # internal: run stages in a workspace (the current directory) and print results
+    parser.add_argument("--stages", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--pages", nargs="*", default=[], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.stages is not None:
+        json.dump(run_stages(args.stages, args.pages, not args.no_memory, repeat=args.stages),
+                  sys.stdout)
+        return
+
+    results = []
+    for scale in args.scales:
+        workspace = tempfile.mkdtemp(prefix=f"benchmark_{scale}x_")
+        try:
+            start = time.perf_counter()
+            pages = make_workspace(workspace, scale)
+            print("{:>4}x workspace made in {:.1f} s: {}".format(
+                scale, time.perf_counter() - start, workspace), file=sys.stderr)
+            command = [sys.executable, "-m", "benchmarks.suite", "--stages", str(scale),
+                       "--pages", *pages] + (["--no-memory"] if args.no_memory else [])
+            env = {**os.environ, "PYTHONPATH": os.pathsep.join(
+                filter(None, [ROOT, os.environ.get("PYTHONPATH")]))}
+            output = subprocess.run(command, cwd=workspace, env=env, check=True,
+                                    stdout=subprocess.PIPE, text=True).stdout
+            results.extend(json.loads(output))
+        finally:
+            if not args.keep:
+                shutil.rmtree(workspace, ignore_errors=True)
+
+    report = {
+        "commit": commit(),
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "memory_traced": not args.no_memory,
+        "results": results
+    }
+    with open(args.output, mode="w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+    print(f"Results written to: {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+
+    benchmarks.synthetic
+    ~~~~~~~~~~~~~~~~~~~~
+    Generate synthetic scraped data scaled up from the real one: 'output/json' trees and city pages
+
+"""
+
+import os
+
+from benchmarks.parse import makepage
+from scraperscrape.store import JsonStore
+
+ID_OFFSET = 10 ** 7  # added to towers' ids for each copy of the data, so they stay unique
+
+
+def scalecity(data, copy):
+    """Make a copy of scraped city data posing as another city
+
+    Arguments:
+        data {dict} -- scraped city data
+        copy {int} -- number of the copy (0 for the original city)
+
+    Returns:
+        tuple -- (city name, city data)
+    """
+    name = data["towers"][0]["city"]
+    if not copy:
+        return name, data
+    name = f"{name} {copy}"
+    towers = [{**tower, "id": tower["id"] + copy * ID_OFFSET, "city": name,
+               "city_slug": "{}-{}".format(tower["city_slug"], copy)} for tower in data["towers"]]
+    return name, {"timestamp": data["timestamp"], "towers": towers}
+
+
+def make_tree(dest, scale, source=None):
+    """Write a tree of cities' JSON files 'scale' times as big as the source one (in the same schema)
+
+    Arguments:
+        dest {str} -- a directory to write to
+        scale {int} -- number of copies of each source city (the original one included)
+
+    Keyword Arguments:
+        source {scraperscrape.store.JsonStore} -- a store to take cities from (default: {None} - 'output/json')
+
+    Returns:
+        tuple -- (number of cities, number of towers) written
+    """
+    source = source or JsonStore()
+    target = JsonStore(dest)
+    os.makedirs(dest, exist_ok=True)
+    cities, towers = 0, 0
+    for data in source.iter_citydata():
+        for copy in range(scale):
+            name, copydata = scalecity(data, copy)
+            target.write_city(name, copydata)
+            cities += 1
+            towers += len(copydata["towers"])
+    return cities, towers
+
+
+def make_pages(dest, cities):
+    """Record skyscrapercenter-like result pages of cities provided
+
+    Arguments:
+        dest {str} -- a directory to write to
+        cities {list} -- names of cities (with data in 'output/json')
+
+    Returns:
+        list -- paths of pages written
+    """
+    os.makedirs(dest, exist_ok=True)
+    paths = []
+    for city in cities:
+        path = os.path.join(dest, "{}.html".format(city.replace(" ", "_")))
+        with open(path, mode="w", encoding="utf-8") as f:
+            f.write(makepage(city))
+        paths.append(path)
+    return paths
@@ -0,0 +1,60 @@
+"""
+
+    benchmarks.tiers
+    ~~~~~~~~~~~~~~~~
+    Benchmark tier classification and rating of all scraped cities: per-tower if/elif chain vs batch bisecting
+
+"""
+
+import argparse
+import timeit
+from collections import Counter
+
+from scraperscrape.constants import RATINGS_MATRIX, Tier
+from scraperscrape.scraper import getcities, rate_batch, TIERS
+
+
+def rate_withchain(towers):
+    """Classify and rate towers the way 'get_tiers' and 'calculate_rating' used to"""
+
+    def get_tier(tower):
+        heightmap = {k: v[0] for k, v in RATINGS_MATRIX.items()}
+        if tower.height >= heightmap[Tier.I] and tower.height < heightmap[Tier.II]:
+            return Tier.I
+        elif tower.height >= heightmap[Tier.II] and tower.height < heightmap[Tier.III]:
+            return Tier.II
+        elif tower.height >= heightmap[Tier.III] and tower.height < heightmap[Tier.IV]:
+            return Tier.III
+        elif tower.height >= heightmap[Tier.IV] and tower.height < heightmap[Tier.V]:
+            return Tier.IV
+        elif tower.height >= heightmap[Tier.V] and tower.height < heightmap[Tier.VI]:
+            return Tier.V
+        elif tower.height >= heightmap[Tier.VI]:
+            return Tier.VI
+        raise ValueError("Unexpected height value")
+
+    tiers = Counter(get_tier(tower) for tower in towers)
+    scoremap = {k: v[1] for k, v in RATINGS_MATRIX.items()}
+    return tiers, sum(count * scoremap[tier] for tier, count in tiers.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=10)
+    args = parser.parse_args()
+
+    cities = getcities(merge_subcities=False)
+    heightgroups = [[tower.height for tower in city.towers] for city in cities]
+    chained = [rate_withchain(city.towers) for city in cities]
+    batched = rate_batch(heightgroups)
+    assert [(Counter(dict(zip(TIERS, histogram))) + Counter(), rating)
+            for histogram, rating in batched] == chained
+    print("Cities: {}, towers: {}".format(len(cities), sum(map(len, heightgroups))))
+    for name, func in (("if/elif chain", lambda: [rate_withchain(city.towers) for city in cities]),
+                       ("batch bisect", lambda: rate_batch(heightgroups))):
+        best = min(timeit.repeat(func, number=args.number, repeat=3))
+        print("{:>14}: {:8.2f} ms for all cities".format(name, best * 1000 / args.number))
+
+
+if __name__ == "__main__":
+    main()
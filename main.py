@@ -4,15 +4,22 @@
 
 """
 
+import argparse
+import cProfile
 import os
 import json
+import pstats
 from pprint import pprint
 
+from scraperscrape.constants import METRICS_PATH
+from scraperscrape.metrics import METRICS
 from scraperscrape.scraper import getcities, Scraper
 from scraperscrape.output import (print_city, print_country, print_region, print_world,
 regions_totxt, countries_totxt, cities_totxt, world_totxt)
 from scraperscrape.utils import extract_tower_properties
 
+PROFILE_PATH = "main.prof"
+
 
 def main():
     """Run the script"""
@@ -22,5 +29,51 @@ def main():
     s.scrape_alltowers(start=500, end=505)
 
 
+def profile(path=PROFILE_PATH, top=30):
+    """Run the script under cProfile, dump its stats to a file (to be viewed with e.g. 'snakeviz') and print the top of them
+
+    Keyword Arguments:
+        path {str} -- a path to dump stats to (default: {PROFILE_PATH})
+        top {int} -- number of functions to print (default: {30})
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(main)
+    finally:
+        profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+        print(f"Profile written to: {path}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape skyscrapers data and report on it")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_PATH,
+                        help=f"record timings and counts of processing stages and dump them as JSON (to '{METRICS_PATH}' if no path is given)")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_PATH,
+                        help=f"profile the run with cProfile and dump its stats (to '{PROFILE_PATH}' if no path is given)")
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    """Run the script as switched by command-line arguments
+
+    Keyword Arguments:
+        argv {list} -- command-line arguments (default: {None} - those the script's been run with)
+    """
+    args = parse_args(argv)
+    if args.metrics:
+        METRICS.enabled = True
+    try:
+        if args.profile:
+            profile(args.profile)
+        else:
+            main()
+    finally:
+        if METRICS.enabled:
+            path = args.metrics or METRICS_PATH
+            METRICS.dump(path)
+            print(f"Metrics written to: {path}")
+
+
 if __name__ == "__main__":
-    main()
+    run()
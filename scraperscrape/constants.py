@@ -33,9 +33,71 @@ OUTPUT_TXT_PATH = os.path.join(*_settings["paths"]["output_txt"])
 OUTPUT_TXT_REGIONS_PATH = os.path.join(*_settings["paths"]["output_txt_regions"])
 OUTPUT_TXT_COUNTRIES_PATH = os.path.join(*_settings["paths"]["output_txt_countries"])
 OUTPUT_TXT_CITIES_PATH = os.path.join(*_settings["paths"]["output_txt_cities"])
+MANIFEST_PATH = os.path.join(*_settings["paths"]["manifest"])
+OUTPUT_DB_PATH = os.path.join(*_settings["paths"]["output_db"])
+OUTPUT_COMPACT_PATH = os.path.join(*_settings["paths"]["output_compact"])
+CACHE_PATH = os.path.join(*_settings["paths"]["cache"])
+HTTP_CACHE_PATH = os.path.join(*_settings["paths"]["http_cache"])
+METRICS_PATH = os.path.join(*_settings["paths"]["metrics"])
+FIXTURES_PATH = os.path.join(*_settings["paths"]["fixtures"])
+STORAGE = _settings["storage"]
+SCRAPE_WORKERS = _settings["scraping"]["workers"]
+SCRAPE_RATE = _settings["scraping"]["requests_per_second"]
+SCRAPE_BURST = _settings["scraping"]["burst"]
+SCRAPE_TTL = _settings["scraping"]["ttl_hours"]
+MANIFEST_SAVE_EVERY = _settings["scraping"]["manifest_save_every"]
+LOAD_WORKERS = _settings["loading"]["workers"]
+REPORT_WORKERS = _settings["reporting"]["workers"]
+METRICS_ENABLED = _settings["metrics"]["enabled"]
+HTTP_POOL_SIZE = _settings["http"]["pool_size"]
+HTTP_TIMEOUT = _settings["http"]["timeout"]
+HTTP_MAX_AGE = _settings["http"]["max_age"]
+HTTP_RETRIES = _settings["http"]["retries"]
+HTTP_BACKOFF = _settings["http"]["backoff"]
+HTTP_TRANSPORT = _settings["http"]["transport"]
+STANDIN_PORT = _settings["standin"]["port"]
+STANDIN_LATENCY = _settings["standin"]["latency"]
+STANDIN_JITTER = _settings["standin"]["jitter"]
+STANDIN_ERROR_RATE = _settings["standin"]["error_rate"]
+STANDIN_BANDWIDTH = _settings["standin"]["bandwidth"]
+DAEMON_PORT = _settings["daemon"]["port"]
+DAEMON_POLL = _settings["daemon"]["poll_seconds"]
+SPATIAL_CELL = _settings["spatial"]["cell_degrees"]
 # change rating matrix's keys to Tier enums
 RATINGS_MATRIX = {tier: tuple(item[1]) for tier, item
                   in zip(Tier, sorted(_settings["ratings_matrix"].items(),
                                       key=lambda pair: pair[0]))}
 STATUSMAP = _settings["status"]
 REGIONMAP = _settings["regions"]
+
+
+def _parse_metros(metros):
+    """Parse metro areas from settings into {subsidiary city: parent city}. Subsidiaries may lie in other countries or regions than their parent (a metro counts towards its parent's), but a city can't belong to more than one metro nor be both a parent and a subsidiary
+
+    Arguments:
+        metros {dict} -- {parent city: list of subsidiary cities}
+
+    Raises:
+        ValueError -- when a city is listed in more than one metro or as both a parent and a subsidiary
+
+    Returns:
+        dict -- {subsidiary city: parent city}
+    """
+    subcitymap = {}
+    for parent, subcities in metros.items():
+        for subcity in subcities:
+            if subcity == parent:
+                raise ValueError(f"Invalid metros in settings: {parent!r} is listed as a "
+                                 "subsidiary of its own metro")
+            if subcity in subcitymap:
+                raise ValueError(f"Invalid metros in settings: {subcity!r} is listed in both "
+                                 f"{subcitymap[subcity]!r} and {parent!r} metros")
+            if subcity in metros:
+                raise ValueError(f"Invalid metros in settings: {subcity!r} is the parent of its "
+                                 f"own metro, but is also listed in {parent!r} metro")
+            subcitymap[subcity] = parent
+    return subcitymap
+
+
+# metro areas: {subsidiary city: parent city}
+SUBCITYMAP = _parse_metros(_settings["metros"])
@@ -6,17 +6,41 @@
 
 """
 
-from bs4 import BeautifulSoup, NavigableString
+import os
+import threading
+import warnings
 
-from scraperscrape.utils import readinput
+from scraperscrape.constants import INPUT_PATH
+from scraperscrape.utils import readinput, file_digest, load_cache, dump_cache, LazyMapping
 
 WIKIPEDIA_CA_COUNTRIES = ["Belize", "Costa Rica", "El Salvador",
                           "Guatemala", "Honduras", "Nicaragua", "Panama"]
+# corrections of country names derived from TSC's slugs
+COUNTRY_FIXES = {
+    "Lao Peoples Democratic Republic": "Laos"
+}
+# corrections of general region designation derived from country for listed cities
+CITY_REGION_MAP = {
+    "Yekaterinburg": "AS",
+    "Chelyabinsk": "AS",
+    "Surgut": "AS",
+    "Vladivostok": "AS",
+    "Tyumen": "AS",
+    "Novosibirsk": "AS",
+    "Krasnoyarsk": "AS",
+    "Istanbul": "EU"
+}
+# saved Wikipedia pages COUNTRYMAP is compiled from
+SOURCES = ["europe.html", "asia.html", "africa.html", "north_america.html", "south_america.html",
+           "caribbean.html", "oceania.html", "middle_east.html"]
 
 
 def _scrape_countries(filename):
     """Scrape country names from locally saved Wikipedia pages.
     """
+    # imported here, as parsing is needed only when the cached map is stale
+    from bs4 import BeautifulSoup, NavigableString
+
     def filter_search(tag):
         children = tag.children
         return (tag.name == "td" and tag.has_attr("align") and tag.find("a") and tag.find("span")
@@ -122,4 +146,120 @@ def get_countries_by_region():
     }
 
 
-COUNTRYMAP = get_countries_by_region()
+def build_countrymap(force=False):
+    """Build countries-by-region map or load it from cache if none of its sources has changed
+
+    Keyword Arguments:
+        force {bool} -- a flag to rebuild the map even if the cached one is valid (default: {False})
+
+    Returns:
+        dict -- {region code: list of country names}
+    """
+    digest = file_digest(*[os.path.join(INPUT_PATH, filename) for filename in SOURCES])
+    countrymap = None if force else load_cache("countrymap", digest)
+    if countrymap is None:
+        countrymap = get_countries_by_region()
+        dump_cache("countrymap", digest, countrymap)
+    return countrymap
+
+
+class RegionIndex:
+    """Lookup of region codes by country name or TSC's country slug, built once from a countries-by-region map.
+
+    Countries listed in more than one region belong to the first one listing them. Slugs and names that can't be mapped are recorded in 'unmapped' (and warned about once)
+    """
+
+    def __init__(self, countrymap, city_regions=CITY_REGION_MAP):
+        """
+        Arguments:
+            countrymap {Mapping} -- {region code: list of country names} (it's read on first lookup)
+
+        Keyword Arguments:
+            city_regions {dict} -- {city name: region code} overriding regions derived from country (default: {CITY_REGION_MAP})
+        """
+        self.countrymap = countrymap
+        self.city_regions = city_regions
+        self.unmapped = {}  # {country slug or name: set of city names}
+        self._countries = None  # {casefolded country name: region code}
+        self._slugs = {}  # {country slug: (country name, region code)}
+        self._lock = threading.Lock()
+
+    def _getcountries(self):
+        if self._countries is None:
+            countries = {}
+            for region_code, names in self.countrymap.items():
+                for name in names:
+                    countries.setdefault(name.casefold(), region_code)
+            self._countries = countries
+        return self._countries
+
+    @staticmethod
+    def parsecountry(country_slug):
+        """Parse country name from its slug
+
+        Arguments:
+            country_slug {str} -- country slug as scraped
+
+        Returns:
+            str -- country name
+        """
+        country = country_slug.title().replace("-", " ")
+        return COUNTRY_FIXES.get(country, country)
+
+    def _record(self, key, city):
+        with self._lock:
+            isnew = key not in self.unmapped
+            self.unmapped.setdefault(key, set()).add(city)
+        if isnew:
+            warnings.warn(f"No region found for country: {key!r} (city: {city!r})", stacklevel=3)
+
+    def lookup(self, country, city=None):
+        """Look up region code of country
+
+        Arguments:
+            country {str} -- a country name
+
+        Keyword Arguments:
+            city {str} -- a name of the city to look up the region for (if there's an override for it) (default: {None})
+
+        Returns:
+            str / None -- region code or 'None' if the country is unmapped
+        """
+        region_code = self._getcountries().get(country.casefold())
+        if region_code is None:
+            self._record(country, city)
+            return None
+        return self.city_regions.get(city, region_code)
+
+    def lookup_slug(self, country_slug, city=None):
+        """Look up country name and region code of country slug
+
+        Arguments:
+            country_slug {str} -- country slug as scraped
+
+        Keyword Arguments:
+            city {str} -- a name of the city to look up the region for (if there's an override for it) (default: {None})
+
+        Returns:
+            tuple -- (country name, region code or 'None' if the country is unmapped)
+        """
+        # TODO: adjust region of cities that are located in countries spanning more than one
+        # region (cases like Vladivostok being considered as an European city)
+        entry = self._slugs.get(country_slug)
+        if entry is None:
+            country = self.parsecountry(country_slug)
+            entry = self._slugs[country_slug] = country, self._getcountries().get(country.casefold())
+        country, region_code = entry
+        if region_code is None:
+            self._record(country_slug, city)
+            return country, None
+        return country, self.city_regions.get(city, region_code)
+
+
+# loaded on first access (not at import time)
+COUNTRYMAP = LazyMapping(build_countrymap)
+REGION_INDEX = RegionIndex(COUNTRYMAP)
+
+
+if __name__ == "__main__":
+    build_countrymap(force=True)
@@ -0,0 +1,244 @@
+"""
+
+    scraperscrape.daemon
+    ~~~~~~~~~~~~~~~~~~
+    Keep the world built out of scraped data in memory and answer queries about it over local HTTP
+
+"""
+
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+from urllib.request import urlopen
+
+from scraperscrape.constants import DAEMON_PORT, DAEMON_POLL
+from scraperscrape.metrics import METRICS
+from scraperscrape.output import (getcountries, render_city, render_country, render_region,
+                                  render_world)
+from scraperscrape.scraper import World, getcities
+from scraperscrape.store import JsonStore, getstore
+from scraperscrape.utils import timestamp
+
+KINDS = ("world", "regions", "countries", "cities")
+SINGULARS = {"world": "world", "regions": "region", "countries": "country", "cities": "city"}
+
+
+def dataversion(store):
+    """Get a version of the store's data that changes whenever the data does
+
+    Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store (see 'scraperscrape.store')
+
+    Returns:
+        object -- the version (comparable for equality)
+    """
+    if isinstance(store, JsonStore):
+        return store.scan()
+    return store.version()
+
+
+class Model:
+    """Answers to all queries about one version of scraped data, rendered up front (as 'print_*' functions would print them)"""
+
+    def __init__(self, store, version):
+        """
+        Arguments:
+            store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store')
+            version {object} -- the version of the store's data (see 'dataversion')
+        """
+        self.version = version
+        self.digest = hashlib.sha1(repr(version).encode("utf-8")).hexdigest()[:12]
+        self.built = timestamp()
+        cities = getcities(store=store)
+        world = World(cities)
+        objects = {
+            "world": [("world", render_world, world)],
+            "regions": [(region.name, render_region, region) for region in world.regions],
+            "countries": [(name, render_country, country)
+                          for name, country in getcountries(world).items()],
+            # as printed by 'print_city', subsidiary cities aren't merged
+            "cities": [(city.name, render_city, city)
+                       for city in getcities(merge_subcities=False, store=store)],
+        }
+        self.pages = {}
+        self.names = {}
+        for kind, entries in objects.items():
+            self.names[kind] = sorted(name for name, _, _ in entries)
+            for name, render, obj in entries:
+                for verbose in (False, True):
+                    self.pages[kind, name.casefold(), verbose] = render(obj, verbose).encode("utf-8")
+
+    def get(self, kind, name="world", verbose=False):
+        """Get a rendered answer
+
+        Arguments:
+            kind {str} -- 'world', 'regions', 'countries' or 'cities'
+
+        Keyword Arguments:
+            name {str} -- a name of the region, country or city (case-insensitive) (default: {"world"})
+            verbose {bool} -- a flag to get the verbose answer (default: {False})
+
+        Returns:
+            bytes / None -- UTF-8 encoded text or 'None' if there's no such region, country or city
+        """
+        return self.pages.get((kind, name.casefold(), verbose))
+
+
+class _DaemonHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body get written separately
+
+    def do_GET(self):
+        start = time.perf_counter()
+        self.server.answer(self)
+        METRICS.addtime("daemon.request", time.perf_counter() - start)
+
+    def log_message(self, format, *args):
+        pass  # requests aren't logged
+
+
+class Daemon(ThreadingHTTPServer):
+    """Resident service answering queries about cities, countries, regions and the world with text rendered up front. Served paths:
+
+        /world, /regions/<name>, /countries/<name>, /cities/<name> -- text as printed by 'print_*' functions ('?verbose=1' for the verbose one)
+        /regions, /countries, /cities -- JSON lists of names
+        /status -- JSON with the version of data served
+
+    The store is polled for changes and a new model is built in the background when its data changes. The model served gets swapped in one step, so queries never see a half-built one
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=DAEMON_PORT, store=None, poll=DAEMON_POLL, host="127.0.0.1"):
+        """
+        Keyword Arguments:
+            port {int} -- a port to listen on, '0' for any free one (default: {DAEMON_PORT})
+            store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+            poll {float} -- interval of checking the store for changes (in seconds), falsy for no checks (default: {DAEMON_POLL})
+            host {str} -- a host to listen on (default: {"127.0.0.1"})
+        """
+        self.store = store or getstore()
+        self.poll = poll
+        self.model = self._build(dataversion(self.store))
+        self._stopped = threading.Event()
+        self._watcher = None
+        super().__init__((host, port), _DaemonHandler)
+
+    def _build(self, version):
+        with METRICS.timer("daemon.build"):
+            return Model(self.store, version)
+
+    def refresh(self):
+        """Rebuild the model if the store's data has changed since it was built
+
+        Returns:
+            bool -- 'True' if the model has been swapped
+        """
+        version = dataversion(self.store)
+        if version == self.model.version:
+            return False
+        self.model = self._build(version)  # a single reference swap
+        return True
+
+    def _watch(self):
+        while not self._stopped.wait(self.poll):
+            try:
+                self.refresh()
+            except Exception as err:  # data caught mid-write is retried on the next check
+                print(f"Failed to refresh the model: {err!r}")
+
+    def answer(self, handler):
+        """Answer a GET request (in a handler's thread)
+
+        Arguments:
+            handler {http.server.BaseHTTPRequestHandler} -- a handler of the request
+        """
+        model = self.model  # the same model throughout, even if swapped meanwhile
+        parts = urlsplit(handler.path)
+        segments = [unquote(segment) for segment in parts.path.strip("/").split("/", 1)]
+        verbose = parse_qs(parts.query).get("verbose", ["0"])[0] not in ("0", "", "false")
+        kind = segments[0]
+
+        if kind == "status":
+            body = json.dumps({"version": model.digest, "built": model.built,
+                               **{k: len(model.names[k]) for k in KINDS[1:]}})
+            self._respond(handler, 200, body.encode("utf-8"), "application/json")
+        elif kind in KINDS[1:] and len(segments) == 1:
+            self._respond(handler, 200, json.dumps(model.names[kind]).encode("utf-8"),
+                          "application/json")
+        elif kind in KINDS:
+            name = segments[1] if len(segments) > 1 else "world"
+            page = model.get(kind, name, verbose)
+            if page is None:
+                self._respond(handler, 404, f"No such {SINGULARS[kind]}: {name}\n".encode("utf-8"))
+            else:
+                self._respond(handler, 200, page)
+        else:
+            self._respond(handler, 404, f"Unknown query: {parts.path}\n".encode("utf-8"))
+
+    @staticmethod
+    def _respond(handler, status, body, contenttype="text/plain"):
+        handler.send_response(status)
+        handler.send_header("Content-Type", f"{contenttype}; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def serve_forever(self, poll_interval=0.5):
+        if self.poll and self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, daemon=True)
+            self._watcher.start()
+        try:
+            super().serve_forever(poll_interval)
+        finally:
+            self._stopped.set()
+
+
+def query(kind, name=None, verbose=False, port=DAEMON_PORT, host="127.0.0.1"):
+    """Query a running daemon
+
+    Arguments:
+        kind {str} -- 'world', 'regions', 'countries', 'cities' or 'status'
+
+    Keyword Arguments:
+        name {str} -- a name of the region, country or city (default: {None})
+        verbose {bool} -- a flag to get the verbose answer (default: {False})
+        port {int} -- the daemon's port (default: {DAEMON_PORT})
+        host {str} -- the daemon's host (default: {"127.0.0.1"})
+
+    Raises:
+        urllib.error.HTTPError -- when there's no such region, country or city
+
+    Returns:
+        str -- the answer
+    """
+    path = f"/{kind}" + (f"/{quote(name)}" if name else "") + ("?verbose=1" if verbose else "")
+    with urlopen(f"http://{host}:{port}{path}") as response:
+        return response.read().decode("utf-8")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Serve queries about scraped data (or query a running daemon if a query is given)")
+    parser.add_argument("kind", nargs="?", choices=KINDS + ("status",))
+    parser.add_argument("name", nargs="?")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    parser.add_argument("--port", type=int, default=DAEMON_PORT)
+    args = parser.parse_args()
+
+    if args.kind:
+        print(query(args.kind, args.name, args.verbose, args.port), end="")
+    else:
+        daemon = Daemon(args.port)
+        print("Serving at: http://{}:{}".format(*daemon.server_address[:2]))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            daemon.server_close()
@@ -21,3 +21,7 @@ class InvalidCountryError(ValueError):
 
 class InvalidRegionError(ValueError):
     """Raised when the an invalid region name was provided as input"""
+
+
+class InvalidStatusError(ValueError):
+    """Raised when the an invalid tower status was provided as input"""
@@ -0,0 +1,297 @@
+"""
+
+    scraperscrape.fetch
+    ~~~~~~~~~~~~~~~~
+    Fetch pages over a pooled HTTP session backed by an on-disk response cache
+
+"""
+
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from scraperscrape.constants import (HTTP_CACHE_PATH, HTTP_POOL_SIZE, HTTP_TIMEOUT, HTTP_MAX_AGE,
+                                     HTTP_RETRIES, HTTP_BACKOFF)
+from scraperscrape.metrics import METRICS
+
+
+class ResponseCache:
+    """Content-addressed on-disk cache of HTTP responses keyed by URL"""
+
+    def __init__(self, path=HTTP_CACHE_PATH):
+        """
+        Keyword Arguments:
+            path {str} -- a directory to keep cached responses in (default: {HTTP_CACHE_PATH})
+        """
+        self.path = path
+
+    def _getpaths(self, url):
+        """Get paths of cached body and metadata files for URL
+
+        Arguments:
+            url {str} -- a requested URL
+
+        Returns:
+            tuple -- (body path, metadata path)
+        """
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.path, key[:2], key)
+        return f"{base}.body", f"{base}.json"
+
+    def get(self, url):
+        """Get cached response for URL
+
+        Arguments:
+            url {str} -- a requested URL
+
+        Returns:
+            tuple / None -- (metadata dict, body bytes) or 'None' if nothing is cached
+        """
+        bodypath, metapath = self._getpaths(url)
+        try:
+            with open(metapath, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(bodypath, mode="rb") as f:
+                body = f.read()
+        except (IOError, ValueError):
+            return None
+        return meta, body
+
+    def put(self, url, meta, body):
+        """Cache response for URL
+
+        Arguments:
+            url {str} -- a requested URL
+            meta {dict} -- response metadata ('etag', 'last_modified', 'encoding', 'stored')
+            body {bytes} -- response body
+        """
+        bodypath, metapath = self._getpaths(url)
+        os.makedirs(os.path.dirname(bodypath), exist_ok=True)
+        # body goes first, so metadata never points at a missing or partial one
+        for path, mode, contents in ((bodypath, "wb", body),
+                                     (metapath, "w", json.dumps({"url": url, **meta}))):
+            temppath = f"{path}.{threading.get_ident()}.tmp"
+            with open(temppath, mode=mode) as f:
+                f.write(contents)
+            os.replace(temppath, path)
+
+    def touch(self, url, meta):
+        """Update metadata of a cached response after its successful revalidation
+
+        Arguments:
+            url {str} -- a requested URL
+            meta {dict} -- updated response metadata
+        """
+        _, metapath = self._getpaths(url)
+        temppath = f"{metapath}.{threading.get_ident()}.tmp"
+        with open(temppath, mode="w") as f:
+            json.dump({"url": url, **meta}, f)
+        os.replace(temppath, metapath)
+
+
+# statuses of responses worth retrying (as the failure is likely to be temporary)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+
+def retry_policy(retries=HTTP_RETRIES, backoff=HTTP_BACKOFF):
+    """Get a policy of retrying failed requests for HTTP adapters
+
+    Keyword Arguments:
+        retries {int} -- maximum number of retries of a request (default: {HTTP_RETRIES})
+        backoff {float} -- a factor of exponentially growing pauses between retries (in seconds) (default: {HTTP_BACKOFF})
+
+    Returns:
+        urllib3.util.retry.Retry -- the policy
+    """
+    # the last failed response is returned (instead of raising), so it's counted as an error
+    return Retry(total=retries, backoff_factor=backoff, status_forcelist=RETRY_STATUSES,
+                 raise_on_status=False)
+
+
+def wirebytes(response, default):
+    """Get number of body bytes of a response read so far as they were sent over the wire (i.e. before decoding gzip)
+
+    Arguments:
+        response {requests.Response} -- a response
+        default {int} -- a number to fall back to when the raw body can't tell (e.g. the number of decoded bytes)
+
+    Returns:
+        int -- number of bytes
+    """
+    try:
+        return response.raw.tell()  # urllib3 counts bytes read off the socket
+    except (AttributeError, ValueError, OSError):
+        length = response.headers.get("Content-Length", "")
+        return int(length) if length.isdigit() else default
+
+
+class Fetcher:
+    """Fetches pages over a shared keep-alive session, revalidating cached responses with ETag/Last-Modified"""
+
+    def __init__(self, cache=True, ratelimiter=None, pool_size=HTTP_POOL_SIZE, timeout=HTTP_TIMEOUT,
+                 max_age=HTTP_MAX_AGE, transport=None):
+        """
+        Keyword Arguments:
+            cache {bool / scraperscrape.fetch.ResponseCache} -- a response cache, 'True' for the default one or falsy for no caching (default: {True})
+            ratelimiter {scraperscrape.throttle.RateLimiter} -- a limiter to wait on before each request actually sent (default: {None})
+            pool_size {int} -- maximum number of connections kept alive per host (default: {HTTP_POOL_SIZE})
+            timeout {float} -- timeout for a single request in seconds (default: {HTTP_TIMEOUT})
+            max_age {float} -- age in seconds below which cached responses are served without revalidation (default: {HTTP_MAX_AGE})
+            transport {requests.adapters.BaseAdapter} -- an adapter to send requests with, e.g. a replaying one (see 'scraperscrape.replay') (default: {None} - a pooled HTTP adapter retrying as set in settings)
+        """
+        self.cache = ResponseCache() if cache is True else cache or None
+        self.ratelimiter = ratelimiter
+        self.timeout = timeout
+        self.max_age = max_age
+        self.session = requests.Session()
+        adapter = transport or HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                                           max_retries=retry_policy())
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self._stats = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        """Counters of requests made so far:
+
+            requests -- requests actually sent
+            hits -- responses served from cache (either fresh or revalidated)
+            revalidated -- cached responses confirmed with '304 Not Modified'
+            misses -- responses downloaded in full
+            bytes_downloaded -- body bytes received over the wire (still gzipped, if they were sent so)
+            bytes_decoded -- body bytes received as decoded from gzip
+            bytes_saved -- body bytes that would've been received over the wire if responses served from cache were downloaded instead
+            errors -- responses with an error status (after retries)
+
+        Returns:
+            dict -- counter name: value
+        """
+        with self._lock:
+            return {key: self._stats[key] for key in ("requests", "hits", "revalidated", "misses",
+                                                      "bytes_downloaded", "bytes_decoded",
+                                                      "bytes_saved", "errors")}
+
+    def _count(self, **counts):
+        with self._lock:
+            self._stats.update(counts)
+        for key, value in counts.items():
+            METRICS.count("fetch." + key, value)
+
+    def _request(self, url, headers=None, stream=False):
+        if self.ratelimiter:
+            with METRICS.timer("fetch.throttle"):
+                self.ratelimiter.wait(url)
+        self._count(requests=1)
+        # latency up to response headers (streamed bodies are timed by their consumers)
+        with METRICS.timer("fetch.latency"):
+            response = self.session.get(url, headers=headers, timeout=self.timeout, stream=stream)
+        if response.status_code >= 400:
+            self._count(errors=1)
+            response.close()
+            response.raise_for_status()
+        return response
+
+    def get(self, url):
+        """Get page contents
+
+        Arguments:
+            url {str} -- a URL to fetch
+
+        Raises:
+            requests.HTTPError -- when the response has an error status
+
+        Returns:
+            str -- page contents
+        """
+        cached = self.cache.get(url) if self.cache else None
+        if cached is None:
+            response = self._request(url)
+            self._countbody(response)
+            self._store(url, response)
+            return response.text
+
+        meta, body = cached
+        # cached before wire sizes were kept, a cached body is counted as it's stored
+        saved = meta.get("wire_size", len(body))
+        if self.max_age and time.time() - meta.get("stored", 0) < self.max_age:
+            self._count(hits=1, bytes_saved=saved)
+            return body.decode(meta["encoding"], errors="replace")
+
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        response = self._request(url, headers=headers)
+        if response.status_code == 304:
+            self._count(hits=1, revalidated=1, bytes_saved=saved)
+            self.cache.touch(url, {**meta, "stored": time.time()})
+            return body.decode(meta["encoding"], errors="replace")
+
+        self._countbody(response)
+        self._store(url, response)
+        return response.text
+
+    def _countbody(self, response):
+        """Count a response downloaded in full (reading its body)"""
+        decoded = len(response.content)
+        self._count(misses=1, bytes_downloaded=wirebytes(response, decoded),
+                    bytes_decoded=decoded)
+
+    def iter_text(self, url, chunk_size=16384):
+        """Iterate over page contents while it's being downloaded. Closing the iterator early drops the rest of the download.
+
+        With caching on, the page is fetched in full (as only full bodies can be cached) and yielded in one piece
+
+        Arguments:
+            url {str} -- a URL to fetch
+
+        Keyword Arguments:
+            chunk_size {int} -- number of bytes read at once (default: {16384})
+
+        Raises:
+            requests.HTTPError -- when the response has an error status
+
+        Yields:
+            str -- consecutive chunks of page contents
+        """
+        if self.cache:
+            yield self.get(url)
+            return
+
+        response = self._request(url, stream=True)
+        self._count(misses=1)
+        decoded = 0
+        try:
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            for chunk in response.iter_content(chunk_size):
+                decoded += len(chunk)
+                yield decoder.decode(chunk)
+            yield decoder.decode(b"", final=True)
+        finally:
+            # counted once read (or dropped), as wire bytes are only known for the body read so far
+            self._count(bytes_downloaded=wirebytes(response, decoded), bytes_decoded=decoded)
+            response.close()
+
+    def _store(self, url, response):
+        """Cache a successful response if caching is on"""
+        if not self.cache or response.status_code != 200:
+            return
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "encoding": response.encoding or response.apparent_encoding or "utf-8",
+            "wire_size": wirebytes(response, len(response.content)),
+            "stored": time.time()
+        }
+        self.cache.put(url, meta, response.content)
@@ -0,0 +1,252 @@
+"""
+
+    scraperscrape.ingest
+    ~~~~~~~~~~~~~~~~~~
+    Ingest large towers data dumps city by city, without loading them whole
+
+"""
+
+import json
+
+from scraperscrape.store import getstore
+from scraperscrape.utils import timestamp
+
+CHUNK_SIZE = 1 << 20  # number of characters read at once
+WHITESPACE = " \t\n\r"
+NUMBER_CHARS = "0123456789+-.eE"
+# number of characters a value may span beyond the largest value decoded so far before the dump's
+# deemed malformed (rather than reading the rest of it into memory)
+MAX_READAHEAD = 16 * CHUNK_SIZE
+
+
+class DumpReader:
+    """Incremental reader of a JSON dump shaped like: {city: [towers data], ...}, optionally wrapped in: {"data": {...}}.
+
+    Only a single top-level value is kept in memory at a time (plus a read-ahead buffer), so memory is bounded by the largest city, not by the whole dump
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE, max_readahead=MAX_READAHEAD):
+        """
+        Arguments:
+            f {file} -- the dump opened in text mode
+
+        Keyword Arguments:
+            chunk_size {int} -- number of characters read at once (default: {CHUNK_SIZE})
+            max_readahead {int} -- number of characters a value may span beyond the largest value decoded so far (default: {MAX_READAHEAD})
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.max_readahead = max_readahead
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0  # number of characters dropped from the buffer
+        self.largest = 0  # number of characters of the largest value decoded so far
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size):
+        """Read until at least 'size' characters are buffered past the current position (or the dump ends)
+
+        Returns:
+            bool -- 'False' if nothing more could be read
+        """
+        if self.pos:  # drop what's been consumed already
+            self.offset += self.pos
+            self.buffer, self.pos = self.buffer[self.pos:], 0
+        parts = [self.buffer]
+        buffered = len(self.buffer)
+        while buffered < size and not self.eof:
+            chunk = self.f.read(max(self.chunk_size, size - buffered))
+            if not chunk:
+                self.eof = True
+            parts.append(chunk)
+            buffered += len(chunk)
+        grown = buffered > len(self.buffer)
+        self.buffer = "".join(parts)
+        return grown
+
+    def _peek(self):
+        """Skip whitespace and get the next character ('' at the end of the dump)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill(1):
+                return self.buffer[self.pos:self.pos + 1]
+
+    def _expect(self, *chars):
+        char = self._peek()
+        if char not in chars or not char:
+            raise ValueError("Malformed dump: expected one of {} but got {!r}".format(chars, char))
+        self.pos += 1
+        return char
+
+    def _decode(self):
+        """Decode the next JSON value, reading more of the dump as needed.
+
+        Decoding is retried each time the buffer doubles, so a value is decoded in amortized linear time however many chunks it spans. The buffer stops growing once it spans 'max_readahead' characters beyond the largest value decoded so far, so a malformed value doesn't get the rest of the dump read into memory
+
+        Returns:
+            dict / list / str / int / float / bool / None -- the value
+
+        Raises:
+            ValueError -- if there's no valid value at the current position
+        """
+        self._peek()
+        while True:
+            pending = len(self.buffer) - self.pos
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._overgrown(pending) or not self._fill(2 * pending):
+                    raise ValueError("Malformed dump: no valid value at offset {} ({})".format(
+                        self.offset + self.pos, e.msg)) from e
+                continue
+            # a number at the end of the buffer or followed by what may be its own part (e.g. '12' of
+            # '12.5e3') may continue in the next chunk
+            if (not self.eof and not isinstance(value, (dict, list, str))
+                    and (end == len(self.buffer) or self.buffer[end] in NUMBER_CHARS)):
+                if self._overgrown(pending):
+                    raise ValueError("Malformed dump: no valid value at offset {}".format(
+                        self.offset + self.pos))
+                self._fill(pending + self.chunk_size)
+                continue
+            self.largest = max(self.largest, end - self.pos)
+            self.pos = end
+            return value
+
+    def _overgrown(self, pending):
+        """Check if the buffer's grown too large to still be expected to hold a single value"""
+        return pending >= self.largest + self.max_readahead
+
+    def _iter_members(self):
+        """Iterate over members of the object that starts at the current position
+
+        Yields:
+            str -- a member's key, with the reader positioned at the member's value
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._decode()
+            self._expect(":")
+            yield key
+            if self._expect(",", "}") == "}":
+                return
+
+    def iter_cities(self):
+        """Iterate over cities in the dump. Members of a wrapped dump other than "data" are skipped.
+
+        Lists that come before "data" are held back until it's clear whether the dump is wrapped, which is once "data" comes up or they take more than 'max_readahead' characters (which only cities would)
+
+        Yields:
+            tuple -- (city name, list of towers data)
+
+        Raises:
+            ValueError -- if the dump is malformed or if "data" comes after cities
+        """
+        wrapped = None  # not known until "data" or enough cities come up
+        pending, pending_size = [], 0
+        for key in self._iter_members():
+            if key == "data" and self._peek() == "{":
+                if wrapped is False:
+                    raise ValueError("Malformed dump: \"data\" at offset {} comes after cities".format(
+                        self.offset + self.pos))
+                wrapped = True
+                pending.clear()
+                for city in self._iter_members():
+                    yield city, self._decode()
+                continue
+            start = self.offset + self.pos
+            value = self._decode()
+            if wrapped or not isinstance(value, list):
+                continue
+            pending.append((key, value))
+            pending_size += self.offset + self.pos - start
+            if wrapped is None and pending_size <= self.max_readahead:
+                continue
+            wrapped = False
+            yield from pending
+            pending.clear()
+        yield from pending  # there's been no "data"
+
+
+def iter_ndjson(f):
+    """Iterate over cities in a newline-delimited JSON dump. Each line is either a city's data (as stored: {"timestamp": ..., "towers": [...]}) or an object of: {city: [towers data]}
+
+    Arguments:
+        f {file} -- the dump opened in text mode
+
+    Yields:
+        tuple -- (city name, list of towers data)
+    """
+    for line in f:
+        if not line.strip():
+            continue
+        obj = json.loads(line)
+        if isinstance(obj.get("towers"), list):
+            if obj["towers"]:
+                yield obj["towers"][0]["city"], obj["towers"]
+        else:
+            yield from ((city, towers) for city, towers in obj.items() if isinstance(towers, list))
+
+
+def iter_dump(src, ndjson=None, chunk_size=CHUNK_SIZE):
+    """Iterate over cities in a towers data dump
+
+    Arguments:
+        src {str} -- a path of the dump
+
+    Keyword Arguments:
+        ndjson {bool} -- a flag to read the dump as newline-delimited JSON (default: {None} - guessed from the file extension)
+        chunk_size {int} -- number of characters read at once (default: {CHUNK_SIZE})
+
+    Yields:
+        tuple -- (city name, list of towers data)
+    """
+    if ndjson is None:
+        ndjson = src.endswith((".ndjson", ".jsonl"))
+    with open(src, encoding="utf-8") as f:
+        if ndjson:
+            yield from iter_ndjson(f)
+        else:
+            yield from DumpReader(f, chunk_size).iter_cities()
+
+
+def ingest(src, store=None, ndjson=None, chunk_size=CHUNK_SIZE):
+    """Ingest a towers data dump into a store, one city at a time
+
+    Arguments:
+        src {str} -- a path of the dump
+
+    Keyword Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to write to (see 'scraperscrape.store') (default: {None} - as set in settings)
+        ndjson {bool} -- a flag to read the dump as newline-delimited JSON (default: {None} - guessed from the file extension)
+        chunk_size {int} -- number of characters read at once (default: {CHUNK_SIZE})
+
+    Returns:
+        int -- number of cities ingested
+    """
+    store = store or getstore()
+    count = 0
+
+    def citydata():
+        nonlocal count
+        for city, towers in iter_dump(src, ndjson, chunk_size):
+            count += 1
+            yield city, {"timestamp": timestamp(), "towers": towers}
+
+    if hasattr(store, "write_city"):
+        for city, data in citydata():
+            store.write_city(city, data)
+    else:
+        # snapshot stores take all cities at once, but consume them lazily
+        store.write_snapshot(citydata())
+    return count
+
+
+if __name__ == "__main__":
+    import sys
+    # ingest a dump into the store set in settings, e.g. 'python -m scraperscrape.ingest dump.json'
+    print("Ingested {} cities".format(ingest(sys.argv[1])))
@@ -0,0 +1,114 @@
+"""
+
+    scraperscrape.manifest
+    ~~~~~~~~~~~~~~~~~~~
+    Keep track of when each city was last scraped and what was scraped
+
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from scraperscrape.constants import MANIFEST_PATH, MANIFEST_SAVE_EVERY
+
+
+def storekey(store):
+    """Get a key of the store that tells it apart from other stores
+
+    Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store (see 'scraperscrape.store')
+
+    Returns:
+        str -- the key
+    """
+    return "{}:{}".format(type(store).__name__, os.path.abspath(store.path))
+
+
+class Manifest:
+    """Records when each city was last scraped successfully into a store along with a hash of its towers data.
+
+    Records are saved in batches (and whenever 'save' is called), so a crash loses at most the last few of them (and those cities simply get scraped again)
+    """
+
+    def __init__(self, path=MANIFEST_PATH, save_every=MANIFEST_SAVE_EVERY):
+        """
+        Keyword Arguments:
+            path {str} -- a path of the manifest file (default: {MANIFEST_PATH})
+            save_every {int} -- number of records after which the manifest gets saved (default: {MANIFEST_SAVE_EVERY})
+        """
+        self.path = path
+        self.save_every = save_every
+        self._unsaved = 0
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)  # {store key: {city: entry}}
+        except (IOError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def digest(towers):
+        """Get a digest of towers data
+
+        Arguments:
+            towers {list} -- scraped towers data
+
+        Returns:
+            str -- SHA-1 hex digest
+        """
+        return hashlib.sha1(json.dumps(towers, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry(self, store, city):
+        return self.entries.get(storekey(store), {}).get(city)
+
+    def isfresh(self, store, city, ttl):
+        """Check if the city was scraped into the store recently enough to be skipped
+
+        Arguments:
+            store {JsonStore / SqliteStore / CompactStore} -- a store scraped into
+            city {str} -- a name of the city
+            ttl {float} -- number of hours scraped data stays fresh (falsy values mean it never does)
+
+        Returns:
+            bool -- 'True' if the city was scraped less than 'ttl' hours ago
+        """
+        entry = self._entry(store, city)
+        return bool(ttl) and entry is not None and time.time() - entry["scraped"] < ttl * 3600
+
+    def ischanged(self, store, city, digest):
+        """Check if the city's data differs from what was scraped into the store last time
+
+        Arguments:
+            store {JsonStore / SqliteStore / CompactStore} -- a store scraped into
+            city {str} -- a name of the city
+            digest {str} -- a digest of the city's towers data
+
+        Returns:
+            bool -- 'True' if the city is new or its data has changed
+        """
+        entry = self._entry(store, city)
+        return entry is None or entry["hash"] != digest
+
+    def record(self, store, city, digest):
+        """Record a successful scrape of the city into the store (saving the manifest every 'save_every' records)
+
+        Arguments:
+            store {JsonStore / SqliteStore / CompactStore} -- a store scraped into
+            city {str} -- a name of the city
+            digest {str} -- a digest of the city's towers data
+        """
+        self.entries.setdefault(storekey(store), {})[city] = {"scraped": time.time(),
+                                                              "hash": digest}
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def save(self):
+        """Save the manifest (atomically, so a crash never leaves it half-written)
+        """
+        temppath = f"{self.path}.tmp"
+        with open(temppath, mode="w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, sort_keys=True, indent=1)
+        os.replace(temppath, self.path)
+        self._unsaved = 0
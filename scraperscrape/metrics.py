@@ -0,0 +1,227 @@
+"""
+
+    scraperscrape.metrics
+    ~~~~~~~~~~~~~~~~~~~
+    Record timings, counts and distributions of what's going on in hot paths
+
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import nullcontext
+
+from scraperscrape.constants import METRICS_ENABLED, METRICS_PATH
+
+_NULLCONTEXT = nullcontext()
+
+
+class Histogram:
+    """Distribution of observed values kept in power-of-two buckets (so its size stays bounded)"""
+
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets = Counter()  # {exponent: number of values in [2^(exponent-1), 2^exponent)}
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.buckets[math.frexp(value)[1] if value > 0 else None] += 1
+
+    def quantile(self, q):
+        """Get an upper bound of the quantile provided (accurate to a power of two)
+
+        Arguments:
+            q {float} -- a quantile (0-1)
+
+        Returns:
+            float -- the quantile's upper bound
+        """
+        if not self.count:
+            return None
+        seen, rank = 0, q * self.count
+        for exponent in sorted(self.buckets, key=lambda e: -math.inf if e is None else e):
+            seen += self.buckets[exponent]
+            if seen >= rank:
+                return 0.0 if exponent is None else min(2.0 ** exponent, self.max)
+        return self.max
+
+    def todict(self):
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "mean": self.total / self.count,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _Timer:
+    """Context manager adding its wall time to a timer"""
+
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.addtime(self.name, time.perf_counter() - self.start)
+
+
+class _TimedIterator:
+    """Iterator adding time spent waiting for items of another one to a timer (once exhausted or closed)"""
+
+    def __init__(self, metrics, name, iterable):
+        self.metrics = metrics
+        self.name = name
+        self.iterator = iter(iterable)
+        self.waited = 0.0
+        self.done = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        except StopIteration:
+            self.waited += time.perf_counter() - start
+            self.close()
+            raise
+        self.waited += time.perf_counter() - start
+        return item
+
+    def close(self):
+        if hasattr(self.iterator, "close"):
+            self.iterator.close()
+        if not self.done:
+            self.done = True
+            self.metrics.addtime(self.name, self.waited)
+
+
+class Metrics:
+    """Timers, counters and histograms. When disabled, recording them costs next to nothing (a single flag check)"""
+
+    def __init__(self, enabled=METRICS_ENABLED):
+        """
+        Keyword Arguments:
+            enabled {bool} -- a flag to record metrics (default: {METRICS_ENABLED})
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything recorded so far
+        """
+        with self._lock:
+            self.timers = {}
+            self.counters = Counter()
+            self.histograms = {}
+
+    def timer(self, name):
+        """Time a block of code, e.g.: 'with METRICS.timer("load"): ...'
+
+        Arguments:
+            name {str} -- a name of the timer
+
+        Returns:
+            context manager -- a timing one (or a no-op one if disabled)
+        """
+        return _Timer(self, name) if self.enabled else _NULLCONTEXT
+
+    def addtime(self, name, seconds):
+        """Add a time measured elsewhere to a timer
+
+        Arguments:
+            name {str} -- a name of the timer
+            seconds {float} -- time measured
+        """
+        if self.enabled:
+            with self._lock:
+                self.timers.setdefault(name, Histogram()).add(seconds)
+
+    def count(self, name, value=1):
+        """Increase a counter
+
+        Arguments:
+            name {str} -- a name of the counter
+
+        Keyword Arguments:
+            value {int} -- an increment (default: {1})
+        """
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def observe(self, name, value):
+        """Add a value to a histogram
+
+        Arguments:
+            name {str} -- a name of the histogram
+            value {float} -- a value observed
+        """
+        if self.enabled:
+            with self._lock:
+                self.histograms.setdefault(name, Histogram()).add(value)
+
+    def timed_iter(self, name, iterable):
+        """Time waiting for items of an iterable (e.g. chunks of a page being downloaded). Closing the wrapper closes the iterable too
+
+        Arguments:
+            name {str} -- a name of the timer getting the total time waited
+            iterable {iterable} -- an iterable to wrap
+
+        Returns:
+            iterator -- the wrapped iterable with time waited so far in its 'waited' attribute (or the very same iterable if disabled)
+        """
+        return _TimedIterator(self, name, iterable) if self.enabled else iterable
+
+    def todict(self):
+        """Get everything recorded so far
+
+        Returns:
+            dict -- {"timers": {name: stats (in seconds)}, "counters": {name: value}, "histograms": {name: stats}}
+        """
+        with self._lock:
+            return {
+                "timers": {name: hist.todict() for name, hist in sorted(self.timers.items())},
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {name: hist.todict() for name, hist
+                               in sorted(self.histograms.items())},
+            }
+
+    def dump(self, path=METRICS_PATH):
+        """Dump everything recorded so far to a JSON file
+
+        Keyword Arguments:
+            path {str} -- a path of the file (default: {METRICS_PATH})
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, mode="w", encoding="utf-8") as f:
+            json.dump(self.todict(), f, indent=4)
+
+
+# shared by all modules
+METRICS = Metrics()
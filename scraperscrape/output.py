@@ -6,179 +6,316 @@
 
 """
 
+import itertools
 import os
 import json
-from contextlib import redirect_stdout
+from concurrent.futures import ThreadPoolExecutor
 from pprint import pprint
 
 from scraperscrape.scraper import getcities, getcity, Country, Region, World
 from scraperscrape.utils import asteriskify, rightjustify
 from scraperscrape.constants import (REGIONMAP, OUTPUT_TXT_PATH, OUTPUT_TXT_REGIONS_PATH,
                                  OUTPUT_TXT_COUNTRIES_PATH, OUTPUT_TXT_CITIES_PATH,
-                                 OUTPUT_JSON_PATH)
+                                 REPORT_WORKERS)
 from scraperscrape.countries import COUNTRYMAP
-from scraperscrape.errors import InvalidCountryError
+from scraperscrape.errors import InvalidRegionError
+from scraperscrape.metrics import METRICS
 
 
-def print_city(cityname, verbose=False):
-    """Print city data
+def render_city(city, verbose=False):
+    """Render city data
 
     Arguments:
-        cityname {str} -- a name of the city to print
+        city {scraper.City} -- a city to render
 
     Keyword Arguments:
         verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+
+    Returns:
+        str -- rendered text (as printed by 'print_city')
     """
-    city = getcity(cityname)
     max_countwidth = len(str(len(city.towers)))  # to right-justify output
 
-    if verbose:
-        print(city.getdescription())
-    else:
-        print(asteriskify((str(city))))
+    lines = [city.getdescription() if verbose else asteriskify((str(city)))]
     for i, tower in enumerate(city.towers):
         if verbose:
-            print()
-            print(tower.getdescription())
+            lines += ["", tower.getdescription()]
         else:
-            print(rightjustify(str(tower), i + 1, max_countwidth))
+            lines.append(rightjustify(str(tower), i + 1, max_countwidth))
+    return "\n".join(lines) + "\n"
 
 
-def print_country(countryname, verbose=False):
-    """Print country data
+def render_country(country, verbose=False):
+    """Render country data
 
     Arguments:
-        countryname {str} -- a name of the country to print
+        country {scraper.Country} -- a country to render
 
     Keyword Arguments:
         verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+
+    Returns:
+        str -- rendered text (as printed by 'print_country')
     """
-    cities = getcities(country_filter=countryname)
-    country = Country(countryname, cities)
+    cities = country.cities
     max_countwidth = len(str(len(cities)))  # to right-justify output
 
-    if verbose:
-        print(country.getdescription())
-    else:
-        print(asteriskify(str(country)))
+    lines = [country.getdescription() if verbose else asteriskify(str(country))]
     for i, city in enumerate(cities):
         if verbose:
-            print()
-            print(city.getdescription())
+            lines += ["", city.getdescription()]
         else:
-            print(rightjustify("{}, {}".format(city.name, city.rating), i + 1, max_countwidth))
+            lines.append(rightjustify("{}, {}".format(city.name, city.rating), i + 1,
+                                      max_countwidth))
+    return "\n".join(lines) + "\n"
 
 
-def print_region(region_name, verbose=False):
-    """Print region data
+def render_region(region, verbose=False):
+    """Render region data
 
     Arguments:
-        region_name {str} -- a name of the region to print
+        region {scraper.Region} -- a region to render
 
     Keyword Arguments:
         verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+
+    Returns:
+        str -- rendered text (as printed by 'print_region')
     """
-    cities = getcities(region_filter=region_name)
-    region = Region(region_name, cities)
     max_countwidth = len(str(len(region.countries)))  # to right-justify output
 
-    if verbose:
-        print(region.getdescription())
-    else:
-        print(asteriskify(str(region)))
+    lines = [region.getdescription() if verbose else asteriskify(str(region))]
     for i, country in enumerate(region.countries):
         if verbose:
-            print()
-            print(country.getdescription())
+            lines += ["", country.getdescription()]
         else:
-            print(rightjustify("{}, {}".format(country.name, country.rating), i + 1,
-                               max_countwidth))
+            lines.append(rightjustify("{}, {}".format(country.name, country.rating), i + 1,
+                                      max_countwidth))
+    return "\n".join(lines) + "\n"
 
 
-def print_world(verbose=False):
-    """Print world data
+def render_world(world, verbose=False):
+    """Render world data
+
+    Arguments:
+        world {scraper.World} -- a world to render
 
     Keyword Arguments:
         verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+
+    Returns:
+        str -- rendered text (as printed by 'print_world')
     """
-    world = World(getcities())
     max_countwidth = len(str(len(world.regions)))  # to right-justify output
 
-    if verbose:
-        print(world.getdescription())
-    else:
-        print(asteriskify(str(world)))
+    lines = [world.getdescription() if verbose else asteriskify(str(world))]
     for i, region in enumerate(world.regions):
         if verbose:
-            print()
-            print(region.getdescription())
+            lines += ["", region.getdescription()]
         else:
-            print(rightjustify("{}, {}".format(region.name, region.rating), i + 1,
-                               max_countwidth))
+            lines.append(rightjustify("{}, {}".format(region.name, region.rating), i + 1,
+                                      max_countwidth))
+    return "\n".join(lines) + "\n"
 
 
-def world_totxt():
-    """Write world data to a .txt file
+def render_report(render, obj):
+    """Render a .txt report: a brief listing followed by details
+
+    Arguments:
+        render {function} -- one of 'render_*' functions
+        obj {scraper.City / scraper.Country / scraper.Region / scraper.World} -- an object to render
+
+    Returns:
+        str -- rendered report
     """
-    with open(os.path.join(OUTPUT_TXT_PATH, "world.txt"), mode="w") as f:
-        with redirect_stdout(f):
-            print_world()
-            print()
-            print(asteriskify("DETAILS", 20))
-            print()
-            print_world(verbose=True)
+    return "{}\n{}\n\n{}".format(render(obj), asteriskify("DETAILS", 20), render(obj, verbose=True))
 
 
-def regions_totxt():
-    """Write regions data to a .txt files
+def print_city(cityname, verbose=False):
+    """Print city data
+
+    Arguments:
+        cityname {str} -- a name of the city to print
+
+    Keyword Arguments:
+        verbose {bool} -- a flag to switch the output's verbosity (default: {False})
     """
+    print(render_city(getcity(cityname), verbose), end="")
+
+
+def print_country(countryname, verbose=False):
+    """Print country data
+
+    Arguments:
+        countryname {str} -- a name of the country to print
+
+    Keyword Arguments:
+        verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+    """
+    country = Country(countryname, getcities(country_filter=countryname))
+    print(render_country(country, verbose), end="")
+
+
+def print_region(region_name, verbose=False):
+    """Print region data
+
+    Arguments:
+        region_name {str} -- a name of the region to print
+
+    Keyword Arguments:
+        verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+    """
+    region = Region(region_name, getcities(region_filter=region_name))
+    print(render_region(region, verbose), end="")
+
+
+def print_world(verbose=False):
+    """Print world data
+
+    Keyword Arguments:
+        verbose {bool} -- a flag to switch the output's verbosity (default: {False})
+    """
+    print(render_world(World(getcities()), verbose), end="")
+
+
+def _writereport(report):
+    """Render and write a report (in a worker thread)"""
+    path, render, obj = report
+    with METRICS.timer("output.render"):
+        text = render_report(render, obj)
+    with METRICS.timer("output.write"):
+        with open(path, mode="w") as f:
+            f.write(text)
+    METRICS.count("output.files")
+    METRICS.observe("output.chars", len(text))
+
+
+def write_reports(reports, workers=REPORT_WORKERS):
+    """Write reports to .txt files, from a pool of worker threads if more than one worker is set
+
+    Arguments:
+        reports {iterable} -- (path, 'render_*' function, object to render) tuples
+
+    Keyword Arguments:
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
+    """
+    with METRICS.timer("output.reports"):
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                # consume results, so that the first failure gets raised
+                for _ in executor.map(_writereport, reports):
+                    pass
+        else:
+            for report in reports:
+                _writereport(report)
+
+
+def _world_reports(world):
+    yield os.path.join(OUTPUT_TXT_PATH, "world.txt"), render_world, world
+
+
+def _region_reports(world):
+    regions = {region.name: region for region in world.regions}
     for region_name in REGIONMAP.values():
+        if region_name not in regions:
+            raise InvalidRegionError(f"Invalid region filter provided: {region_name}")
         path = os.path.join(OUTPUT_TXT_REGIONS_PATH, "{}.txt".format(region_name.replace(" ", "_")))
-        with open(path, mode="w") as f:
-            with redirect_stdout(f):
-                print_region(region_name)
-                print()
-                print(asteriskify("DETAILS", 20))
-                print()
-                print_region(region_name, verbose=True)
+        yield path, render_region, regions[region_name]
 
 
-def countries_totxt():
-    """Write countries data to .txt files
+def getcountries(world):
+    """Get countries with cities in the world provided. Countries are built out of all the world's cities (as by 'print_country'), not taken from its regions, as cities of a country may lie in more than one region
+
+    Arguments:
+        world {scraper.World} -- a world to take cities from
+
+    Returns:
+        dict -- {country name: scraper.Country} in order of the country map, countries without cities (or not in the country map) are left out
     """
+    countrycities = {}
+    for city in world.cities:  # cities are sorted by rating
+        countrycities.setdefault(city.country, []).append(city)
+    country_names = [name for namelist in COUNTRYMAP.values() for name in namelist]
+    return {name: Country(name, countrycities[name]) for name in dict.fromkeys(country_names)
+            if name in countrycities}
+
+
+def _country_reports(world):
+    countries = getcountries(world)
     country_names = [name for namelist in COUNTRYMAP.values() for name in namelist]
 
-    for country_name in country_names:
-        failed = False
+    for country_name in dict.fromkeys(country_names):
         path = os.path.join(OUTPUT_TXT_COUNTRIES_PATH,
                             "{}.txt".format(country_name.replace(" ", "_")))
-        with open(path, mode="w") as f:
-            with redirect_stdout(f):
-                try:
-                    print_country(country_name)
-                except InvalidCountryError:
-                    failed = True
-                if not failed:
-                    print()
-                    print(asteriskify("DETAILS", 20))
-                    print()
-                    print_country(country_name, verbose=True)
-        if failed:
+        if country_name in countries:
+            yield path, render_country, countries[country_name]
+        elif os.path.exists(path):  # a stale report of a country without cities
             os.remove(path)
 
 
-def cities_totxt():
+def _city_reports(cities):
+    for city in cities:
+        path = os.path.join(OUTPUT_TXT_CITIES_PATH,
+                            "{}.txt".format(city.name.replace(" ", "_")))
+        yield path, render_city, city
+
+
+def world_totxt(world=None, workers=REPORT_WORKERS):
+    """Write world data to a .txt file
+
+    Keyword Arguments:
+        world {scraper.World} -- an already built world to write (default: {None})
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
+    """
+    world = world if world is not None else World(getcities())
+    write_reports(_world_reports(world), workers)
+
+
+def regions_totxt(world=None, workers=REPORT_WORKERS):
+    """Write regions data to a .txt files
+
+    Keyword Arguments:
+        world {scraper.World} -- an already built world to take regions from (default: {None})
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
+
+    Raises:
+        InvalidRegionError -- when there's a region without cities
+    """
+    world = world if world is not None else World(getcities())
+    write_reports(list(_region_reports(world)), workers)
+
+
+def countries_totxt(world=None, workers=REPORT_WORKERS):
+    """Write countries data to .txt files
+
+    Keyword Arguments:
+        world {scraper.World} -- an already built world to take countries' cities from (default: {None})
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
+    """
+    world = world if world is not None else World(getcities())
+    write_reports(_country_reports(world), workers)
+
+
+def cities_totxt(cities=None, workers=REPORT_WORKERS):
     """Write cities data to .txt files
+
+    Keyword Arguments:
+        cities {list} -- already loaded City objects to write (default: {None})
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
     """
-    city_names = [os.path.splitext(file)[0].replace("_", " ")
-                  for _, _, files in os.walk(OUTPUT_JSON_PATH) for file in files]
+    cities = cities if cities is not None else getcities(merge_subcities=False)
+    write_reports(_city_reports(cities), workers)
 
-    for city_name in city_names:
-        path = os.path.join(OUTPUT_TXT_CITIES_PATH,
-                            "{}.txt".format(city_name.replace(" ", "_")))
-        with open(path, mode="w") as f, redirect_stdout(f):
-            print_city(city_name)
-            print()
-            print(asteriskify("DETAILS", 20))
-            print()
-            print_city(city_name, verbose=True)
+
+def build_reports(workers=REPORT_WORKERS):
+    """Write all .txt reports loading scraped data and building the world out of it only once
+
+    Keyword Arguments:
+        workers {int} -- number of worker threads (default: {REPORT_WORKERS})
+    """
+    world = World(getcities())
+    regions = list(_region_reports(world))  # fail early on a region without cities
+    # subsidiary cities get their own reports, so they're taken unmerged (from cache)
+    cities = getcities(merge_subcities=False)
+    write_reports(itertools.chain(_world_reports(world), regions, _country_reports(world),
+                                  _city_reports(cities)), workers)
@@ -0,0 +1,251 @@
+"""
+
+    scraperscrape.query
+    ~~~~~~~~~~~~~~~~~
+    Rank towers and cities of scraped data with indexed top-N queries
+
+"""
+
+import heapq
+from array import array
+from itertools import islice
+from operator import itemgetter
+
+from scraperscrape.constants import REGIONMAP, STATUSMAP
+from scraperscrape.errors import InvalidCountryError, InvalidRegionError, InvalidStatusError
+from scraperscrape.scraper import Tower, getcities, mergemetros, merge_statustiers, rate_tiers
+from scraperscrape.spatial import SpatialIndex
+from scraperscrape.table import NumericColumn
+
+# {ranking key: towers table column} - towers get presorted by these (city by city)
+TOWER_KEYS = {
+    "height": "height",
+    "floors": "floors",
+    "completed": "completed",  # (expected) year of completion
+    "start": "start",
+}
+# {ranking key: function getting the key out of a city and tiers histogram of its towers of statuses queried}
+CITY_KEYS = {
+    "rating": lambda city, histogram: rate_tiers(histogram),
+    "towers": lambda city, histogram: sum(histogram),
+}
+_RANKED = (NumericColumn.INT, NumericColumn.FLOAT)  # kinds of values that get ranked
+_STATUSCODES = {**{code: code for code in STATUSMAP},
+                **{name.casefold(): code for code, name in STATUSMAP.items()}}
+
+
+def _aslist(value):
+    """Get a filter's value as a list (a single string is taken for one value)"""
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def parse_statuses(statuses):
+    """Parse statuses given either as codes (e.g. 'UC') or names (e.g. 'Under Construction')
+
+    Arguments:
+        statuses {str / iterable} -- a status or statuses
+
+    Raises:
+        InvalidStatusError -- when an invalid status is provided
+
+    Returns:
+        list -- status codes
+    """
+    codes = []
+    for status in _aslist(statuses):
+        code = _STATUSCODES.get(status, _STATUSCODES.get(status.casefold()))
+        if code is None:
+            raise InvalidStatusError(f"Invalid status provided: {status}")
+        codes.append(code)
+    return codes
+
+
+class Dataset:
+    """Loaded towers and cities ranked by indexed queries.
+
+    Towers get presorted city by city (on first use of a key) and the cities' sorted runs are merged lazily through a heap, so a top-N query reads little more than N towers of cities passing filters. Region and country filters drop whole cities before merging; status and function ones are checked on dictionary codes of each tower. Rankings by ad-hoc keys go through a bounded heap instead
+    """
+
+    def __init__(self, cities=None, store=None):
+        """
+        Keyword Arguments:
+            cities {list} -- a list of City objects with subsidiary cities not merged (default: {None} - all cities loaded from the store)
+            store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+        """
+        self.cities = cities if cities is not None else getcities(merge_subcities=False,
+                                                                   store=store)
+        self._metros = None
+        self._spatial = None
+        self._towerindexes = {}  # {key: {city's position: array of rows sorted descending}}
+        self._cityindexes = {}  # {key: list of metro cities sorted descending}
+
+    @property
+    def metros(self):
+        """Cities with subsidiary ones merged into their parents (as ranked by 'getcities')"""
+        if self._metros is None:
+            self._metros = mergemetros(self.cities)
+        return self._metros
+
+    @property
+    def spatial(self):
+        """Spatial index of towers (see 'scraperscrape.spatial.SpatialIndex'), built on first use"""
+        if self._spatial is None:
+            self._spatial = SpatialIndex(self.cities)
+        return self._spatial
+
+    def _selectcities(self, cities, region, country):
+        """Get positions of cities passing region and country filters"""
+        regions, countries = _aslist(region), _aslist(country)
+        for name in regions:
+            if name not in REGIONMAP.values():
+                raise InvalidRegionError(f"Invalid region filter provided: {name}")
+        if countries:
+            known = {city.country for city in cities}
+            for name in countries:
+                if name not in known:
+                    raise InvalidCountryError(f"Invalid country filter provided: {name}")
+        return [i for i, city in enumerate(cities)
+                if (not regions or city.region in regions)
+                and (not countries or city.country in countries)]
+
+    def _towerindex(self, key, i):
+        """Get rows of i-th city's table with values of key, sorted by them in descending order"""
+        index = self._towerindexes.setdefault(key, {})
+        rows = index.get(i)
+        if rows is None:
+            column = self.cities[i].table.columns[TOWER_KEYS[key]]
+            ranked = [row for row, kind in enumerate(column.kinds) if kind in _RANKED]
+            ranked.sort(key=column.values.__getitem__, reverse=True)
+            rows = index[i] = array("I", ranked)
+        return rows
+
+    def _checks(self, table, statuses, functions):
+        """Get (codes, allowed codes) pairs of a city's table for status and function filters or 'None' if no row can pass"""
+        checks = []
+        if statuses:
+            column = table.columns["status"]
+            allowed = {code for code, status in enumerate(column.categories) if status in statuses}
+            checks.append((column.codes, allowed))
+        if functions:
+            column = table.columns["functions"]
+            allowed = {code for code, value in enumerate(column.categories)
+                       if value and not functions.isdisjoint(value.split(" / "))}
+            checks.append((column.codes, allowed))
+        if any(not allowed for _, allowed in checks):
+            return None
+        return checks
+
+    def _run(self, key, i, checks, ascending):
+        """Iterate over (value, city's position, row) of a city's towers passing checks in order of key"""
+        values = self.cities[i].table.columns[TOWER_KEYS[key]].values
+        rows = self._towerindex(key, i)
+        for row in (reversed(rows) if ascending else rows):
+            if all(codes[row] in allowed for codes, allowed in checks):
+                yield values[row], i, row
+
+    def top_towers(self, n=None, by="height", ascending=False, status=None, region=None,
+                   country=None, function=None):
+        """Rank towers
+
+        Keyword Arguments:
+            n {int} -- number of towers to get (default: {None} - all ranked)
+            by {str / callable} -- a ranking key: 'height', 'floors', 'completed' or 'start' (towers without a value are left out), or a function getting a key out of a scraper.Tower (default: {"height"})
+            ascending {bool} -- a flag to rank from the lowest value (default: {False})
+            status {str / iterable} -- status(es) to narrow towers to, as codes or names (default: {None})
+            region {str / iterable} -- region(s) to narrow towers to (default: {None})
+            country {str / iterable} -- country(ies) to narrow towers to (default: {None})
+            function {str / iterable} -- function(s) to narrow towers to, e.g. 'hotel' (mixed-use towers included) (default: {None})
+
+        Raises:
+            InvalidStatusError -- when an invalid status is provided
+            InvalidRegionError -- when an invalid region is provided
+            InvalidCountryError -- when an invalid country is provided
+
+        Returns:
+            iterator -- scraper.Tower objects (computed as they're iterated over)
+        """
+        statuses, functions = parse_statuses(status), set(_aslist(function))
+        selected = []
+        for i in self._selectcities(self.cities, region, country):
+            checks = self._checks(self.cities[i].table, statuses, functions)
+            if checks is not None:
+                selected.append((i, checks))
+
+        if callable(by):
+            candidates = (Tower.fromrow(self.cities[i].table, row) for i, checks in selected
+                          for row in range(len(self.cities[i].table))
+                          if all(codes[row] in allowed for codes, allowed in checks))
+            if n is None:
+                return iter(sorted(candidates, key=by, reverse=not ascending))
+            select = heapq.nsmallest if ascending else heapq.nlargest
+            return iter(select(n, candidates, key=by))
+
+        if by not in TOWER_KEYS:
+            raise ValueError(f"Invalid ranking key provided: {by}")
+        runs = [self._run(by, i, checks, ascending) for i, checks in selected]
+        merged = heapq.merge(*runs, key=itemgetter(0), reverse=not ascending)
+        return (Tower.fromrow(self.cities[i].table, row) for _, i, row in islice(merged, n))
+
+    def _cityindex(self, key):
+        """Get metro cities sorted by key (of all their towers) in descending order"""
+        index = self._cityindexes.get(key)
+        if index is None:
+            keyfunc = CITY_KEYS[key]
+            index = self._cityindexes[key] = sorted(
+                self.metros, key=lambda city: keyfunc(city, merge_statustiers(city.statustiers)),
+                reverse=True)
+        return index
+
+    def top_cities(self, n=None, by="rating", ascending=False, status=None, region=None,
+                   country=None):
+        """Rank cities (with subsidiary ones merged into their parents)
+
+        Keyword Arguments:
+            n {int} -- number of cities to get (default: {None} - all)
+            by {str / callable} -- a ranking key: 'rating' or 'towers' (number of towers) counting only towers of statuses queried, or a function getting a key out of a scraper.City (default: {"rating"})
+            ascending {bool} -- a flag to rank from the lowest value (default: {False})
+            status {str / iterable} -- status(es) of towers to rank cities by, as codes or names (default: {None} - all)
+            region {str / iterable} -- region(s) to narrow cities to (default: {None})
+            country {str / iterable} -- country(ies) to narrow cities to (default: {None})
+
+        Raises:
+            InvalidStatusError -- when an invalid status is provided
+            InvalidRegionError -- when an invalid region is provided
+            InvalidCountryError -- when an invalid country is provided
+
+        Returns:
+            iterator -- scraper.City objects (computed as they're iterated over)
+        """
+        statuses = parse_statuses(status)
+        selected = [self.metros[i] for i in self._selectcities(self.metros, region, country)]
+        if not callable(by) and by not in CITY_KEYS:
+            raise ValueError(f"Invalid ranking key provided: {by}")
+
+        if not callable(by) and not statuses:
+            # presorted, so only filters are checked as cities get iterated over
+            wanted = {id(city) for city in selected}
+            index = self._cityindex(by)
+            return islice((city for city in (reversed(index) if ascending else index)
+                           if id(city) in wanted), n)
+
+        if callable(by):
+            keyfunc = by
+        else:
+            keyfunc = lambda city: CITY_KEYS[by](
+                city, merge_statustiers(city.statustiers, *statuses))
+        if n is None:
+            return iter(sorted(selected, key=keyfunc, reverse=not ascending))
+        select = heapq.nsmallest if ascending else heapq.nlargest
+        return iter(select(n, selected, key=keyfunc))
+
+
+if __name__ == "__main__":
+    dataset = Dataset()
+    print("The 50 tallest towers under construction in Asia:")
+    for tower in dataset.top_towers(50, status="UC", region="Asia"):
+        print(f"  {tower} ({tower.table.get('city', tower.row)})")
+    print("The top 20 cities by rating of completed towers:")
+    for city in dataset.top_cities(20, status="COM"):
+        print(f"  {city.name} ({rate_tiers(merge_statustiers(city.statustiers, 'COM'))})")
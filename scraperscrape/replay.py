@@ -0,0 +1,124 @@
+"""
+
+    scraperscrape.replay
+    ~~~~~~~~~~~~~~~~~~
+    Record HTTP responses as fixtures and replay them without network
+
+"""
+
+import io
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from scraperscrape.constants import FIXTURES_PATH, HTTP_POOL_SIZE, HTTP_TRANSPORT
+from scraperscrape.fetch import ResponseCache, retry_policy
+
+# headers describing the body as sent over the wire, while fixtures keep it decoded
+_WIRE_HEADERS = ("Content-Encoding", "Content-Length", "Transfer-Encoding")
+
+
+class Fixtures(ResponseCache):
+    """Recorded HTTP responses kept on disk (laid out the same as the response cache)"""
+
+    def __init__(self, path=FIXTURES_PATH):
+        """
+        Keyword Arguments:
+            path {str} -- a directory to keep recorded responses in (default: {FIXTURES_PATH})
+        """
+        super().__init__(path)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """HTTP adapter that records responses it gets as fixtures. Streamed bodies are read whole to be recorded.
+
+    Responses to conditional requests confirming a cached one ('304 Not Modified') aren't recorded, so it's best to record with response caching off
+    """
+
+    def __init__(self, fixtures=None, **kwargs):
+        """
+        Keyword Arguments:
+            fixtures {scraperscrape.replay.Fixtures} -- fixtures to record to (default: {None} - the default ones)
+            **kwargs -- 'requests.adapters.HTTPAdapter' arguments
+        """
+        super().__init__(**kwargs)
+        self.fixtures = fixtures or Fixtures()
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code != 304:
+            headers = {key: value for key, value in response.headers.items()
+                       if key not in _WIRE_HEADERS}
+            meta = {
+                "status": response.status_code,
+                "reason": response.reason,
+                "headers": headers,
+                "encoding": response.encoding,
+            }
+            self.fixtures.put(request.url, meta, response.content)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Adapter that serves recorded responses instead of sending requests. Conditional requests get revalidated against recorded ETags"""
+
+    def __init__(self, fixtures=None):
+        """
+        Keyword Arguments:
+            fixtures {scraperscrape.replay.Fixtures} -- fixtures to replay (default: {None} - the default ones)
+        """
+        super().__init__()
+        self.fixtures = fixtures or Fixtures()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        recorded = self.fixtures.get(request.url)
+        if recorded is None:
+            raise requests.ConnectionError(f"No response recorded for: {request.url}",
+                                           request=request)
+        meta, body = recorded
+        headers = CaseInsensitiveDict(meta["headers"])
+        status, reason = meta["status"], meta["reason"]
+        if headers.get("ETag") and request.headers.get("If-None-Match") == headers["ETag"]:
+            status, reason, body = 304, "Not Modified", b""
+        headers["Content-Length"] = str(len(body))
+
+        response = requests.Response()
+        response.status_code = status
+        response.reason = reason
+        response.headers = headers
+        response.encoding = meta["encoding"]
+        response.raw = io.BytesIO(body)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+    def close(self):
+        pass
+
+
+def gettransport(name=HTTP_TRANSPORT, fixtures=None, pool_size=HTTP_POOL_SIZE):
+    """Get a transport (requests adapter) for fetching pages
+
+    Keyword Arguments:
+        name {str / requests.adapters.BaseAdapter} -- 'live' (sending requests), 'record' (sending requests and recording responses) or 'replay' (serving recorded responses), an adapter is passed through (default: {HTTP_TRANSPORT})
+        fixtures {scraperscrape.replay.Fixtures} -- fixtures to record to or replay (default: {None} - the default ones)
+        pool_size {int} -- maximum number of connections kept alive per host (default: {HTTP_POOL_SIZE})
+
+    Raises:
+        ValueError -- when an unknown transport is named
+
+    Returns:
+        requests.adapters.BaseAdapter / None -- the adapter or 'None' for the default live one
+    """
+    if isinstance(name, BaseAdapter):
+        return name
+    if name == "live":
+        return None
+    if name == "record":
+        return RecordingAdapter(fixtures, pool_connections=pool_size, pool_maxsize=pool_size,
+                                max_retries=retry_policy())
+    if name == "replay":
+        return ReplayAdapter(fixtures)
+    raise ValueError(f"Unknown transport: {name}")
@@ -0,0 +1,246 @@
+"""
+
+    scraperscrape.schema
+    ~~~~~~~~~~~~~~~~~~
+    Infer schema of scraped towers data and detect its drift
+
+"""
+
+import datetime as dt
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from scraperscrape.constants import LOAD_WORKERS
+from scraperscrape.store import COLUMNS, JsonStore, getstore, readjson
+from scraperscrape.utils import load_cache, dump_cache, cache_name
+
+NULLS = (None, "-", "")  # values considered missing in scraped data
+# types of values (as named in schemas) that fit SQLite column types
+COLUMN_TYPES = {
+    "INTEGER": {"int"},
+    "NUMERIC": {"int", "float"},
+    "TEXT": {"str"},
+}
+TYPENAMES = {bool: "bool", int: "int", float: "float", str: "str", list: "list", dict: "dict"}
+
+
+@lru_cache(maxsize=None)
+def _parsetime(stamp):
+    """Parse a timestamp written by 'utils.timestamp' to make it comparable"""
+    try:
+        return dt.datetime.strptime(stamp, "%Y-%b-%d %H:%M:%S")
+    except (TypeError, ValueError):
+        return dt.datetime.min
+
+
+def infer_citydata(data):
+    """Infer schema of a single city's towers data
+
+    Arguments:
+        data {dict} -- scraped city data
+
+    Returns:
+        dict -- schema (see 'infer_schema')
+    """
+    towers = data["towers"]
+    seen = [data.get("timestamp"), towers[0].get("city") if towers else None]
+    counts, nulls, types = Counter(), Counter(), {}
+    for tower in towers:
+        counts.update(tower.keys())
+        for key, value in tower.items():
+            if value in NULLS:
+                nulls[key] += 1
+            else:
+                typename = TYPENAMES.get(type(value), type(value).__name__)
+                types.setdefault(key, Counter())[typename] += 1
+    properties = {key: {"count": count, "nulls": nulls[key], "types": dict(types.get(key, {})),
+                        "first": seen, "last": seen} for key, count in counts.items()}
+    return {"towers": len(towers), "properties": properties}
+
+
+def _inferfile(path):
+    """Infer schema of a city's JSON file (in a worker process)"""
+    return infer_citydata(readjson(path))
+
+
+def merge_schemas(schemas):
+    """Merge schemas inferred from parts of data into one
+
+    Arguments:
+        schemas {iterable} -- schemas (see 'infer_schema')
+
+    Returns:
+        dict -- merged schema
+    """
+    towers, properties = 0, {}
+    for schema in schemas:
+        towers += schema["towers"]
+        for key, prop in schema["properties"].items():
+            merged = properties.get(key)
+            if merged is None:
+                properties[key] = {**prop, "types": dict(prop["types"])}
+                continue
+            merged["count"] += prop["count"]
+            merged["nulls"] += prop["nulls"]
+            for typename, count in prop["types"].items():
+                merged["types"][typename] = merged["types"].get(typename, 0) + count
+            if _parsetime(prop["first"][0]) < _parsetime(merged["first"][0]):
+                merged["first"] = prop["first"]
+            if _parsetime(prop["last"][0]) > _parsetime(merged["last"][0]):
+                merged["last"] = prop["last"]
+    return {"towers": towers, "properties": properties}
+
+
+def _inferfiles(store, workers):
+    """Infer schemas of the store's JSON files reusing those inferred by previous runs for files that haven't changed since
+
+    Returns:
+        list -- schemas of files
+    """
+    key = os.path.abspath(store.path)
+    cached = load_cache(cache_name("schema", key), key) or {}
+    scanned = store.scan()
+    # stamps get persisted as lists
+    topaths = [path for path, stamp in scanned
+               if path not in cached or tuple(cached[path][0]) != stamp]
+    if workers > 1 and len(topaths) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            inferred = list(executor.map(_inferfile, topaths,
+                                         chunksize=max(1, len(topaths) // (workers * 4))))
+    else:
+        inferred = [_inferfile(path) for path in topaths]
+
+    stamps = dict(scanned)
+    files = {path: cached[path] for path in stamps if path in cached}
+    files.update((path, [stamps[path], schema]) for path, schema in zip(topaths, inferred))
+    if topaths or len(files) != len(cached):
+        dump_cache(cache_name("schema", key), key, files)
+    return [files[path][1] for path, _ in scanned]
+
+
+def infer_schema(store=None, workers=LOAD_WORKERS):
+    """Infer schema of the stored towers data in a single pass over it.
+
+    JSON files are inferred in a pool of worker processes if more than one worker is set, and per-file results are cached, so later runs only go over files that have changed
+
+    Keyword Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+        workers {int} -- number of worker processes (default: {LOAD_WORKERS})
+
+    Returns:
+        dict -- {
+            "towers": number of towers,
+            "properties": {property: {
+                "count": number of towers having it,
+                "nulls": number of those with a missing value (None, "-" or ""),
+                "types": {type name: number of values of the type},
+                "first": [timestamp, city] of its earliest appearance,
+                "last": [timestamp, city] of its latest appearance
+            }}
+        }
+    """
+    store = store or getstore()
+    if isinstance(store, JsonStore):
+        return merge_schemas(_inferfiles(store, workers))
+    return merge_schemas(infer_citydata(data) for data in store.iter_citydata())
+
+
+def null_rate(schema, prop):
+    """Get the rate of towers with a property missing (whether it's absent or blank)
+
+    Arguments:
+        schema {dict} -- a schema (see 'infer_schema')
+        prop {str} -- a property
+
+    Returns:
+        float -- a fraction of towers
+    """
+    info = schema["properties"].get(prop, {"count": 0, "nulls": 0})
+    return (schema["towers"] - info["count"] + info["nulls"]) / schema["towers"]
+
+
+def diff_schemas(old, new):
+    """Find differences between schemas (e.g. of consecutive snapshots)
+
+    Arguments:
+        old {dict} -- an older schema (see 'infer_schema')
+        new {dict} -- a newer schema
+
+    Returns:
+        dict -- {"added": new properties, "removed": properties gone, "retyped": {property: [old types, new types]}}
+    """
+    oldprops, newprops = old["properties"], new["properties"]
+    retyped = {}
+    for prop in set(oldprops) & set(newprops):
+        oldtypes, newtypes = set(oldprops[prop]["types"]), set(newprops[prop]["types"])
+        if oldtypes != newtypes:
+            retyped[prop] = [sorted(oldtypes), sorted(newtypes)]
+    return {
+        "added": sorted(set(newprops) - set(oldprops)),
+        "removed": sorted(set(oldprops) - set(newprops)),
+        "retyped": retyped
+    }
+
+
+def check_columns(schema, columns=COLUMNS):
+    """Check a schema against SQLite columns stored data is laid out in
+
+    Arguments:
+        schema {dict} -- a schema (see 'infer_schema')
+
+    Keyword Arguments:
+        columns {list} -- (name, SQLite type) tuples (default: {scraperscrape.store.COLUMNS})
+
+    Returns:
+        dict -- {"unstored": properties without columns, "unseen": columns without properties, "mistyped": {column: types that don't fit it}}
+    """
+    props = schema["properties"]
+    coltypes = dict(columns)
+    mistyped = {}
+    for col, coltype in columns:
+        if col in props:
+            misfits = set(props[col]["types"]) - COLUMN_TYPES.get(coltype, set())
+            if misfits:
+                mistyped[col] = sorted(misfits)
+    return {
+        "unstored": sorted(set(props) - set(coltypes)),
+        "unseen": sorted(set(coltypes) - set(props)),
+        "mistyped": mistyped
+    }
+
+
+def detect_drift(store=None, workers=LOAD_WORKERS):
+    """Infer schema of the stored data and compare it with the one inferred last time and with SQLite columns.
+
+    The schema inferred is saved as the one to compare with next time
+
+    Keyword Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+        workers {int} -- number of worker processes (default: {LOAD_WORKERS})
+
+    Returns:
+        dict -- {"snapshot": differences with the previous schema (see 'diff_schemas') or 'None' if there's none, "columns": differences with SQLite columns (see 'check_columns')}
+    """
+    store = store or getstore()
+    key = "{}:{}".format(type(store).__name__, os.path.abspath(store.path))
+    schema = infer_schema(store, workers)
+    previous = load_cache(cache_name("schema_previous", key), key)
+    dump_cache(cache_name("schema_previous", key), key, schema)
+    return {
+        "snapshot": diff_schemas(previous, schema) if previous is not None else None,
+        "columns": check_columns(schema)
+    }
+
+
+if __name__ == "__main__":
+    from pprint import pprint
+
+    schema = infer_schema()
+    for prop, info in sorted(schema["properties"].items()):
+        print("{}: {} (missing: {:.1%}, first: {}, last: {})".format(
+            prop, ", ".join(f"{t}: {n}" for t, n in sorted(info["types"].items())),
+            null_rate(schema, prop), " / ".join(map(str, info["first"])),
+            " / ".join(map(str, info["last"]))))
+    pprint(detect_drift())
@@ -6,37 +6,71 @@
 
 """
 
+from bs4 import BeautifulSoup, SoupStrainer
 import requests
-from bs4 import BeautifulSoup
+from bisect import bisect_right
+import copy
 import json
-import time
 import os
 from collections import Counter
 import itertools
-import sqlite3
-from pprint import pprint
-
-from scraperscrape.constants import (URL, OUTPUT_PATH, OUTPUT_JSON_PATH,
-                                 RATINGS_MATRIX, STATUSMAP, REGIONMAP, Tier)
-from scraperscrape.errors import (PageWrongFormatError, InvalidCityError,
-                              InvalidCountryError, InvalidRegionError)
-from scraperscrape.utils import timestamp, readinput, asteriskify
-from scraperscrape.countries import COUNTRYMAP
-
-
-SUBCITYMAP = {
-    "Courbevoie": "Paris",
-    "Puteaux": "Paris",
-    "Nanterre": "Paris",
-    "Bagnolet": "Paris",
-    "Issy-les-Moulineaux": "Paris",
-    "Aubervilliers": "Paris",
-    "Saint Denis": "Paris",
-    "L'Hospitalet de Llobregat": "Barcelona",
-    "Rijswijk": "The Hague",
-    "Herlev": "Copenhagen",
-    "Oeiras": "Lisbon"
-}
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from scraperscrape.constants import (URL, INPUT_PATH, RATINGS_MATRIX, STATUSMAP, REGIONMAP,
+                                 SCRAPE_WORKERS, SCRAPE_RATE, SCRAPE_BURST, SCRAPE_TTL,
+                                 HTTP_POOL_SIZE, HTTP_TRANSPORT, LOAD_WORKERS, SUBCITYMAP)
+from scraperscrape.errors import PageWrongFormatError, InvalidCountryError, InvalidRegionError
+from scraperscrape.utils import (timestamp, readinput, asteriskify, file_digest, load_cache,
+                             dump_cache, cache_name, LazyMapping)
+from scraperscrape.countries import COUNTRYMAP, CITY_REGION_MAP, REGION_INDEX
+from scraperscrape.fetch import Fetcher
+from scraperscrape.manifest import Manifest
+from scraperscrape.metrics import METRICS
+from scraperscrape.replay import gettransport
+from scraperscrape.store import (COLUMNS as STORE_COLUMNS, JsonStore, SqliteStore, getstore,
+                                 readjson)
+from scraperscrape.table import TowerTable
+from scraperscrape.throttle import RateLimiter
+
+
+# ids of the website's form 'select' elements that provide codes to be entered in URL
+SELECT_IDS = ("base_city", "base_height_range")
+
+
+def scrape_selects():
+    """Scrape codes to be entered in URL from the website's form saved in 'default.html'.
+
+    Only 'select' elements of interest get materialised, the rest of the page is skipped while parsing
+
+    Returns:
+        dict -- {select's id: {option: code}}
+    """
+    contents = readinput("default.html")
+    strainer = SoupStrainer("select", id=list(SELECT_IDS))
+    soup = BeautifulSoup(contents, "lxml", parse_only=strainer)
+    return {select["id"]: {tag.string: tag["value"] for tag in select.find_all("option")}
+            for select in soup.find_all("select")}
+
+
+def build_selects(force=False):
+    """Build select code maps or load them from cache if 'default.html' hasn't changed
+
+    Keyword Arguments:
+        force {bool} -- a flag to rebuild the maps even if the cached ones are valid (default: {False})
+
+    Returns:
+        dict -- {select's id: {option: code}}
+    """
+    digest = file_digest(os.path.join(INPUT_PATH, "default.html"))
+    selects = None if force else load_cache("selects", digest)
+    if selects is None:
+        selects = scrape_selects()
+        dump_cache("selects", digest, selects)
+    return selects
+
+
+_SELECTS = LazyMapping(build_selects)
 
 
 def scrape_citycodes():
@@ -45,11 +79,7 @@ def scrape_citycodes():
     Returns:
         dict -- city code map
     """
-    contents = readinput("default.html")
-    soup = BeautifulSoup(contents, "lxml")
-    result = soup.find("select", id="base_city")
-    result = result.find_all("option")
-    return {tag.string: tag["value"] for tag in result}
+    return dict(_SELECTS["base_city"])
 
 
 def scrape_heightranges():
@@ -58,11 +88,55 @@ def scrape_heightranges():
     Returns:
         dict -- height range code map
     """
-    contents = readinput("default.html")
-    soup = BeautifulSoup(contents, "lxml")
-    result = soup.find("select", id="base_height_range")
-    result = result.find_all("option")
-    return {tag.string: tag["value"] for tag in result}
+    return dict(_SELECTS["base_height_range"])
+
+
+def extract_hooked(chunks, hook, after="<script"):
+    """Extract JSON value assigned in javascript right after the hook provided.
+
+    Page contents are scanned chunk by chunk without building a document tree, so the extraction can finish before the whole page is read
+
+    Arguments:
+        chunks {iterable} -- consecutive chunks of page contents (str)
+        hook {str} -- a string directly preceding the value to extract, e.g. 'var buildings = '
+
+    Keyword Arguments:
+        after {str} -- a string the hook is looked for only after, so it isn't matched outside of scripts (default: {"<script"})
+
+    Raises:
+        json.JSONDecodeError -- when the value can't be decoded
+
+    Returns:
+        list / dict / None -- decoded value or 'None' if the hook hasn't been found
+    """
+    decoder = json.JSONDecoder()
+    markers = [after, hook] if after else [hook]  # looked for one after another
+    parts, tail = [], ""
+    for chunk in chunks:
+        if markers:
+            chunk = tail + chunk
+            while markers:
+                pos = chunk.find(markers[0])
+                if pos == -1:
+                    break
+                chunk = chunk[pos + len(markers.pop(0)):]
+            if markers:
+                # in case the marker is split between chunks
+                tail = chunk[max(0, len(chunk) - len(markers[0]) + 1):]
+                continue
+            tail = ""
+        parts.append(chunk)
+        # the assignment statement ends right after the value, so decoding is attempted only then
+        window = tail + chunk
+        tail = chunk[-1:]
+        if "];" in window or "};" in window:
+            try:
+                return decoder.raw_decode("".join(parts).lstrip())[0]
+            except json.JSONDecodeError:
+                continue  # a false alarm (e.g. the terminator within a string)
+    if markers:
+        return None
+    return decoder.raw_decode("".join(parts).lstrip())[0]
 
 
 class Scraper:
@@ -70,21 +144,33 @@ class Scraper:
 
     HOOK = "var buildings = "
     # keys of below dicts are the same as options in "Base Data Range" form on the website
-    CITYCODE_MAP = scrape_citycodes()
-    HEIGHTRANGE_MAP = scrape_heightranges()
-    COLUMNS = ["id", "city", "city_id", "city_locode", "city_slug", "completed", "country_chinese",
-               "country_id", "country_locode", "country_slug", "floors_above", "functions",   "height_architecture", "height_architecture_formatted",               "height_architecture_ft_formatted", "image", "latitude", "longitude",              "name", "name_linked", "rank", "retrofit_functions", "start", "status",            "structural_material", "url"]
+    CITYCODE_MAP = LazyMapping(scrape_citycodes)
+    HEIGHTRANGE_MAP = LazyMapping(scrape_heightranges)
+    COLUMNS = [col for col, _ in STORE_COLUMNS]
 
-    def __init__(self, height_range="All", trim_heightless=True, height_floor=75):
+    def __init__(self, height_range="All", trim_heightless=True, height_floor=75,
+                 workers=SCRAPE_WORKERS, rate=SCRAPE_RATE, url=URL, cache=True,
+                 transport=HTTP_TRANSPORT):
         """
         Keyword Arguments:
             height_range {str} -- height range options from the website's GUI: 'All', 'Under 100m', '150m+', '200m+', '250m+', '300m+', '350m+', '400m+', '450m+' and '500m+' (default: {"All"})
             trim_heightless {bool} -- decides if records with no height should be trimmed (default: {True})
             height_floor {int} -- minimum tower's height for scrapin (default: {75})
+            workers {int} -- number of cities scraped concurrently by bulk scraping methods (default: {SCRAPE_WORKERS})
+            rate {float} -- maximum number of requests per second made to a single host, falsy for no limit (default: {SCRAPE_RATE})
+            url {str} -- URL template to be formatted with city and height range codes (default: {URL})
+            cache {bool / scraperscrape.fetch.ResponseCache} -- a response cache, 'True' for the default one or falsy for no caching (default: {True})
+            transport {str / requests.adapters.BaseAdapter} -- 'live', 'record' or 'replay' (see 'scraperscrape.replay.gettransport') or an adapter to send requests with (default: {HTTP_TRANSPORT})
         """
         self.height_range = height_range
         self.trim_heightless = trim_heightless
         self.height_floor = height_floor
+        self.workers = workers
+        self.url = url
+        pool_size = max(workers, HTTP_POOL_SIZE)
+        self.fetcher = Fetcher(cache=cache, ratelimiter=RateLimiter(rate, SCRAPE_BURST),
+                               pool_size=pool_size,
+                               transport=gettransport(transport, pool_size=pool_size))
 
     def scrape_city(self, city):
         """Scrape city towers data by looking through the page's source and finding javascript tag that declares variable 'buildings' that gets towers data in the form of a javascript object assigned. The extracted object is turned into Python dict and returned
@@ -98,19 +184,18 @@ class Scraper:
         Returns:
             dict -- scraped towers data
         """
-        url = URL.format(self.CITYCODE_MAP[city], self.HEIGHTRANGE_MAP[self.height_range])
-        contents = requests.get(url).text
-        soup = BeautifulSoup(contents, "lxml")
+        url = self.url.format(self.CITYCODE_MAP[city], self.HEIGHTRANGE_MAP[self.height_range])
+        start = time.perf_counter()
+        chunks = METRICS.timed_iter("scrape.download", self.fetcher.iter_text(url))
         try:
-            script_tag = next(tag for tag in soup.find_all("script", type="text/javascript")
-                              if self.HOOK in tag.text)
-        except StopIteration:
+            result = extract_hooked(chunks, self.HOOK)
+        finally:
+            chunks.close()  # stops downloading as soon as the data has been extracted
+        if METRICS.enabled:  # parsing is interleaved with downloading
+            METRICS.addtime("scrape.parse", time.perf_counter() - start - chunks.waited)
+        if result is None:
             raise PageWrongFormatError(
                 "Page for '{}' seems to have wrong format (missing '{}' string).\nFull URL: {}".format(city, self.HOOK, url))
-        # get javascript object containg towers' data from page's source
-        result = script_tag.text.strip()
-        result = "".join(result.split(self.HOOK)[1:])[:-1]  # trim trailing ';'
-        result = json.loads(result)
 
         if self.trim_heightless:
             result = [tower for tower in result if tower["height_architecture"] not in ("-", "")]
@@ -119,162 +204,178 @@ class Scraper:
             result = [tower for tower in result if float(tower["height_architecture"])
                       >= self.height_floor]
 
+        METRICS.count("scrape.cities")
+        METRICS.observe("scrape.towers", len(result))
         return result
 
-    # TODO: implement saving to sqlite database, leave dumping to JSON as an option
-    def scrape_allcities(self, start=None, end=None):
-        """Scrape all cities data and dump it to JSON files. Optionally define a range to scrape
+    def _scrape_cities(self, start=None, end=None, skip=None):
+        """Scrape cities in range, concurrently if more than one worker is set. Results are yielded in the order of cities regardless.
+
+        Cities that fail to be fetched (after retries) aren't yielded, so they can be scraped again on the next run
 
         Keyword Arguments:
             start {int} -- start of optional range (default: {None})
             end {int} -- end of optional range (default: {None})
+            skip {callable} -- a predicate deciding if a city (passed as its name) should be skipped (default: {None})
+
+        Yields:
+            tuple -- (city's ordinal number (1-based), city, list of scraped towers or 'None' if skipped)
         """
         start = start if start is not None else 0
         end = end if end is not None else len(self.CITYCODE_MAP) - 1
 
-        cities = (city for city in self.CITYCODE_MAP.keys() if city != "All")
-        for i, city in enumerate(itertools.islice(cities, start, end)):
+        def scrape(city):
+            if skip and skip(city):
+                return None
             try:
-                towers = self.scrape_city(city)
+                return self.scrape_city(city)
             except PageWrongFormatError:
-                towers = []
-            if towers:
-                data = {
-                    "timestamp": timestamp(),
-                    "towers": towers
-                }
-
-                destpath = os.path.join(OUTPUT_JSON_PATH, "{}.json".format(city.replace(" ", "_")))
-                with open(destpath, mode="w") as jsonfile:
-                    json.dump(data, jsonfile, sort_keys=True, indent=4)
-
-            print("{}: Scraped {} {} for '{}'...".format(
-                str(i + start + 1).zfill(4),
-                str(len(towers)),
-                "towers" if len(towers) != 1 else "tower",
-                city
-            ))
-            time.sleep(0.02)
-
-    def scrape_alltowers(self, start=None, end=None):
-        tstamp = timestamp(underscores=True)
-        start = start if start is not None else 0
-        end = end if end is not None else len(self.CITYCODE_MAP) - 1
+                return []
+            except requests.RequestException as err:
+                return err
+
+        def filterfailed(results):
+            for number, city, towers in results:
+                if isinstance(towers, requests.RequestException):
+                    print("{}: Failed to scrape '{}' ({})...".format(str(number).zfill(4), city,
+                                                                     towers))
+                    METRICS.count("scrape.failed")
+                    continue
+                yield number, city, towers
+
+        cities = list(itertools.islice((city for city in self.CITYCODE_MAP.keys() if city != "All"),
+                                       start, end))
+        if self.workers > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                yield from filterfailed(zip(itertools.count(start + 1), cities,
+                                            executor.map(scrape, cities)))
+        else:
+            yield from filterfailed(zip(itertools.count(start + 1), cities, map(scrape, cities)))
 
-        alltowers = []
-        cities = (city for city in self.CITYCODE_MAP.keys() if city != "All")
-        for i, city in enumerate(itertools.islice(cities, start, end)):
-            try:
-                towers = self.scrape_city(city)
-            except PageWrongFormatError:
-                towers = []
-
-            alltowers.extend(towers)
-
-            print("{}: Scraped {} {} for '{}'...".format(
-                str(i + start + 1).zfill(4),
-                str(len(towers)),
-                "towers" if len(towers) != 1 else "tower",
-                city
-            ))
-            time.sleep(0.02)
-
-        pprint(alltowers)
-
-        # DEBUG MODE
-        # create table for this snapshot of towers data
-        tablename = f"towers_{tstamp}"
-        # path = os.path.join(OUTPUT_PATH, "tower.db")
-        with sqlite3.connect(":memory:") as conn:
-            # with sqlite3.connect(path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(""" CREATE TABLE {} (
-                id INTEGER PRIMARY KEY,
-                city TEXT,
-                city_id INTEGER,
-                city_locode TEXT,
-                city_slug TEXT,
-                completed INTEGER,
-                country_chinese TEXT,
-                country_id INTEGER,
-                country_locode TEXT,
-                country_slug TEXT,
-                floors_above INTEGER,
-                functions TEXT,
-                height_architecture REAL,
-                height_architecture_formatted REAL,
-                height_architecture_ft_formatted TEXT,
-                image TEXT,
-                latitude REAL,
-                longitude REAL,
-                name TEXT,
-                name_linked TEXT,
-                rank INTEGER,
-                retrofit_functions TEXT,
-                start INTEGER,
-                status TEXT,
-                structural_material TEXT,
-                url TEXT
-            ) """.format(tablename))
-            conn.commit()
-
-            # populate table
-            for tower in alltowers:
-                cursor.execute("INSERT INTO {} VALUES ({})".format(
-                    tablename,
-                    "{}".format("?, " * len(self.COLUMNS))[:-2]
-                ), [tower.get(col) for col in self.COLUMNS])
-            conn.commit()
-
-            print("=" * 50)
-            print("=" * 50)
-            print("=" * 50)
-            cursor.execute("SELECT * FROM {}".format(tablename))
-            # pprint(cursor.fetchall())
-            fetched = []
-            for towertuple in cursor.fetchall():
-                fetched.append({k: v for k, v in zip(self.COLUMNS, towertuple)})
-            pprint(fetched)
+    @staticmethod
+    def _print_progress(number, city, towers):
+        print("{}: Scraped {} {} for '{}'...".format(
+            str(number).zfill(4),
+            str(len(towers)),
+            "towers" if len(towers) != 1 else "tower",
+            city
+        ))
+
+    def scrape_allcities(self, start=None, end=None, store=None, ttl=SCRAPE_TTL, manifest=None):
+        """Scrape all cities data and dump it to JSON files (see 'scrape_alltowers' for saving to SQLite database). Optionally define a range to scrape.
+
+        Progress is recorded in a manifest (saved every few cities and when the run ends, however it ends), so an interrupted run resumes about where it stopped: cities scraped into the store less than 'ttl' hours ago are skipped. Files of cities with unchanged data aren't rewritten
+
+        Keyword Arguments:
+            start {int} -- start of optional range (default: {None})
+            end {int} -- end of optional range (default: {None})
+            store {scraperscrape.store.JsonStore} -- a store to write to (default: {None})
+            ttl {float} -- number of hours scraped data stays fresh, falsy to scrape all cities anew (default: {SCRAPE_TTL})
+            manifest {scraperscrape.manifest.Manifest} -- a manifest to track progress in (default: {None})
+        """
+        store = store or JsonStore()
+        manifest = manifest or Manifest()
+        try:
+            for number, city, towers in self._scrape_cities(
+                    start, end, skip=lambda city: manifest.isfresh(store, city, ttl)):
+                if towers is None:
+                    print("{}: Skipped '{}' (scraped less than {} hours ago)...".format(
+                        str(number).zfill(4), city, ttl))
+                    METRICS.count("scrape.skipped")
+                    continue
+
+                digest = manifest.digest(towers)
+                if towers and (manifest.ischanged(store, city, digest)
+                               or not store.has_city(city)):
+                    data = {
+                        "timestamp": timestamp(),
+                        "towers": towers
+                    }
+                    with METRICS.timer("store.write"):
+                        store.write_city(city, data)
+                    METRICS.count("store.written")
+                with METRICS.timer("manifest.save"):
+                    manifest.record(store, city, digest)
+
+                self._print_progress(number, city, towers)
+        finally:
+            with METRICS.timer("manifest.save"):
+                manifest.save()
+
+    def scrape_alltowers(self, start=None, end=None, store=None):
+        """Scrape all cities data and save it to SQLite database as a new snapshot. Optionally define a range to scrape
+
+        Keyword Arguments:
+            start {int} -- start of optional range (default: {None})
+            end {int} -- end of optional range (default: {None})
+            store {scraperscrape.store.SqliteStore} -- a store to write to (default: {None})
+
+        Returns:
+            str -- the snapshot's name
+        """
+        store = store or SqliteStore()
+
+        def citydata():
+            for number, city, towers in self._scrape_cities(start, end):
+                self._print_progress(number, city, towers)
+                if towers:
+                    yield city, {
+                        "timestamp": timestamp(),
+                        "towers": towers
+                    }
+
+        return store.write_snapshot(citydata())
+
+
+def _towerfield(column):
+    """Make a read-only property of Tower taking its value from a column of the tower's table"""
+    return property(lambda self: self.table.get(column, self.row),
+                    doc=f"{column} (as scraped, or 'None' if missing)")
 
 
 class Tower:
-    """A skyscraper scraped"""
+    """A skyscraper scraped (a view onto a row of a towers table)"""
+
+    __slots__ = ("table", "row")
 
     def __init__(self, data):
         """
         Arguments:
             data {dict} -- scraped tower data
         """
-        self.data = data
-        self.id_ = self._parse_attribute("id")
-        self.name = self._parse_attribute("name")
-        self.height = self._parse_attribute("height_architecture")
-        self.floors = self._parse_attribute("floors_above")
-        self.status = self._parse_attribute("status")
-        self.start = self._parse_attribute("start")
-        self.completed = self._parse_attribute("completed")
-        self.functions = self._parse_attribute("functions")
-        self.rank = self._parse_attribute("rank")
-        self.latitude = self._parse_attribute("latitude")
-        self.longitude = self._parse_attribute("longitude")
-
-    def __str__(self):
-        return "{}, {:.0f}m".format(self.name, self.height)
+        self.table = TowerTable([data])
+        self.row = 0
 
-    def _parse_attribute(self, key):
-        """Parse attribute
+    @classmethod
+    def fromrow(cls, table, row):
+        """Make a tower viewing a row of towers table
 
         Arguments:
-            key {str} -- key for scraped data dict
+            table {scraperscrape.table.TowerTable} -- a table of towers
+            row {int} -- a row index
 
         Returns:
-            str / int / float / None -- parsed attribute or 'None'
+            scraper.Tower -- a tower
         """
-        try:
-            attribute = self.data[key] if self.data[key] not in ("-", "") else None
-        except KeyError:
-            attribute = None
-        return attribute
+        tower = cls.__new__(cls)
+        tower.table = table
+        tower.row = row
+        return tower
+
+    id_ = _towerfield("id_")
+    name = _towerfield("name")
+    height = _towerfield("height")
+    floors = _towerfield("floors")
+    status = _towerfield("status")
+    start = _towerfield("start")
+    completed = _towerfield("completed")
+    functions = _towerfield("functions")
+    rank = _towerfield("rank")
+    latitude = _towerfield("latitude")
+    longitude = _towerfield("longitude")
+
+    def __str__(self):
+        return "{}, {:.0f}m".format(self.name, self.height)
 
     def getdescription(self):
         """Get description listing main properties of this tower
@@ -303,6 +404,138 @@ class Tower:
         return desc[:-1] if desc[-1] == "\n" else desc
 
 
+UNCOMPLETED_STATUSES = ("UCT", "STO", "UC")
+# tiers ordered by their lower height boundary, for bisecting
+TIERS = sorted(RATINGS_MATRIX, key=lambda tier: RATINGS_MATRIX[tier][0])
+TIER_BOUNDARIES = [RATINGS_MATRIX[tier][0] for tier in TIERS]
+TIER_SCORES = [RATINGS_MATRIX[tier][1] for tier in TIERS]
+
+
+def count_tiers(heights):
+    """Count heights falling into each tier in a single bisecting pass over them
+
+    Arguments:
+        heights {iterable} -- towers' heights
+
+    Raises:
+        ValueError -- when height out of expected range is encountered
+
+    Returns:
+        list -- a histogram: number of heights per tier (ordered as 'TIERS')
+    """
+    histogram = [0] * len(TIERS)
+    for height in heights:
+        histogram[_tierindex(height)] += 1
+    return histogram
+
+
+def _tierindex(height):
+    """Get index of the tier (in 'TIERS') height falls into"""
+    index = bisect_right(TIER_BOUNDARIES, height) - 1
+    if index < 0:
+        raise ValueError("Unexpected height value (lesser than: {}) in parsed data".format(
+            int(TIER_BOUNDARIES[0])))
+    return index
+
+
+def count_statustiers(statuses, heights):
+    """Count towers falling into each tier separately for each status
+
+    Arguments:
+        statuses {iterable} -- towers' statuses
+        heights {iterable} -- towers' heights (in the same order)
+
+    Raises:
+        ValueError -- when height out of expected range is encountered
+
+    Returns:
+        dict -- {status: histogram (as returned by 'count_tiers')}
+    """
+    statustiers = {}
+    for status, height in zip(statuses, heights):
+        if status not in statustiers:
+            statustiers[status] = [0] * len(TIERS)
+        statustiers[status][_tierindex(height)] += 1
+    return statustiers
+
+
+def sum_statustiers(statustiers_list):
+    """Sum per-status tier histograms (e.g. of cities in a country)
+
+    Arguments:
+        statustiers_list {iterable} -- dicts as returned by 'count_statustiers'
+
+    Returns:
+        dict -- {status: summed histogram}
+    """
+    total = {}
+    for statustiers in statustiers_list:
+        for status, histogram in statustiers.items():
+            if status not in total:
+                total[status] = [0] * len(TIERS)
+            total[status] = [a + b for a, b in zip(total[status], histogram)]
+    return total
+
+
+def merge_statustiers(statustiers, *statuses):
+    """Merge per-status tier histograms into one
+
+    Arguments:
+        statustiers {dict} -- {status: histogram} (as returned by 'count_statustiers')
+        statuses {list} -- variable number of statuses to merge packed into list (all if not provided)
+
+    Returns:
+        list -- a histogram (as returned by 'count_tiers')
+    """
+    histograms = [histogram for status, histogram in statustiers.items()
+                  if not statuses or status in statuses]
+    return [sum(counts) for counts in zip(*histograms)] if histograms else [0] * len(TIERS)
+
+
+def describe_tiers(histogram):
+    """Describe a tiers histogram, e.g.: 'I: 4, II: 2'
+
+    Arguments:
+        histogram {list} -- a histogram (as returned by 'count_tiers')
+
+    Returns:
+        str -- a description of non-empty tiers
+    """
+    return ", ".join("{}: {}".format(tier.name, count) for tier, count
+                     in sorted(zip(TIERS, histogram), key=lambda item: item[0].value) if count)
+
+
+def rate_tiers(histogram):
+    """Calculate rating of a tiers histogram
+
+    Arguments:
+        histogram {list} -- number of towers per tier (as returned by 'count_tiers')
+
+    Returns:
+        int -- calculated rating
+    """
+    return sum(count * score for count, score in zip(histogram, TIER_SCORES))
+
+
+def rate_batch(heightgroups):
+    """Classify and rate many groups of heights (e.g. of many cities) at once
+
+    Arguments:
+        heightgroups {iterable} -- iterables of towers' heights, one per group
+
+    Raises:
+        ValueError -- when height out of expected range is encountered
+
+    Returns:
+        list -- (histogram, rating) tuples, one per group
+    """
+    results = []
+    for heights in heightgroups:
+        histogram = count_tiers(heights)
+        results.append((histogram, rate_tiers(histogram)))
+    return results
+
+
 def get_tiers(towers):
     """Group towers into tiers based on their height and count them
 
@@ -330,41 +563,8 @@ def get_tiers(towers):
         6: 421
         >>>
     """
-
-    def get_tier(tower):
-        """Get tier designation
-
-        Arguments:
-            tower {scraper.Tower} -- a tower
-
-        Raises:
-            ValueError -- when unexpected height value is encountered
-
-        Returns:
-            str -- a tier designation
-        """
-        heightmap = {k: v[0] for k, v in RATINGS_MATRIX.items()}
-        if tower.height >= heightmap[Tier.I] and tower.height < heightmap[Tier.II]:
-            return Tier.I
-        elif tower.height >= heightmap[Tier.II] and tower.height < heightmap[Tier.III]:
-            return Tier.II
-        elif tower.height >= heightmap[Tier.III] and tower.height < heightmap[Tier.IV]:
-            return Tier.III
-        elif tower.height >= heightmap[Tier.IV] and tower.height < heightmap[Tier.V]:
-            return Tier.IV
-        elif tower.height >= heightmap[Tier.V] and tower.height < heightmap[Tier.VI]:
-            return Tier.V
-        elif tower.height >= heightmap[Tier.VI]:
-            return Tier.VI
-        else:
-            raise ValueError("Unexpected height value (lesser than: {}) in parsed data".format(
-                int(heightmap[Tier.I])))
-
-    tiers = Counter()
-    for tower in towers:
-        tier = get_tier(tower)
-        tiers[tier] += 1
-    return tiers
+    histogram = count_tiers(tower.height for tower in towers)
+    return Counter({tier: count for tier, count in zip(TIERS, histogram) if count})
 
 
 def calculate_rating(towers):
@@ -378,76 +578,75 @@ def calculate_rating(towers):
 
     Tiers' point scoring progression inspired by F1 Scoring System(https://en.wikipedia.org/wiki/List_of_Formula_One_World_Championship_points_scoring_systems)
     """
-    scoremap = {k: v[1] for k, v in RATINGS_MATRIX.items()}
-    return sum(count * scoremap[tier] for tier, count in get_tiers(towers).items())
+    return rate_tiers(count_tiers(tower.height for tower in towers))
 
 
 class City:
     """A city with skyscrapers in it"""
 
-    CITY_REGION_MAP = {  # for region corrections in listed cities
-        "Yekaterinburg": "AS",
-        "Chelyabinsk": "AS",
-        "Surgut": "AS",
-        "Vladivostok": "AS",
-        "Tyumen": "AS",
-        "Novosibirsk": "AS",
-        "Krasnoyarsk": "AS",
-        "Istanbul": "EU"
-    }
+    CITY_REGION_MAP = CITY_REGION_MAP  # for region corrections in listed cities
 
     def __init__(self, data):
         """
         Arguments:
             data {dict} -- scraped city data
         """
-        self.data = data
-        self.timestamp = data["timestamp"]
-        self.name = data["towers"][0].get("city")
-        self.country = self._getcountry()
-        self.region = self._getregion()
-        self.towers = [Tower(towerdata) for towerdata in data["towers"]]
-        self.completed = [tower for tower in self.towers if tower.status == "COM"]
-        self.arch_toppedout = [tower for tower in self.towers if tower.status == "UCT"]
-        self.struct_toppedout = [tower for tower in self.towers if tower.status == "STO"]
-        self.under_construction = [tower for tower in self.towers if tower.status == "UC"]
-        self.rating = calculate_rating(self.towers)
-        self.uncompleted = self.getuncompleted()  # percentage (float)
+        with METRICS.timer("city.init"):
+            self.timestamp = data["timestamp"]
+            self.table = TowerTable(data["towers"])
+            self.name = self.table.get("city", 0)
+            self.country, self.region = self._locate()
+            self._aggregate()
         self.parentcity_name = SUBCITYMAP.get(self.name)  # 'None' if there's no parent city
 
-    def __str__(self):
-        return "{} ({})".format(self.name, self.rating)
+    def _aggregate(self):
+        """Count tiers per status and rate this city out of its table"""
+        self.statustiers = count_statustiers(self.table.values("status"),
+                                             self.table.values("height"))
+        self.rating = rate_tiers(merge_statustiers(self.statustiers))
+        self.uncompleted = self.getuncompleted()  # percentage (float)
 
-    def _getcountry(self):
-        """Get city's country
+    def _gettowers(self, *statuses):
+        """Get towers of this city, optionally only those of statuses provided
 
         Returns:
-            str -- country
+            list -- a list of Tower objects (views onto rows of this city's table)
         """
-        country = self.data["towers"][0].get("country_slug").title().replace("-", " ")
-        if country == "Lao Peoples Democratic Republic":
-            country = "Laos"
-        return country
+        mask = self.table.mask("status", *statuses) if statuses else None
+        return [Tower.fromrow(self.table, row) for row in self.table.rows(mask)]
 
-    def _getregion(self):
-        """Get city's region/continent
+    @property
+    def towers(self):
+        return self._gettowers()
 
-        Returns:
-            str -- region/continent
-        """
-        # TODO: adjust region of cities that are located in countries spanning more than one
-        # region (cases like Vladivostok being considered as an European city)
-        try:
-            region_code, _ = next((region_code, country) for region_code, countries in
-                                  COUNTRYMAP.items() for country in countries if country.casefold() == self.country.casefold())
-        except StopIteration:
-            return None
+    @property
+    def completed(self):
+        return self._gettowers("COM")
+
+    @property
+    def arch_toppedout(self):
+        return self._gettowers("UCT")
+
+    @property
+    def struct_toppedout(self):
+        return self._gettowers("STO")
 
-        # correct general region designation derived from country
-        if self.name in self.CITY_REGION_MAP:
-            region_code = self.CITY_REGION_MAP[self.name]
+    @property
+    def under_construction(self):
+        return self._gettowers("UC")
+
+    def __str__(self):
+        return "{} ({})".format(self.name, self.rating)
 
-        return REGIONMAP[region_code]
+    def _locate(self):
+        """Get city's country and region/continent
+
+        Returns:
+            tuple -- (country, region/continent or 'None' if the country is unmapped)
+        """
+        country, region_code = REGION_INDEX.lookup_slug(self.table.get("country_slug", 0),
+                                                        self.name)
+        return country, REGIONMAP.get(region_code)
 
     def getdescription(self):
         """Get description listing main properties of this city
@@ -463,10 +662,7 @@ class City:
             "tower" if len(self.towers) == 1 else "towers",
             ", ".join([tower.name for tower in self.towers])
         )
-        desc += "Tiers: {}\n".format(", ".join(["{}: {}".format(tier.name, count)
-                                                for tier, count
-                                                in sorted(get_tiers(self.towers).items(),
-                                                          key=lambda item: item[0].value)]))
+        desc += "Tiers: {}\n".format(describe_tiers(merge_statustiers(self.statustiers)))
         desc += "Rating: {}{}\n".format(
             self.rating,
             f" ({self.uncompleted:.1f}% uncompleted)" if self.uncompleted else ""
@@ -480,18 +676,149 @@ class City:
         Returns:
             float -- percentage of rating for uncompleted towers
         """
-        uc_rating = calculate_rating([*self.arch_toppedout, *self.struct_toppedout,
-                                      *self.under_construction])
+        uc_rating = rate_tiers(merge_statustiers(self.statustiers, *UNCOMPLETED_STATUSES))
         return uc_rating * 100 / self.rating
 
 
-def getcities(merge_subcities=True, region_filter=None, country_filter=None):
-    """Get cities from scraped data
+def _loadcity(path):
+    """Load city from JSON file (in a worker process)"""
+    with METRICS.timer("load.decode"):
+        data = readjson(path)
+    return City(data)
+
+
+def loadcities(store, workers=LOAD_WORKERS, paths=None):
+    """Load all cities from the store provided (bypassing in-process caches).
+
+    Cities stored as JSON files get decoded and constructed in a pool of worker processes if more than one worker is set. Either way, they're returned in the order they're stored in
+
+    Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store')
+
+    Keyword Arguments:
+        workers {int} -- number of worker processes (default: {LOAD_WORKERS})
+        paths {list} -- paths of JSON files to load instead of all the store's ones (default: {None})
+
+    Returns:
+        list -- a list of City objects
+    """
+    if isinstance(store, JsonStore):
+        paths = list(store.iter_paths()) if paths is None else paths
+        if workers > 1 and len(paths) > 1:
+            len(COUNTRYMAP)  # load it before forking, so workers don't load it each on their own
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_loadcity, paths,
+                                         chunksize=max(1, len(paths) // (workers * 4))))
+        return [_loadcity(path) for path in paths]
+    return [City(data) for data in store.iter_citydata()]
+
+
+# in-process caches of loaded cities: JSON files are cached one by one ({path: (file stamp, City)}),
+# other stores as a whole ({(store type, path): (store version, list of City objects)})
+_FILECACHE = {}
+_STORECACHE = {}
+# {JSON directory: {path: [file stamp, city name, country slug]}} - enough to filter without decoding
+_HEADERS = {}
+
+
+def clearcache():
+    """Clear in-process caches of loaded cities
+    """
+    _FILECACHE.clear()
+    _STORECACHE.clear()
+    _HEADERS.clear()
+
+
+def _getheaders(store):
+    """Get headers of the store's JSON files, persisted between runs"""
+    if store.path not in _HEADERS:
+        path = os.path.abspath(store.path)
+        _HEADERS[store.path] = load_cache(cache_name("headers", path), path) or {}
+    return _HEADERS[store.path]
+
+
+def _matches(header, region_filter, country_filter):
+    """Check if a city described by its header passes filters"""
+    _, name, country_slug = header
+    country, region_code = REGION_INDEX.lookup_slug(country_slug, name)
+    if country_filter and country != country_filter:
+        return False
+    if region_filter and REGIONMAP.get(region_code) != region_filter:
+        return False
+    return True
+
+
+def _loadfiles(store, region_filter=None, country_filter=None, workers=LOAD_WORKERS,
+               subcitymap=SUBCITYMAP):
+    """Load cities from the store's JSON files reusing those already loaded if their files haven't changed since. Files known not to be needed to pass filters aren't decoded at all.
+
+    Subsidiary cities get merged into their parents before filtering, so a subsidiary's file is needed when either it or its parent passes filters (they may lie in different countries or regions)
+
+    Returns:
+        list -- a list of City objects (in the order their files are stored in)
+    """
+    headers = _getheaders(store)
+    scanned = store.scan()
+    for path in set(_FILECACHE).difference(path for path, _ in scanned):
+        del _FILECACHE[path]  # removed from the store
+    # stamps get persisted as lists
+    current = {path: headers[path] for path, stamp in scanned
+               if path in headers and tuple(headers[path][0]) == stamp}
+    byname = {header[1]: header for header in current.values()}
+
+    def needed(path):
+        if path not in current or _matches(current[path], region_filter, country_filter):
+            return True
+        parent = subcitymap.get(current[path][1])
+        if parent is None:
+            return False
+        # a parent not known (yet) may pass filters
+        return parent not in byname or _matches(byname[parent], region_filter, country_filter)
+
+    entries = [(path, stamp) for path, stamp in scanned
+               if not (region_filter or country_filter) or needed(path)]
+
+    stamps = dict(entries)
+    topaths = [path for path, stamp in entries
+               if path not in _FILECACHE or _FILECACHE[path][0] != stamp]
+    METRICS.count("load.files_decoded", len(topaths))
+    METRICS.count("load.files_reused", len(entries) - len(topaths))
+    METRICS.count("load.files_filtered", len(scanned) - len(entries))
+    for path, city in zip(topaths, loadcities(store, workers, topaths)):
+        _FILECACHE[path] = stamps[path], city
+        headers[path] = [stamps[path], city.name, city.table.get("country_slug", 0)]
+    if topaths:
+        path = os.path.abspath(store.path)
+        dump_cache(cache_name("headers", path), path, headers)
+
+    return [_FILECACHE[path][1] for path, _ in entries]
+
+
+def _loadstore(store, workers=LOAD_WORKERS):
+    """Load all cities from a single-file store reusing those already loaded if the store hasn't changed since
+
+    Returns:
+        list -- a list of City objects (in the order they're stored in)
+    """
+    key, version = (type(store).__name__, os.path.abspath(store.path)), store.version()
+    if key not in _STORECACHE or _STORECACHE[key][0] != version:
+        _STORECACHE[key] = version, loadcities(store, workers)
+    return _STORECACHE[key][1]
+
+
+def getcities(merge_subcities=True, region_filter=None, country_filter=None, store=None,
+              workers=LOAD_WORKERS, subcitymap=SUBCITYMAP):
+    """Get cities from scraped data.
+
+    Loaded cities are cached in-process and reused for as long as their source doesn't change. Files of cities that don't pass filters (nor do their metro parents) aren't decoded (once they've been seen)
 
     Keyword Arguments:
         merge_subcities {bool} -- flag to merge or not subsidiary cities into their parent (default: {True})
         region_filter {str} -- a name of a region to narrow the output to (default: {None})
         country_filter {str} -- a name of a country to narrow the output to (default: {None})
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+        workers {int} -- number of worker processes to load cities with (default: {LOAD_WORKERS})
+        subcitymap {dict} -- {subsidiary city name: parent city name} to merge by (default: {SUBCITYMAP} - as set in settings)
 
     Raises:
         InvalidRegionError -- when invalid region filter is provided
@@ -500,22 +827,16 @@ def getcities(merge_subcities=True, region_filter=None, country_filter=None):
     Returns:
         list -- a list of City objects
     """
-    cities = []
-    for root, _, files in os.walk(OUTPUT_JSON_PATH):
-        for file in files:
-            path = os.path.join(root, file)
-            with open(path) as f:
-                data = json.load(f)
-            cities.append(City(data))
+    store = store or getstore()
+    with METRICS.timer("load.cities"):
+        if isinstance(store, JsonStore):
+            cities = _loadfiles(store, region_filter, country_filter, workers, subcitymap)
+        else:
+            cities = _loadstore(store, workers)
 
     if merge_subcities:
-        subcities = [city for city in cities if city.parentcity_name]
-        # merge subsidiary cities into their parents
-        for parentcity in [city for city in cities if city.name in set(SUBCITYMAP.values())]:
-            mergecities(parentcity,
-                        *[sc for sc in subcities if sc.parentcity_name == parentcity.name])
-        # filter out subsidiaries from the output
-        cities = [city for city in cities if city not in subcities]
+        with METRICS.timer("load.merge"):
+            cities = mergemetros(cities, subcitymap)
 
     if region_filter:
         cities = [city for city in cities if city.region == region_filter]
@@ -529,26 +850,23 @@ def getcities(merge_subcities=True, region_filter=None, country_filter=None):
     return sorted(cities, key=lambda city: city.rating, reverse=True)
 
 
-def getcity(city):
+def getcity(city, store=None):
     """Get city from scraped data
 
     Arguments:
         city {str} -- a name of the city
 
+    Keyword Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
+
     Raises:
-        InvalidCountryError -- when invalid country name is provided
+        InvalidCityError -- when invalid city name is provided
 
     Returns:
         scraper.City -- a city
     """
-    path = os.path.join(OUTPUT_JSON_PATH, "{}{}".format(city.replace(" ", "_"), ".json"))
-    try:
-        with open(path) as f:
-            data = json.load(f)
-    except IOError:
-        raise InvalidCityError(f"Invalid city name provided: {city}")
-
-    return City(data)
+    store = store or getstore()
+    return City(store.read_city(city))
 
 
 def mergecities(parentcity, *subcities):
@@ -561,19 +879,46 @@ def mergecities(parentcity, *subcities):
     Returns:
         scraper.City -- the parent city with merged subsidiaries
     """
-    towers = [tower for subcity in subcities for tower in subcity.towers]
-    # extending parentcity
-    parentcity.towers.extend(towers)
-    parentcity.completed = [tower for tower in parentcity.towers if tower.status == "COM"]
-    parentcity.arch_toppedout = [tower for tower in parentcity.towers if tower.status == "UCT"]
-    parentcity.struct_toppedout = [tower for tower in parentcity.towers if tower.status == "STO"]
-    parentcity.under_construction = [tower for tower in parentcity.towers if tower.status == "UC"]
-    parentcity.rating = calculate_rating(parentcity.towers)
+    # extending parentcity (with a new table, as the old one may be shared with a copy of it)
+    parentcity.table = TowerTable.concat(parentcity.table,
+                                         *[subcity.table for subcity in subcities])
+    # aggregates are summed up, not recounted
+    parentcity.statustiers = sum_statustiers([parentcity.statustiers,
+                                              *[subcity.statustiers for subcity in subcities]])
+    parentcity.rating += sum(subcity.rating for subcity in subcities)
     parentcity.uncompleted = parentcity.getuncompleted()  # percentage (float)
 
     return parentcity
 
 
+def mergemetros(cities, subcitymap=SUBCITYMAP):
+    """Merge subsidiary cities into their parents in a single pass. Parents get merged as copies (so cached cities are left intact) and subsidiaries are left out. A metro keeps its parent's country and region, even if some of its subsidiaries lie elsewhere
+
+    Arguments:
+        cities {list} -- a list of City objects
+
+    Keyword Arguments:
+        subcitymap {dict} -- {subsidiary city name: parent city name} (default: {SUBCITYMAP} - as set in settings)
+
+    Returns:
+        list -- a list of City objects (in the order provided, less subsidiaries)
+    """
+    subcities = {}  # {parent city name: list of its subsidiaries}
+    for city in cities:
+        if city.name in subcitymap:
+            subcities.setdefault(subcitymap[city.name], []).append(city)
+    parents = set(subcitymap.values())
+
+    merged = []
+    for city in cities:
+        if city.name in subcitymap:
+            continue
+        if city.name in parents:
+            city = mergecities(copy.copy(city), *subcities.get(city.name, []))
+        merged.append(city)
+    return merged
+
+
 class Country:
     """A country with skyscraper cities"""
 
@@ -586,15 +931,31 @@ class Country:
         self.name = name
         self.cities = cities
         self.region = cities[0].region
-        self.towers = [tower for city in self.cities for tower in city.towers]
-        self.completed = [tower for city in self.cities for tower in city.completed]
-        self.arch_toppedout = [tower for city in self.cities for tower in city.arch_toppedout]
-        self.struct_toppedout = [tower for city in self.cities for tower in city.struct_toppedout]
-        self.under_construction = [tower for city in self.cities for tower
-                                   in city.under_construction]
+        # rolled up from cities' aggregates, towers themselves are only listed on demand
+        self.statustiers = sum_statustiers(city.statustiers for city in self.cities)
         self.rating = sum(city.rating for city in self.cities)
         self.uncompleted = self.getuncompleted()  # percentage (float)
 
+    @property
+    def towers(self):
+        return [tower for city in self.cities for tower in city.towers]
+
+    @property
+    def completed(self):
+        return [tower for city in self.cities for tower in city.completed]
+
+    @property
+    def arch_toppedout(self):
+        return [tower for city in self.cities for tower in city.arch_toppedout]
+
+    @property
+    def struct_toppedout(self):
+        return [tower for city in self.cities for tower in city.struct_toppedout]
+
+    @property
+    def under_construction(self):
+        return [tower for city in self.cities for tower in city.under_construction]
+
     def __str__(self):
         return "{} ({})".format(self.name, self.rating)
 
@@ -611,10 +972,7 @@ class Country:
             "city" if len(self.cities) == 1 else "cities",
             ", ".join([city.name for city in self.cities])
         )
-        desc += "Tiers: {}\n".format(", ".join(["{}: {}".format(tier.name, count)
-                                                for tier, count
-                                                in sorted(get_tiers(self.towers).items(),
-                                                          key=lambda item: item[0].value)]))
+        desc += "Tiers: {}\n".format(describe_tiers(merge_statustiers(self.statustiers)))
         desc += "Rating: {}{}".format(
             self.rating,
             f" ({self.uncompleted:.1f}% uncompleted)" if self.uncompleted else ""
@@ -627,8 +985,7 @@ class Country:
         Returns:
             float -- percentage of rating for uncompleted towers
         """
-        uc_rating = calculate_rating([*self.arch_toppedout, *self.struct_toppedout,
-                                      *self.under_construction])
+        uc_rating = rate_tiers(merge_statustiers(self.statustiers, *UNCOMPLETED_STATUSES))
         return uc_rating * 100 / self.rating
 
 
@@ -654,8 +1011,11 @@ class Region(Country):
         Returns:
             list -- a list of scraper.Country objects sorted by rating in descending order
         """
-        return sorted([Country(name, [city for city in self.cities if city.country == name])
-                       for name in set(city.country for city in self.cities)],
+        groups = {}
+        for city in self.cities:
+            groups.setdefault(city.country, []).append(city)
+        # groups are in order of their first city, so ties keep the same order from run to run
+        return sorted([Country(name, cities) for name, cities in groups.items()],
                       key=lambda country: country.rating, reverse=True)
 
     def getdescription(self):
@@ -670,10 +1030,7 @@ class Region(Country):
             "country" if len(self.countries) == 1 else "countries",
             ", ".join([country.name for country in self.countries])
         )
-        desc += "Tiers: {}\n".format(", ".join(["{}: {}".format(tier.name, count)
-                                                for tier, count
-                                                in sorted(get_tiers(self.towers).items(),
-                                                          key=lambda item: item[0].value)]))
+        desc += "Tiers: {}\n".format(describe_tiers(merge_statustiers(self.statustiers)))
         desc += "Rating: {}{}".format(
             self.rating,
             f" ({self.uncompleted:.1f}% uncompleted)" if self.uncompleted else ""
@@ -689,8 +1046,9 @@ class World(Region):
         Arguments:
             cities {list} -- a list of City objects
         """
-        super().__init__("World", cities)
-        self.regions = self._getregions()
+        with METRICS.timer("world.init"):
+            super().__init__("World", cities)
+            self.regions = self._getregions()
 
     def __str__(self):
         return "{} ({})".format(self.name, self.rating)
@@ -699,10 +1057,14 @@ class World(Region):
         """Get regions with cities in this world
 
         Returns:
-            list -- a list of scraper.Region objects sorted by rating in descending order
+            list -- a list of scraper.Region objects sorted by rating in descending order (cities of unmapped countries have no region, so they're left out)
         """
-        return sorted([Region(name, [city for city in self.cities if city.region == name])
-                       for name in set(city.region for city in self.cities)],
+        groups = {}
+        for city in self.cities:
+            if city.region is not None:
+                groups.setdefault(city.region, []).append(city)
+        # groups are in order of their first city, so ties keep the same order from run to run
+        return sorted([Region(name, cities) for name, cities in groups.items()],
                       key=lambda region: region.rating, reverse=True)
 
     def getdescription(self):
@@ -717,10 +1079,7 @@ class World(Region):
             "region" if len(self.regions) == 1 else "regions",
             ", ".join([region.name for region in self.regions])
         )
-        desc += "Tiers: {}\n".format(", ".join(["{}: {}".format(tier.name, count)
-                                                for tier, count
-                                                in sorted(get_tiers(self.towers).items(),
-                                                          key=lambda item: item[0].value)]))
+        desc += "Tiers: {}\n".format(describe_tiers(merge_statustiers(self.statustiers)))
         desc += "Rating: {}{}".format(
             self.rating,
             f" ({self.uncompleted:.1f}% uncompleted)" if self.uncompleted else ""
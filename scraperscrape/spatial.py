@@ -0,0 +1,272 @@
+"""
+
+    scraperscrape.spatial
+    ~~~~~~~~~~~~~~~~~~~
+    Find towers by their location: within a radius, within a bounding box or nearest to a point
+
+"""
+
+import math
+from array import array
+
+from scraperscrape.constants import SPATIAL_CELL
+from scraperscrape.scraper import Tower
+
+EARTH_RADIUS = 6371.0088  # mean radius (in km)
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180  # along a meridian
+HALF_CIRCUMFERENCE = math.pi * EARTH_RADIUS  # the greatest distance between two points (in km)
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Get great-circle distance between two points
+
+    Arguments:
+        lat1 {float} -- latitude of the first point (in degrees)
+        lon1 {float} -- longitude of the first point (in degrees)
+        lat2 {float} -- latitude of the second point (in degrees)
+        lon2 {float} -- longitude of the second point (in degrees)
+
+    Returns:
+        float -- the distance (in km)
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2
+         + math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a)))
+
+
+class SpatialIndex:
+    """Towers bucketed into a grid of latitude/longitude cells.
+
+    Queries only look into cells that may hold towers within reach and check exact distances there. Towers without coordinates (blank or '0, 0' in scraped data) aren't indexed
+    """
+
+    def __init__(self, cities, cell=SPATIAL_CELL):
+        """
+        Arguments:
+            cities {list} -- a list of City objects (with subsidiary cities not merged, so no tower is indexed twice)
+
+        Keyword Arguments:
+            cell {float} -- size of a grid cell (in degrees, 0.1 is about 11 km along a meridian) (default: {SPATIAL_CELL})
+        """
+        self.cities = cities
+        self.cell = cell
+        self.columns = math.ceil(360 / cell)
+        self.lats, self.lons = array("d"), array("d")
+        self.cityof, self.rowof = array("I"), array("I")
+        cells = {}
+        for i, city in enumerate(cities):
+            table = city.table
+            latitudes, longitudes = table.columns["latitude"], table.columns["longitude"]
+            for row in range(len(table)):
+                lat, lon = latitudes[row], longitudes[row]
+                if not isinstance(lat, (int, float)) or not isinstance(lon, (int, float)) \
+                        or (lat == 0 and lon == 0):
+                    continue
+                cells.setdefault(self._cellof(lat, lon), []).append(len(self.lats))
+                self.lats.append(lat)
+                self.lons.append(lon)
+                self.cityof.append(i)
+                self.rowof.append(row)
+        self.cells = {key: array("I", points) for key, points in cells.items()}
+
+    def __len__(self):
+        return len(self.lats)
+
+    def _cellof(self, lat, lon):
+        return (min(int((lat + 90) // self.cell), math.ceil(180 / self.cell) - 1),
+                int((lon + 180) // self.cell) % self.columns)
+
+    def tower(self, point):
+        """Get a tower indexed
+
+        Arguments:
+            point {int} -- the tower's position in the index
+
+        Returns:
+            scraper.Tower -- the tower
+        """
+        return Tower.fromrow(self.cities[self.cityof[point]].table, self.rowof[point])
+
+    def _cover(self, south, north, west=None, east=None):
+        """Get points in cells covering a latitude band and (optionally) a longitude range, which may cross the antimeridian"""
+        rows = range(self._cellof(max(south, -90), 0)[0], self._cellof(min(north, 90), 0)[0] + 1)
+        if west is None or east - west >= 360:
+            columns = None  # all the way around
+        else:
+            first, last = self._cellof(0, west)[1], self._cellof(0, east)[1]
+            span = (last - first) % self.columns + 1
+            columns = {(first + j) % self.columns for j in range(span)}
+        if len(rows) * (len(columns) if columns is not None else self.columns) > len(self.cells):
+            # cheaper to go over cells occupied than over cells covered
+            for (row, column), points in self.cells.items():
+                if row in rows and (columns is None or column in columns):
+                    yield from points
+            return
+        for row in rows:
+            for column in (columns if columns is not None else range(self.columns)):
+                yield from self.cells.get((row, column), ())
+
+    def _candidates(self, lat, lon, km):
+        """Get points in cells that may hold points within a distance of a point (a bounding box of the circle)"""
+        dlat = km / KM_PER_DEGREE
+        angle = km / EARTH_RADIUS
+        coslat = math.cos(math.radians(lat))
+        if abs(lat) + dlat >= 90 or coslat <= math.sin(angle):
+            return self._cover(lat - dlat, lat + dlat)  # the circle reaches a pole
+        dlon = math.degrees(math.asin(math.sin(angle) / coslat))
+        return self._cover(lat - dlat, lat + dlat, lon - dlon, lon + dlon)
+
+    def _within(self, lat, lon, km, points, where):
+        """Get (distance, point) of points within a distance of a point, nearest first"""
+        phi, lam = math.radians(lat), math.radians(lon)
+        cosphi = math.cos(phi)
+        limit = math.sin(min(km, HALF_CIRCUMFERENCE) / (2 * EARTH_RADIUS)) ** 2
+        lats, lons = self.lats, self.lons
+        found = []
+        for point in points:
+            phi2 = math.radians(lats[point])
+            a = (math.sin((phi2 - phi) / 2) ** 2
+                 + cosphi * math.cos(phi2) * math.sin((math.radians(lons[point]) - lam) / 2) ** 2)
+            if a <= limit and (where is None or where(self.tower(point))):
+                found.append((2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(a))), point))
+        found.sort()
+        return found
+
+    def radius(self, lat, lon, km, min_height=None, where=None):
+        """Find towers within a distance of a point
+
+        Arguments:
+            lat {float} -- latitude of the point (in degrees)
+            lon {float} -- longitude of the point (in degrees)
+            km {float} -- the distance (in km)
+
+        Keyword Arguments:
+            min_height {float} -- minimum height of towers to find (in meters) (default: {None})
+            where {callable} -- a predicate towers found have to satisfy (given a scraper.Tower) (default: {None})
+
+        Returns:
+            list -- (distance in km, scraper.Tower) tuples, nearest first
+        """
+        where = self._where(min_height, where)
+        return [(distance, self.tower(point)) for distance, point
+                in self._within(lat, lon, km, self._candidates(lat, lon, km), where)]
+
+    def bbox(self, south, west, north, east, min_height=None, where=None):
+        """Find towers within a bounding box. A box crossing the antimeridian has its west edge east of its east one
+
+        Arguments:
+            south {float} -- latitude of the south edge (in degrees)
+            west {float} -- longitude of the west edge (in degrees)
+            north {float} -- latitude of the north edge (in degrees)
+            east {float} -- longitude of the east edge (in degrees)
+
+        Keyword Arguments:
+            min_height {float} -- minimum height of towers to find (in meters) (default: {None})
+            where {callable} -- a predicate towers found have to satisfy (given a scraper.Tower) (default: {None})
+
+        Returns:
+            list -- scraper.Tower objects
+        """
+        where = self._where(min_height, where)
+        if east < west:
+            east += 360
+        found = []
+        for point in self._cover(south, north, west, east):
+            lat, lon = self.lats[point], self.lons[point]
+            if lon < west:
+                lon += 360
+            if south <= lat <= north and west <= lon <= east:
+                tower = self.tower(point)
+                if where is None or where(tower):
+                    found.append(tower)
+        return found
+
+    def nearest(self, lat, lon, k=1, min_height=None, where=None):
+        """Find towers nearest to a point. The search radius starts at a cell's size and doubles until k towers are found within it
+
+        Arguments:
+            lat {float} -- latitude of the point (in degrees)
+            lon {float} -- longitude of the point (in degrees)
+
+        Keyword Arguments:
+            k {int} -- number of towers to find (default: {1})
+            min_height {float} -- minimum height of towers to find (in meters) (default: {None})
+            where {callable} -- a predicate towers found have to satisfy (given a scraper.Tower) (default: {None})
+
+        Returns:
+            list -- (distance in km, scraper.Tower) tuples, nearest first
+        """
+        where = self._where(min_height, where)
+        km = self.cell * KM_PER_DEGREE
+        while True:
+            # towers beyond the radius are farther than any within it, so k found within it are the nearest
+            found = self._within(lat, lon, km, self._candidates(lat, lon, km), where)
+            if len(found) >= k or km >= HALF_CIRCUMFERENCE:
+                return [(distance, self.tower(point)) for distance, point in found[:k]]
+            km *= 2
+
+    def radius_bulk(self, points, km, min_height=None, where=None):
+        """Find towers within a distance of each of many points. Points falling into the same cell share cells looked into
+
+        Arguments:
+            points {iterable} -- (latitude, longitude) tuples
+            km {float} -- the distance (in km)
+
+        Keyword Arguments:
+            min_height {float} -- minimum height of towers to find (in meters) (default: {None})
+            where {callable} -- a predicate towers found have to satisfy (given a scraper.Tower) (default: {None})
+
+        Returns:
+            list -- results of each point in order (see 'radius')
+        """
+        where = self._where(min_height, where)
+        points = list(points)
+        groups = {}
+        for i, (lat, lon) in enumerate(points):
+            groups.setdefault(self._cellof(lat, lon), []).append(i)
+
+        results = [None] * len(points)
+        for (row, column), members in groups.items():
+            if len(members) == 1:
+                lat, lon = points[members[0]]
+                results[members[0]] = self.radius(lat, lon, km, where=where)
+                continue
+            # the circle around any point of the cell fits into the one around its center widened by half the cell's diagonal
+            south = row * self.cell - 90
+            west = column * self.cell - 180
+            center = south + self.cell / 2, west + self.cell / 2
+            reach = km + max(haversine(*center, south, west),
+                             haversine(*center, south + self.cell, west))
+            candidates = list(self._candidates(*center, reach))
+            for i in members:
+                lat, lon = points[i]
+                results[i] = [(distance, self.tower(point)) for distance, point
+                              in self._within(lat, lon, km, candidates, where)]
+        return results
+
+    def nearest_bulk(self, points, k=1, min_height=None, where=None):
+        """Find towers nearest to each of many points
+
+        Arguments:
+            points {iterable} -- (latitude, longitude) tuples
+
+        Keyword Arguments:
+            k {int} -- number of towers to find for each point (default: {1})
+            min_height {float} -- minimum height of towers to find (in meters) (default: {None})
+            where {callable} -- a predicate towers found have to satisfy (given a scraper.Tower) (default: {None})
+
+        Returns:
+            list -- results of each point in order (see 'nearest')
+        """
+        return [self.nearest(lat, lon, k, min_height, where) for lat, lon in points]
+
+    @staticmethod
+    def _where(min_height, where):
+        """Combine a minimum height with a predicate"""
+        if min_height is None:
+            return where
+        if where is None:
+            return lambda tower: tower.height is not None and tower.height >= min_height
+        return lambda tower: (tower.height is not None and tower.height >= min_height
+                              and where(tower))
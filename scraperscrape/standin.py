@@ -0,0 +1,264 @@
+"""
+
+    scraperscrape.standin
+    ~~~~~~~~~~~~~~~~~~~
+    Stand in for the scraped website locally: serve city pages made out of stored data with configurable latency, jitter and errors
+
+"""
+
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from scraperscrape.constants import (URL, STANDIN_PORT, STANDIN_LATENCY, STANDIN_JITTER,
+                                     STANDIN_ERROR_RATE, STANDIN_BANDWIDTH)
+from scraperscrape.errors import InvalidCityError
+from scraperscrape.scraper import Scraper
+from scraperscrape.store import getstore
+from scraperscrape.utils import readinput
+
+CHUNK_SIZE = 16384  # number of bytes written at once (and throttled when bandwidth is limited)
+
+
+def makepage(towers, scaffold=None):
+    """Make a skyscrapercenter-like city page with the towers data provided
+
+    Arguments:
+        towers {list} -- towers data (as scraped)
+
+    Keyword Arguments:
+        scaffold {str} -- a page to swap the data of (default: {None} - 'default.html')
+
+    Returns:
+        str -- page contents
+    """
+    # the saved form page is a results page itself (for Warsaw), so only its data gets swapped
+    scaffold = scaffold or readinput("default.html")
+    start = scaffold.index(Scraper.HOOK) + len(Scraper.HOOK)
+    _, end = json.JSONDecoder().raw_decode(scaffold, start)
+    return scaffold[:start] + json.dumps(towers) + scaffold[end:]
+
+
+def parse_heightrange(option):
+    """Parse a height range option from the website's GUI, e.g. '200m+' or 'Under 100m'
+
+    Arguments:
+        option {str} -- the option
+
+    Returns:
+        tuple -- (minimum height, maximum height), either 'None' if unbounded
+    """
+    if option.startswith("Under "):
+        return None, float(option[len("Under "):].rstrip("m"))
+    if option.endswith("m+"):
+        return float(option[:-2]), None
+    return None, None
+
+
+def _inrange(tower, heightrange):
+    low, high = heightrange
+    if low is None and high is None:
+        return True
+    if tower["height_architecture"] in ("-", ""):
+        return False
+    height = float(tower["height_architecture"])
+    return (low is None or height >= low) and (high is None or height < high)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # connections are kept alive, as they are by the website
+
+    def do_GET(self):
+        self.server.serve(self)
+
+    def log_message(self, format, *args):
+        pass  # requests aren't logged
+
+
+class StandIn(ThreadingHTTPServer):
+    """Local stand-in for www.skyscrapercenter.com serving results pages of cities with their stored towers data, so scraping can be exercised without network.
+
+    Use it as a context manager (that serves from a background thread) and scrape from its 'url', e.g.:
+
+        with StandIn(port=0, latency=0.1) as standin:
+            Scraper(url=standin.url, rate=None, cache=False).scrape_city("Warsaw")
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=STANDIN_PORT, store=None, latency=STANDIN_LATENCY, jitter=STANDIN_JITTER,
+                 error_rate=STANDIN_ERROR_RATE, bandwidth=STANDIN_BANDWIDTH, seed=None,
+                 host="127.0.0.1"):
+        """
+        Keyword Arguments:
+            port {int} -- a port to listen on, '0' for any free one (default: {STANDIN_PORT})
+            store {JsonStore / SqliteStore / CompactStore} -- a store to take towers data from (see 'scraperscrape.store') (default: {None} - as set in settings)
+            latency {float} -- mean delay of each response (in seconds) (default: {STANDIN_LATENCY})
+            jitter {float} -- maximum random deviation from the mean delay (in seconds) (default: {STANDIN_JITTER})
+            error_rate {float} -- a fraction of requests answered with '503 Service Unavailable' (default: {STANDIN_ERROR_RATE})
+            bandwidth {float} -- bytes per second sent in response to a single request, falsy for no limit (default: {STANDIN_BANDWIDTH})
+            seed {int} -- a seed of delays and errors drawn, for repeatable runs (default: {None})
+            host {str} -- a host to listen on (default: {"127.0.0.1"})
+        """
+        super().__init__((host, port), _StandInHandler)
+        self.store = store or getstore()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bandwidth = bandwidth
+        self.stats = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._pages = {}
+        self._thread = None
+        self._cities = {code: city for city, code in Scraper.CITYCODE_MAP.items() if city != "All"}
+        self._heightranges = {code: parse_heightrange(option)
+                              for option, code in Scraper.HEIGHTRANGE_MAP.items()}
+
+    @property
+    def url(self):
+        """URL template to be formatted with city and height range codes (as 'Scraper' takes it)"""
+        host, port = self.server_address[:2]
+        return urlsplit(URL)._replace(scheme="http", netloc=f"{host}:{port}").geturl()
+
+    def getpage(self, citycode, heightrange_code="0"):
+        """Get a results page of a city
+
+        Arguments:
+            citycode {str} -- a code of the city
+
+        Keyword Arguments:
+            heightrange_code {str} -- a code of the height range (default: {"0"} - all heights)
+
+        Returns:
+            tuple / None -- (page body, its ETag) or 'None' if the codes are invalid
+        """
+        key = citycode, heightrange_code
+        page = self._pages.get(key)
+        if page is None:
+            if citycode not in self._cities or heightrange_code not in self._heightranges:
+                return None
+            try:
+                towers = self.store.read_city(self._cities[citycode])["towers"]
+            except InvalidCityError:
+                towers = []  # a city without towers gets a page with none listed
+            heightrange = self._heightranges[heightrange_code]
+            body = makepage([tower for tower in towers if _inrange(tower, heightrange)]).encode(
+                "utf-8")
+            page = self._pages.setdefault(key, (body, '"{}"'.format(
+                hashlib.sha1(body).hexdigest())))
+        return page
+
+    def _count(self, **counts):
+        with self._lock:
+            self.stats.update(counts)
+
+    def _draw(self):
+        """Draw a delay and whether to fail for a request"""
+        with self._lock:
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.error_rate
+        return max(delay, 0.0), failed
+
+    def serve(self, handler):
+        """Respond to a GET request (in a handler's thread)
+
+        Arguments:
+            handler {http.server.BaseHTTPRequestHandler} -- a handler of the request
+        """
+        delay, failed = self._draw()
+        time.sleep(delay)
+        self._count(requests=1)
+        if failed:
+            self._count(errors=1)
+            self._respond(handler, 503, b"<html><body>Service Unavailable</body></html>")
+            return
+
+        query = parse_qs(urlsplit(handler.path).query)
+        page = self.getpage(query.get("base_city", [""])[0],
+                            query.get("base_height_range", ["0"])[0])
+        if page is None:
+            self._respond(handler, 404, b"<html><body>Not Found</body></html>")
+            return
+        body, etag = page
+        if handler.headers.get("If-None-Match") == etag:
+            self._count(not_modified=1)
+            self._respond(handler, 304, b"", etag)
+            return
+        self._respond(handler, 200, body, etag)
+
+    def _respond(self, handler, status, body, etag=None):
+        handler.send_response(status)
+        handler.send_header("Content-Type", "text/html; charset=utf-8")
+        handler.send_header("Content-Length", str(len(body)))
+        if etag:
+            handler.send_header("ETag", etag)
+        handler.end_headers()
+        try:
+            for i in range(0, len(body), CHUNK_SIZE):
+                chunk = body[i:i + CHUNK_SIZE]
+                handler.wfile.write(chunk)
+                self._count(bytes_sent=len(chunk))
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+        except ConnectionError:
+            handler.close_connection = True
+            self._count(dropped=1)
+
+    def handle_error(self, request, client_address):
+        # the scraper drops connections as soon as it's got the data, so resets are expected
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def start(self):
+        """Start serving from a background thread
+
+        Returns:
+            scraperscrape.standin.StandIn -- this stand-in
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket
+        """
+        if self._thread:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve city pages out of stored towers data")
+    parser.add_argument("--port", type=int, default=STANDIN_PORT)
+    parser.add_argument("--latency", type=float, default=STANDIN_LATENCY)
+    parser.add_argument("--jitter", type=float, default=STANDIN_JITTER)
+    parser.add_argument("--error-rate", type=float, default=STANDIN_ERROR_RATE)
+    parser.add_argument("--bandwidth", type=float, default=STANDIN_BANDWIDTH)
+    args = parser.parse_args()
+
+    standin = StandIn(args.port, latency=args.latency, jitter=args.jitter,
+                      error_rate=args.error_rate, bandwidth=args.bandwidth)
+    print(f"Serving at: {standin.url}")
+    try:
+        standin.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin.server_close()
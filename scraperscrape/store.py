@@ -0,0 +1,477 @@
+"""
+
+    scraperscrape.store
+    ~~~~~~~~~~~~~~~~
+    Store scraped data: as separate JSON files per city, as snapshots in SQLite database or as a single compact file
+
+"""
+
+import itertools
+import json
+import mmap
+import os
+import sqlite3
+
+try:
+    import orjson
+except ImportError:  # optional, speeds up decoding if available
+    orjson = None
+
+from scraperscrape.constants import OUTPUT_JSON_PATH, OUTPUT_DB_PATH, OUTPUT_COMPACT_PATH, STORAGE
+from scraperscrape.errors import InvalidCityError
+from scraperscrape.utils import timestamp
+
+# scraped towers' properties and their SQLite column types. NUMERIC (not REAL) affinity keeps whole
+# heights and coordinates integers, so the data read back is the same as scraped
+COLUMNS = [
+    ("id", "INTEGER"),
+    ("city", "TEXT"),
+    ("city_id", "INTEGER"),
+    ("city_locode", "TEXT"),
+    ("city_slug", "TEXT"),
+    ("completed", "INTEGER"),
+    ("country_chinese", "TEXT"),
+    ("country_id", "INTEGER"),
+    ("country_locode", "TEXT"),
+    ("country_slug", "TEXT"),
+    ("floors_above", "INTEGER"),
+    ("functions", "TEXT"),
+    ("height_architecture", "NUMERIC"),
+    ("height_architecture_formatted", "NUMERIC"),
+    ("height_architecture_ft_formatted", "TEXT"),
+    ("image", "TEXT"),
+    ("latitude", "NUMERIC"),
+    ("longitude", "NUMERIC"),
+    ("name", "TEXT"),
+    ("name_linked", "TEXT"),
+    ("rank", "INTEGER"),
+    ("retrofit_functions", "TEXT"),
+    ("start", "INTEGER"),
+    ("status", "TEXT"),
+    ("structural_material", "TEXT"),
+    ("url", "TEXT")
+]
+INDEXED_COLUMNS = ["city", "country_slug", "status", "height_architecture"]
+
+
+def readjson(path):
+    """Read JSON file, memory-mapped and decoded with 'orjson' if it's available
+
+    Arguments:
+        path {str} -- a file path
+
+    Returns:
+        dict / list -- decoded contents
+    """
+    with open(path, mode="rb") as f:
+        if orjson is None or not os.fstat(f.fileno()).st_size:
+            return json.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+
+
+def citypath(city, path=OUTPUT_JSON_PATH):
+    """Get path of JSON file for the city provided
+
+    Arguments:
+        city {str} -- a name of the city
+
+    Keyword Arguments:
+        path {str} -- a directory with JSON files (default: {OUTPUT_JSON_PATH})
+
+    Returns:
+        str -- a file path
+    """
+    return os.path.join(path, "{}.json".format(city.replace(" ", "_")))
+
+
+class JsonStore:
+    """Stores each city's data in a separate JSON file"""
+
+    def __init__(self, path=OUTPUT_JSON_PATH):
+        """
+        Keyword Arguments:
+            path {str} -- a directory with JSON files (default: {OUTPUT_JSON_PATH})
+        """
+        self.path = path
+
+    def iter_paths(self):
+        """Iterate over paths of stored cities' files (in the order they're listed in the file system)
+
+        Yields:
+            str -- a file path
+        """
+        for root, _, files in os.walk(self.path):
+            for file in files:
+                yield os.path.join(root, file)
+
+    def scan(self):
+        """Scan stored cities' files
+
+        Returns:
+            list -- (file path, file stamp) tuples, where a stamp changes whenever the file does
+        """
+        entries = []
+        for path in self.iter_paths():
+            stat = os.stat(path)
+            entries.append((path, (stat.st_mtime_ns, stat.st_size)))
+        return entries
+
+    def iter_citydata(self):
+        """Iterate over stored cities' data
+
+        Yields:
+            dict -- scraped city data
+        """
+        for path in self.iter_paths():
+            yield readjson(path)
+
+    def read_city(self, city):
+        """Read data of the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+
+        Raises:
+            InvalidCityError -- when there's no data for the city
+
+        Returns:
+            dict -- scraped city data
+        """
+        try:
+            return readjson(citypath(city, self.path))
+        except IOError:
+            raise InvalidCityError(f"Invalid city name provided: {city}")
+
+    def has_city(self, city):
+        """Check if there's data stored for the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+
+        Returns:
+            bool -- 'True' if the city's file exists
+        """
+        return os.path.isfile(citypath(city, self.path))
+
+    def write_city(self, city, data):
+        """Write data of the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+            data {dict} -- scraped city data
+        """
+        with open(citypath(city, self.path), mode="w") as jsonfile:
+            json.dump(data, jsonfile, sort_keys=True, indent=4)
+
+
+class SqliteStore:
+    """Stores snapshots of all towers data in separate tables of SQLite database"""
+
+    def __init__(self, path=OUTPUT_DB_PATH, snapshot=None, batch_size=1000):
+        """
+        Keyword Arguments:
+            path {str} -- a path of the database file (default: {OUTPUT_DB_PATH})
+            snapshot {str} -- a name of the snapshot to read from, the latest one if not provided (default: {None})
+            batch_size {int} -- number of rows inserted at once (default: {1000})
+        """
+        self.path = path
+        self.snapshot = snapshot
+        self.batch_size = batch_size
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("""CREATE TABLE IF NOT EXISTS snapshots (
+            name TEXT PRIMARY KEY,
+            created TEXT,
+            cities INTEGER,
+            towers INTEGER
+        )""")
+        return conn
+
+    def version(self):
+        """Get a version of the data read, i.e. the snapshot's name
+
+        Returns:
+            str -- a snapshot name
+        """
+        conn = self._connect()
+        try:
+            return self._gettable(conn)
+        finally:
+            conn.close()
+
+    def snapshots(self):
+        """Get names of snapshots stored
+
+        Returns:
+            list -- snapshot names from the oldest to the latest
+        """
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute("SELECT name FROM snapshots ORDER BY rowid")]
+        finally:
+            conn.close()
+
+    def _gettable(self, conn):
+        if self.snapshot:
+            return self.snapshot
+        row = conn.execute("SELECT name FROM snapshots ORDER BY rowid DESC LIMIT 1").fetchone()
+        if row is None:
+            raise LookupError(f"No snapshots stored in: {self.path}")
+        return row[0]
+
+    @staticmethod
+    def _newname(conn):
+        """Get a name for a new snapshot's table, suffixed with a counter if the timestamp's one is taken (by a snapshot made within the same second)"""
+        base = name = "towers_{}".format(timestamp(underscores=True))
+        for counter in itertools.count(2):
+            if conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is None:
+                return name
+            name = f"{base}_{counter}"
+
+    def write_snapshot(self, citydata, name=None):
+        """Write a snapshot of cities' data in a single transaction. Cities without towers leave no rows, so they aren't stored
+
+        Arguments:
+            citydata {iterable} -- (city name, scraped city data) tuples (data being dicts with 'timestamp' and 'towers')
+
+        Keyword Arguments:
+            name {str} -- a name of the snapshot's table (default: {'towers_' + timestamp})
+
+        Returns:
+            str -- the snapshot's name
+        """
+        colnames = [col for col, _ in COLUMNS]
+        rows = ([*(tower.get(col) for col in colnames), data["timestamp"]]
+                for _, data in citydata for tower in data["towers"])
+
+        conn = self._connect()
+        try:
+            with conn:  # a single transaction: the snapshot is either stored whole or not at all
+                name = name or self._newname(conn)
+                insert = "INSERT INTO {} ({}, timestamp) VALUES ({})".format(
+                    name, ", ".join(colnames), ", ".join("?" * (len(colnames) + 1)))
+                conn.execute("CREATE TABLE {} ({}, timestamp TEXT)".format(
+                    name, ", ".join(f"{col} {coltype}" for col, coltype in COLUMNS)))
+                towercount = 0
+                while True:
+                    batch = list(itertools.islice(rows, self.batch_size))
+                    if not batch:
+                        break
+                    conn.executemany(insert, batch)
+                    towercount += len(batch)
+                for col in ["id", *INDEXED_COLUMNS]:
+                    conn.execute(f"CREATE INDEX {name}_{col} ON {name} ({col})")
+                citycount, = conn.execute(f"SELECT COUNT(DISTINCT city) FROM {name}").fetchone()
+                conn.execute("INSERT INTO snapshots VALUES (?, ?, ?, ?)",
+                             (name, timestamp(), citycount, towercount))
+        finally:
+            conn.close()
+        return name
+
+    @staticmethod
+    def _todata(rows):
+        """Turn rows of a single city into scraped city data"""
+        colnames = [col for col, _ in COLUMNS]
+        towers = [{k: v for k, v in zip(colnames, row) if v is not None} for row in rows]
+        return {"timestamp": rows[0][-1], "towers": towers}
+
+    def iter_citydata(self):
+        """Iterate over snapshot's cities' data (in the order they were written)
+
+        Yields:
+            dict -- scraped city data
+        """
+        conn = self._connect()
+        try:
+            table = self._gettable(conn)
+            cursor = conn.execute("SELECT {}, timestamp FROM {} ORDER BY rowid".format(
+                ", ".join(col for col, _ in COLUMNS), table))
+            for _, rows in itertools.groupby(cursor, key=lambda row: row[1]):
+                yield self._todata(list(rows))
+        finally:
+            conn.close()
+
+    def read_city(self, city):
+        """Read snapshot's data of the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+
+        Raises:
+            InvalidCityError -- when there's no data for the city
+
+        Returns:
+            dict -- scraped city data
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute("SELECT {}, timestamp FROM {} WHERE city = ? ORDER BY rowid".format(
+                ", ".join(col for col, _ in COLUMNS), self._gettable(conn)), (city,)).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            raise InvalidCityError(f"Invalid city name provided: {city}")
+        return self._todata(rows)
+
+
+class CompactStore:
+    """Stores a snapshot of all cities' data in a single compact file.
+
+    Each city's data takes one line of compact JSON. Lines are followed by an index line mapping cities to their offsets and lengths (in bytes), and the file ends with a fixed-width footer line holding the index line's offset. Loading all cities is one sequential read, loading one city is one seek (once the index is loaded)
+    """
+
+    FOOTER_WIDTH = 21  # 20 digits and a newline
+
+    def __init__(self, path=OUTPUT_COMPACT_PATH):
+        """
+        Keyword Arguments:
+            path {str} -- a path of the file (default: {OUTPUT_COMPACT_PATH})
+        """
+        self.path = path
+        self._index = None
+        self._indexkey = None
+
+    def write_snapshot(self, citydata):
+        """Write cities' data, replacing whatever was stored before (which is left intact if writing fails). Cities without towers aren't stored (as in SQLite snapshots), as they couldn't be loaded
+
+        Arguments:
+            citydata {iterable} -- (city name, scraped city data) tuples (data being dicts with 'timestamp' and 'towers')
+
+        Raises:
+            ValueError -- when a city is provided more than once
+
+        Returns:
+            int -- number of cities written
+        """
+        index = {}
+        temppath = f"{self.path}.tmp"
+        try:
+            with open(temppath, mode="wb") as f:
+                for city, data in citydata:
+                    if not data["towers"]:
+                        continue
+                    if city in index:
+                        raise ValueError(f"City provided more than once: {city}")
+                    line = json.dumps(data, ensure_ascii=False,
+                                      separators=(",", ":")).encode("utf-8")
+                    index[city] = [f.tell(), len(line)]
+                    f.write(line + b"\n")
+                indexoffset = f.tell()
+                f.write(json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                f.write(b"\n")
+                f.write(b"%020d\n" % indexoffset)
+        except BaseException:
+            os.remove(temppath)
+            raise
+        os.replace(temppath, self.path)
+        return len(index)
+
+    def version(self):
+        """Get a version of the data stored that changes whenever the file does
+
+        Returns:
+            tuple -- (file modification time (in ns), file size)
+        """
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _readindex(self, f):
+        """Read the index (or use the one already read if the file hasn't changed since)
+
+        Arguments:
+            f {file} -- the file opened in binary mode
+
+        Returns:
+            tuple -- (index offset, {city: [offset, length]})
+        """
+        stat = os.fstat(f.fileno())
+        key = (stat.st_mtime_ns, stat.st_size)
+        if self._indexkey != key:
+            f.seek(-self.FOOTER_WIDTH, os.SEEK_END)
+            indexoffset = int(f.read(self.FOOTER_WIDTH))
+            f.seek(indexoffset)
+            index = json.loads(f.read(stat.st_size - self.FOOTER_WIDTH - indexoffset))
+            self._index, self._indexkey = (indexoffset, index), key
+        return self._index
+
+    def iter_citydata(self):
+        """Iterate over stored cities' data (in the order they were written)
+
+        Yields:
+            dict -- scraped city data
+        """
+        with open(self.path, mode="rb") as f:
+            indexoffset, _ = self._readindex(f)
+            f.seek(0)
+            contents = f.read(indexoffset)
+        for line in contents.splitlines():
+            yield json.loads(line)
+
+    def has_city(self, city):
+        """Check if there's data stored for the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+
+        Returns:
+            bool -- 'True' if the city is indexed
+        """
+        try:
+            with open(self.path, mode="rb") as f:
+                return city in self._readindex(f)[1]
+        except IOError:
+            return False
+
+    def read_city(self, city):
+        """Read data of the city provided
+
+        Arguments:
+            city {str} -- a name of the city
+
+        Raises:
+            InvalidCityError -- when there's no data for the city
+
+        Returns:
+            dict -- scraped city data
+        """
+        with open(self.path, mode="rb") as f:
+            _, index = self._readindex(f)
+            try:
+                offset, length = index[city]
+            except KeyError:
+                raise InvalidCityError(f"Invalid city name provided: {city}")
+            f.seek(offset)
+            return json.loads(f.read(length))
+
+
+STORES = {
+    "json": JsonStore,
+    "sqlite": SqliteStore,
+    "compact": CompactStore
+}
+
+
+def getstore(name=STORAGE):
+    """Get a store of scraped data
+
+    Keyword Arguments:
+        name {str} -- a name of the store: 'json', 'sqlite' or 'compact' (default: {STORAGE})
+
+    Returns:
+        JsonStore / SqliteStore / CompactStore -- a store with default settings
+    """
+    return STORES[name]()
+
+
+if __name__ == "__main__":
+    import sys
+    # snapshot JSON files into the store named, e.g. 'python -m scraperscrape.store compact'
+    STORES[sys.argv[1]]().write_snapshot((data["towers"][0]["city"], data)
+                                         for data in JsonStore().iter_citydata() if data["towers"])
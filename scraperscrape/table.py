@@ -0,0 +1,250 @@
+"""
+
+    scraperscrape.table
+    ~~~~~~~~~~~~~~~~~~
+    Keep scraped towers data in a compact, column-oriented table
+
+"""
+
+from array import array
+from itertools import compress
+
+
+class NumericColumn:
+    """A column of numbers kept in a flat array. Types of values are kept alongside, so ints stay ints, floats stay floats and missing values stay 'None'"""
+
+    __slots__ = ("values", "kinds", "objects")
+
+    NONE, INT, FLOAT, OBJECT = range(4)
+    MAX_EXACT = 2 ** 53  # greatest magnitude of an int a double holds exactly
+
+    def __init__(self):
+        self.values = array("d")
+        self.kinds = array("b")
+        self.objects = {}  # {row: value} for values that aren't numbers (kept as they are)
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __getitem__(self, row):
+        kind = self.kinds[row]
+        if kind == self.INT:
+            return int(self.values[row])
+        if kind == self.FLOAT:
+            return self.values[row]
+        if kind == self.NONE:
+            return None
+        return self.objects[row]
+
+    def append(self, value):
+        if value is None:
+            kind, number = self.NONE, 0.0
+        elif type(value) is int and -self.MAX_EXACT <= value <= self.MAX_EXACT:
+            kind, number = self.INT, float(value)
+        elif type(value) is float:
+            kind, number = self.FLOAT, value
+        else:
+            kind, number = self.OBJECT, 0.0
+            self.objects[len(self.kinds)] = value
+        self.values.append(number)
+        self.kinds.append(kind)
+
+    def extend(self, other):
+        offset = len(self)
+        self.values.extend(other.values)
+        self.kinds.extend(other.kinds)
+        self.objects.update((row + offset, value) for row, value in other.objects.items())
+
+
+class CategoryColumn:
+    """A column of repetitive values (e.g. statuses) kept as codes into a list of distinct values"""
+
+    __slots__ = ("codes", "categories", "_lookup")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.categories = []
+        self._lookup = {}  # {category: code}
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+    def __getstate__(self):
+        return self.codes, self.categories
+
+    def __setstate__(self, state):
+        self.codes, self.categories = state
+        self._lookup = {category: code for code, category in enumerate(self.categories)}
+
+    def encode(self, value):
+        """Get code of value, registering it as a new category if necessary
+
+        Arguments:
+            value {hashable} -- a value to encode
+
+        Returns:
+            int -- the value's code
+        """
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self.categories)
+            self.categories.append(value)
+        return code
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def extend(self, other):
+        recoded = [self.encode(category) for category in other.categories]
+        self.codes.extend(recoded[code] for code in other.codes)
+
+    def mask(self, values):
+        """Get a mask of rows holding any of values
+
+        Arguments:
+            values {iterable} -- values to look for
+
+        Returns:
+            bytes -- 1 for rows holding any of values, 0 for the rest
+        """
+        codes = {self._lookup[value] for value in values if value in self._lookup}
+        return bytes(code in codes for code in self.codes)
+
+
+class TextColumn(list):
+    """A column of mostly distinct strings (e.g. names)"""
+
+    __slots__ = ()
+
+
+class TowerTable:
+    """Towers data laid out in columns: numbers in typed arrays, repetitive strings dictionary-encoded. Only fields that are actually used are kept"""
+
+    # {column: (scraped key, column type)}
+    COLUMNS = {
+        "id_": ("id", NumericColumn),
+        "name": ("name", TextColumn),
+        "height": ("height_architecture", NumericColumn),
+        "floors": ("floors_above", NumericColumn),
+        "status": ("status", CategoryColumn),
+        "start": ("start", NumericColumn),
+        "completed": ("completed", NumericColumn),
+        "functions": ("functions", CategoryColumn),
+        "rank": ("rank", NumericColumn),
+        "latitude": ("latitude", NumericColumn),
+        "longitude": ("longitude", NumericColumn),
+        "city": ("city", CategoryColumn),
+        "country_slug": ("country_slug", CategoryColumn),
+    }
+
+    __slots__ = ("columns",)
+
+    def __init__(self, towers=()):
+        """
+        Keyword Arguments:
+            towers {iterable} -- scraped towers data (dicts) (default: {()})
+        """
+        self.columns = {name: coltype() for name, (_, coltype) in self.COLUMNS.items()}
+        for data in towers:
+            self.append(data)
+
+    def __len__(self):
+        return len(self.columns["name"])
+
+    def __getstate__(self):
+        return self.columns
+
+    def __setstate__(self, state):
+        self.columns = state
+
+    @staticmethod
+    def parse(data, key):
+        """Parse value of a scraped tower's field
+
+        Arguments:
+            data {dict} -- scraped tower data
+            key {str} -- key for scraped data dict
+
+        Returns:
+            str / int / float / None -- parsed value or 'None' if missing or blank
+        """
+        value = data.get(key)
+        return None if value in ("-", "") else value
+
+    def append(self, data):
+        """Append a tower
+
+        Arguments:
+            data {dict} -- scraped tower data
+        """
+        for name, (key, _) in self.COLUMNS.items():
+            self.columns[name].append(self.parse(data, key))
+
+    def get(self, column, row):
+        """Get a single value
+
+        Arguments:
+            column {str} -- a name of the column
+            row {int} -- a row index
+
+        Returns:
+            str / int / float / None -- the value
+        """
+        return self.columns[column][row]
+
+    def values(self, column, mask=None):
+        """Get values of a column
+
+        Arguments:
+            column {str} -- a name of the column
+
+        Keyword Arguments:
+            mask {bytes} -- a mask of rows to take (default: {None} - all rows)
+
+        Returns:
+            list -- the values
+        """
+        col = self.columns[column]
+        return [col[row] for row in self.rows(mask)]
+
+    def mask(self, column, *values):
+        """Get a mask of rows holding any of values in a dictionary-encoded column
+
+        Arguments:
+            column {str} -- a name of the column
+            values {list} -- variable number of values packed into list
+
+        Returns:
+            bytes -- 1 for rows holding any of values, 0 for the rest
+        """
+        return self.columns[column].mask(values)
+
+    def rows(self, mask=None):
+        """Get indices of rows
+
+        Keyword Arguments:
+            mask {bytes} -- a mask of rows to take (default: {None} - all rows)
+
+        Returns:
+            iterable -- row indices
+        """
+        return range(len(self)) if mask is None else compress(range(len(self)), mask)
+
+    @classmethod
+    def concat(cls, *tables):
+        """Concatenate tables into a new one
+
+        Arguments:
+            tables {list} -- variable number of TowerTable objects packed into list
+
+        Returns:
+            scraperscrape.table.TowerTable -- a new table with rows of all tables in order
+        """
+        table = cls()
+        for other in tables:
+            for name, column in table.columns.items():
+                column.extend(other.columns[name])
+        return table
@@ -0,0 +1,81 @@
+"""
+
+    scraperscrape.throttle
+    ~~~~~~~~~~~~~~~~~~~
+    Throttle requests made to scraped hosts
+
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """Token bucket that lets through a steady rate of calls with occasional bursts"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Arguments:
+            rate {float} -- number of tokens added per second
+
+        Keyword Arguments:
+            capacity {int} -- maximum number of tokens available at once, i.e. a burst size (default: {1})
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, blocking until it's available
+
+        Returns:
+            float -- time waited (in seconds)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # tokens may go negative, so that concurrent callers queue up instead of racing
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class RateLimiter:
+    """Limits rate of requests separately for each host"""
+
+    def __init__(self, rate, capacity=1):
+        """
+        Arguments:
+            rate {float} -- number of requests per second allowed for a single host (falsy values disable limiting)
+
+        Keyword Arguments:
+            capacity {int} -- burst size allowed for a single host (default: {1})
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to URL's host is allowed
+
+        Arguments:
+            url {str} -- URL about to be requested
+
+        Returns:
+            float -- time waited (in seconds)
+        """
+        if not self.rate:
+            return 0.0
+        host = urlsplit(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        return bucket.acquire()
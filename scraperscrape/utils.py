@@ -7,11 +7,13 @@
 """
 
 import datetime as dt
+import hashlib
 import json
 import os
-from bs4 import BeautifulSoup
+import threading
+from collections.abc import Mapping
 
-from scraperscrape.constants import INPUT_PATH, OUTPUT_JSON_PATH
+from scraperscrape.constants import INPUT_PATH, CACHE_PATH
 
 
 def timestamp(underscores=False):
@@ -21,16 +23,12 @@ def timestamp(underscores=False):
 
 
 def split_json(src, dest):
-    """Split large JSON file into smaller ones"""
-    with open(src) as srcfile:
-        data = json.load(srcfile)
-        tempdata = data.get("data")
-        data = tempdata if tempdata is not None else data
+    """Split large JSON file into smaller ones (streaming it city by city, see 'scraperscrape.ingest')"""
+    # imported here to avoid circular imports
+    from scraperscrape.ingest import ingest
+    from scraperscrape.store import JsonStore
 
-    for k, v in data.items():
-        destpath = os.path.join(dest, "{}.json".format(k.replace(" ", "_")))
-        with open(destpath, mode="w") as destfile:
-            json.dump({"timestamp": timestamp(), "towers": v}, destfile, sort_keys=True, indent=4)
+    ingest(src, JsonStore(dest))
 
 
 def readinput(filename):
@@ -74,19 +72,114 @@ def rightjustify(linetext, linecount, max_countwidth):
     return "{}.{}{}".format(linecount, " " * fill_length,  linetext)
 
 
-def extract_tower_properties():
-    """Extract all tower properties as scraped and saved in JSON files
+def extract_tower_properties(store=None):
+    """Extract all tower properties as scraped and saved
+
+    Keyword Arguments:
+        store {JsonStore / SqliteStore / CompactStore} -- a store to read from (see 'scraperscrape.store') (default: {None} - as set in settings)
 
     Returns:
         list -- a list of tower properties
     """
-    properties = []
-    for root, _, files in os.walk(OUTPUT_JSON_PATH):
-        for file in files:
-            path = os.path.join(root, file)
-            with open(path) as f:
-                data = json.load(f)
+    # imported here, as 'schema' depends on this module
+    from scraperscrape.schema import infer_schema
+
+    return sorted(infer_schema(store)["properties"])
+
+
+def file_digest(*paths):
+    """Get a digest of the contents of the files provided
+
+    Arguments:
+        paths {list} -- variable number of file paths packed into list
+
+    Returns:
+        str -- SHA-1 hex digest of the files' contents (in the order provided)
+    """
+    sha = hashlib.sha1()
+    for path in paths:
+        with open(path, mode="rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                sha.update(chunk)
+    return sha.hexdigest()
+
+
+def cache_name(name, key):
+    """Name an artifact cached separately for each key (e.g. a store's path), so artifacts of different keys don't overwrite each other
+
+    Arguments:
+        name {str} -- a name of the cached artifact
+        key {str} -- a key the artifact is compiled for
+
+    Returns:
+        str -- a name of the cached artifact unique to the key
+    """
+    return f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]}"
+
 
-            properties.extend(k for tower in data["towers"] for k in tower if k not in properties)
+def load_cache(name, digest):
+    """Load data cached under the name provided if it's still valid
 
-    return sorted(properties)
+    Arguments:
+        name {str} -- a name of the cached artifact
+        digest {str} -- a digest of the inputs the artifact has been compiled from
+
+    Returns:
+        dict / list / None -- cached data or 'None' if there's nothing valid cached
+    """
+    path = os.path.join(CACHE_PATH, f"{name}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+    except (IOError, ValueError):
+        return None
+    return cached["data"] if cached.get("digest") == digest else None
+
+
+def dump_cache(name, digest, data):
+    """Cache data under the name provided
+
+    Arguments:
+        name {str} -- a name of the cached artifact
+        digest {str} -- a digest of the inputs the artifact has been compiled from
+        data {dict / list} -- JSON-serializable data to cache
+    """
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    path = os.path.join(CACHE_PATH, f"{name}.json")
+    temppath = f"{path}.{os.getpid()}.tmp"
+    with open(temppath, mode="w", encoding="utf-8") as f:
+        json.dump({"digest": digest, "data": data}, f, ensure_ascii=False)
+    os.replace(temppath, path)  # atomic, so concurrent readers never see a partial file
+
+
+class LazyMapping(Mapping):
+    """Read-only mapping that gets loaded on first access"""
+
+    def __init__(self, loader):
+        """
+        Arguments:
+            loader {callable} -- a no-argument callable returning a dict
+        """
+        self._loader = loader
+        self._data = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = self._loader()
+        return self._data
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __repr__(self):
+        return repr(self._load()) if self._data is not None else "<{} (not loaded)>".format(
+            type(self).__name__)
@@ -0,0 +1,18 @@
+"""
+
+    tests.conftest
+    ~~~~~~~~~~~~~~
+    Fixtures shared by all tests
+
+"""
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cachepath(tmp_path_factory):
+    """Keep artifacts cached by tests out of the repo's cache directory"""
+    path = str(tmp_path_factory.mktemp("cache"))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr("scraperscrape.utils.CACHE_PATH", path)
+        yield path
@@ -0,0 +1,58 @@
+"""
+
+    tests.test_countries
+    ~~~~~~~~~~~~~~~~~~~~
+    Looking up regions of countries and their slugs
+
+"""
+
+import warnings
+
+import pytest
+
+from scraperscrape.countries import RegionIndex
+from scraperscrape.scraper import City
+from scraperscrape.store import JsonStore
+
+COUNTRYMAP = {"EU": ["Austria", "Slovakia", "Turkey"], "AS": ["Turkey", "Japan"]}
+
+
+@pytest.fixture
+def index():
+    return RegionIndex(COUNTRYMAP, city_regions={"Tokyo": "AS", "Istanbul": "AS"})
+
+
+def test_lookup(index):
+    assert index.lookup_slug("austria", "Vienna") == ("Austria", "EU")
+    assert index.lookup("slovakia", "Bratislava") == "EU"
+    # countries listed in more than one region belong to the first one, unless a city's overridden
+    assert index.lookup_slug("turkey", "Ankara") == ("Turkey", "EU")
+    assert index.lookup_slug("turkey", "Istanbul") == ("Turkey", "AS")
+    assert index.unmapped == {}
+
+
+def test_unknown_slug(index):
+    with pytest.warns(UserWarning, match="'atlantis' \\(city: 'Poseidonia'\\)"):
+        assert index.lookup_slug("atlantis", "Poseidonia") == ("Atlantis", None)
+    assert index.unmapped == {"atlantis": {"Poseidonia"}}
+    # warned about once, but all its cities are recorded
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        assert index.lookup_slug("atlantis", "Metropolis") == ("Atlantis", None)
+        # overrides don't apply to cities of unmapped countries
+        assert index.lookup_slug("atlantis", "Tokyo") == ("Atlantis", None)
+    assert index.unmapped == {"atlantis": {"Poseidonia", "Metropolis", "Tokyo"}}
+
+
+def test_unknown_country(index):
+    with pytest.warns(UserWarning, match="'Atlantis'"):
+        assert index.lookup("Atlantis", "Poseidonia") is None
+    assert index.unmapped == {"Atlantis": {"Poseidonia"}}
+
+
+def test_city_of_unknown_country():
+    towers = JsonStore().read_city("Vienna")["towers"][:3]
+    towers = [{**tower, "country_slug": "lemuria"} for tower in towers]
+    with pytest.warns(UserWarning, match="'lemuria'"):
+        city = City({"timestamp": "2019-Jan-20 16:05:16", "towers": towers})
+    assert (city.country, city.region) == ("Lemuria", None)
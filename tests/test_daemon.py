@@ -0,0 +1,104 @@
+"""
+
+    tests.test_daemon
+    ~~~~~~~~~~~~~~~~~
+    Pages served by the daemon against text rendered as 'print_*' functions print it
+
+"""
+
+import json
+import shutil
+import threading
+import warnings
+
+import pytest
+
+from scraperscrape.daemon import Daemon, Model, dataversion, query
+from scraperscrape.output import render_city, render_country, render_region, render_world
+from scraperscrape.scraper import Country, Region, World, clearcache, getcities, getcity
+from scraperscrape.store import JsonStore, citypath
+
+
+@pytest.fixture(scope="module")
+def store():
+    return JsonStore()
+
+
+@pytest.fixture(scope="module")
+def model(store):
+    clearcache()
+    return Model(store, dataversion(store))
+
+
+def test_names_are_unique(model):
+    for kind, names in model.names.items():
+        assert len(names) == len(set(names)), kind
+
+
+@pytest.mark.parametrize("verbose", [False, True])
+def test_pages_match_rendered(model, store, verbose):
+    assert model.get("world", verbose=verbose) == render_world(
+        World(getcities(store=store)), verbose).encode("utf-8")
+    for name in model.names["regions"]:
+        region = Region(name, getcities(region_filter=name, store=store))
+        assert model.get("regions", name, verbose) == render_region(region, verbose).encode(
+            "utf-8"), name
+    for name in model.names["countries"]:
+        country = Country(name, getcities(country_filter=name, store=store))
+        assert model.get("countries", name, verbose) == render_country(country, verbose).encode(
+            "utf-8"), name
+    for name in model.names["cities"]:
+        assert model.get("cities", name, verbose) == render_city(
+            getcity(name, store=store), verbose).encode("utf-8"), name
+
+
+def test_countries_spanning_regions(model, store):
+    # Istanbul is in Europe and Siberian cities are in Asia, while the rest of their countries isn't
+    for name in ("Turkey", "Russia"):
+        cities = getcities(country_filter=name, store=store)
+        assert len({city.region for city in cities}) > 1
+        assert model.get("countries", name) == render_country(Country(name, cities)).encode(
+            "utf-8")
+
+
+def test_city_without_region(tmp_path, store):
+    for city in ["Vienna", "Graz"]:
+        shutil.copy(citypath(city, store.path), str(tmp_path))
+    path = citypath("Graz", str(tmp_path))
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    for tower in data["towers"]:
+        tower["country_slug"] = "atlantis"
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+    clearcache()
+    tmpstore = JsonStore(str(tmp_path))
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # about the unmapped country
+        model = Model(tmpstore, 0)
+        world = World(getcities(store=tmpstore))
+    # the city counts towards the world, but to none of its regions or countries
+    assert model.names == {"world": ["world"], "regions": ["Europe"], "countries": ["Austria"],
+                           "cities": ["Graz", "Vienna"]}
+    assert world.rating > world.regions[0].rating
+    assert model.get("world", verbose=True) == render_world(world, True).encode("utf-8")
+    assert model.get("cities", "Graz") is not None
+    clearcache()
+
+
+def test_served_over_http(store):
+    daemon = Daemon(port=0, store=store, poll=0)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    try:
+        port = daemon.server_address[1]
+        status = json.loads(query("status", port=port))
+        assert status["countries"] == len(daemon.model.names["countries"])
+        assert query("countries", "turkey", port=port) == daemon.model.get(
+            "countries", "Turkey").decode("utf-8")
+        assert query("cities", "Vienna", verbose=True, port=port) == daemon.model.get(
+            "cities", "Vienna", True).decode("utf-8")
+    finally:
+        daemon.shutdown()
+        daemon.server_close()
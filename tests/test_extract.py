@@ -0,0 +1,65 @@
+"""
+
+    tests.test_extract
+    ~~~~~~~~~~~~~~~~~~
+    Towers data extracted from pages chunk by chunk against pages decoded whole
+
+"""
+
+import json
+
+import pytest
+
+from scraperscrape.scraper import Scraper, extract_hooked
+from scraperscrape.utils import readinput
+
+HOOK = Scraper.HOOK
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def splits(text):
+    """Every way of splitting text in two"""
+    return [[text[:i], text[i:]] for i in range(len(text) + 1)]
+
+
+@pytest.fixture(scope="module")
+def page():
+    return readinput("default.html")
+
+
+@pytest.mark.parametrize("size", [1, 7, 4096, 1 << 30])
+def test_page_in_chunks(page, size):
+    start = page.index(HOOK) + len(HOOK)
+    expected, _ = json.JSONDecoder().raw_decode(page, start)
+    assert extract_hooked(chunked(page, size), HOOK) == expected
+
+
+def test_split_between_chunks():
+    page = '<html><script>var x = 1;\nvar buildings = [{"a": "b];"}, 2];\nvar y = [3];</script>'
+    for chunks in splits(page):
+        assert extract_hooked(chunks, HOOK) == [{"a": "b];"}, 2]
+    # the hook, the value's terminator and the script tag split at once
+    for i in range(len(page)):
+        for j in range(i, len(page) + 1):
+            chunks = [page[:i], page[i:j], page[j:]]
+            assert extract_hooked(chunks, HOOK) == [{"a": "b];"}, 2], chunks
+
+
+def test_missing_hook():
+    assert extract_hooked([], HOOK) is None
+    assert extract_hooked(["<html><script>var x = [1];</script></html>"], HOOK) is None
+    # the hook outside of scripts isn't matched
+    page = '<meta content="var buildings = [0];"><p>var buildings = [1];</p>'
+    for chunks in splits(page):
+        assert extract_hooked(chunks, HOOK) is None
+    page = '<title>var buildings = [0];</title><script>var buildings = [1];</script>'
+    for chunks in splits(page):
+        assert extract_hooked(chunks, HOOK) == [1]
+
+
+def test_truncated_value():
+    with pytest.raises(json.JSONDecodeError):
+        extract_hooked(["<script>var buildings = [1, ", "2"], HOOK)
@@ -0,0 +1,74 @@
+"""
+
+    tests.test_fetch
+    ~~~~~~~~~~~~~~~~
+    Counting bytes fetched over the wire, as sent (gzipped) and as decoded
+
+"""
+
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraperscrape.fetch import Fetcher, ResponseCache
+
+BODY = ("<html><body>" + "skyscraper " * 2000 + "</body></html>").encode("utf-8")
+GZIPPED = gzip.compress(BODY)
+ETAG = '"v1"'
+
+
+class _GzipHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(GZIPPED)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(GZIPPED)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GzipHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:{}/page".format(server.server_address[1])
+    server.shutdown()
+    server.server_close()
+
+
+def test_get_counts_wire_bytes(tmp_path, url):
+    fetcher = Fetcher(cache=ResponseCache(str(tmp_path)))
+    assert fetcher.get(url) == BODY.decode("utf-8")
+    stats = fetcher.stats
+    assert stats["bytes_downloaded"] == len(GZIPPED)
+    assert stats["bytes_decoded"] == len(BODY)
+
+    # revalidated with '304 Not Modified', saving what would've been sent gzipped
+    assert fetcher.get(url) == BODY.decode("utf-8")
+    stats = fetcher.stats
+    assert (stats["requests"], stats["revalidated"], stats["misses"]) == (2, 1, 1)
+    assert stats["bytes_downloaded"] == len(GZIPPED)
+    assert stats["bytes_saved"] == len(GZIPPED)
+
+
+def test_iter_text_counts_wire_bytes(url):
+    fetcher = Fetcher(cache=False)
+    assert "".join(fetcher.iter_text(url, chunk_size=1024)) == BODY.decode("utf-8")
+    stats = fetcher.stats
+    assert stats["bytes_downloaded"] == len(GZIPPED)
+    assert stats["bytes_decoded"] == len(BODY)
@@ -0,0 +1,97 @@
+"""
+
+    tests.test_getcities
+    ~~~~~~~~~~~~~~~~~~~~
+    Cities loaded with filters pushed down to file selection against ones filtered after loading all
+
+"""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from scraperscrape.constants import REGIONMAP, SUBCITYMAP, _parse_metros
+from scraperscrape.scraper import clearcache, getcities
+from scraperscrape.store import JsonStore, citypath
+
+# a metro crossing a border (and sharing a region)
+CROSSBORDER = {"Bratislava": "Vienna"}
+COUNTRIES = ["Austria", "Slovakia", "France", "Turkey", "Russia", "United States"]
+
+
+def describe(cities):
+    return [(city.name, city.rating, len(city.table)) for city in cities]
+
+
+def expected(cities, region=None, country=None):
+    return describe(city for city in cities
+                    if (region is None or city.region == region)
+                    and (country is None or city.country == country))
+
+
+@pytest.fixture(autouse=True)
+def cleared():
+    clearcache()
+    yield
+    clearcache()
+
+
+@pytest.mark.parametrize("subcitymap", [SUBCITYMAP, CROSSBORDER], ids=["settings", "crossborder"])
+@pytest.mark.parametrize("merge_subcities", [True, False])
+def test_filtered_match_unfiltered(subcitymap, merge_subcities):
+    cities = getcities(merge_subcities, subcitymap=subcitymap)
+    for region in REGIONMAP.values():
+        assert describe(getcities(merge_subcities, region_filter=region,
+                                  subcitymap=subcitymap)) == expected(cities, region=region)
+    for country in COUNTRIES:
+        assert describe(getcities(merge_subcities, country_filter=country,
+                                  subcitymap=subcitymap)) == expected(cities, country=country)
+
+
+def test_crossborder_metro_with_cold_and_warm_cache(tmp_path):
+    source = JsonStore()
+    for city in ["Vienna", "Bratislava", "Linz", "Graz", "Budapest"]:
+        shutil.copy(citypath(city, source.path), str(tmp_path))
+    store = JsonStore(str(tmp_path))
+
+    cold = getcities(country_filter="Austria", store=store, subcitymap=CROSSBORDER)
+    unfiltered = getcities(store=store, subcitymap=CROSSBORDER)
+    warm = getcities(country_filter="Austria", store=store, subcitymap=CROSSBORDER)
+    assert describe(cold) == describe(warm) == expected(unfiltered, country="Austria")
+    vienna = next(city for city in warm if city.name == "Vienna")
+    assert len(vienna.table) == (len(source.read_city("Vienna")["towers"])
+                                 + len(source.read_city("Bratislava")["towers"]))
+    # the subsidiary itself is filtered out by its own country when not merged
+    assert "Bratislava" not in [city.name for city in getcities(
+        False, country_filter="Austria", store=store, subcitymap=CROSSBORDER)]
+
+
+def test_headers_are_cached_per_store(tmp_path, cachepath):
+    source = JsonStore()
+    shutil.copy(citypath("Vienna", source.path), str(tmp_path))
+    getcities(store=source)
+    getcities(store=JsonStore(str(tmp_path)))
+    digests = set()
+    for name in os.listdir(cachepath):
+        if name.startswith("headers-"):
+            with open(os.path.join(cachepath, name), encoding="utf-8") as f:
+                digests.add(json.load(f)["digest"])
+    assert {os.path.abspath(source.path), os.path.abspath(str(tmp_path))} <= digests
+
+
+def test_metros_from_settings():
+    assert _parse_metros({"Vienna": ["Bratislava"], "Paris": ["Courbevoie", "Puteaux"]}) == {
+        "Bratislava": "Vienna", "Courbevoie": "Paris", "Puteaux": "Paris"}
+    for metros, message in [
+            ({"Vienna": ["Bratislava"], "Budapest": ["Bratislava"]},
+             "'Bratislava' is listed in both 'Vienna' and 'Budapest' metros"),
+            ({"Vienna": ["Bratislava"], "Bratislava": ["Brno"]},
+             "'Bratislava' is the parent of its own metro, but is also listed in 'Vienna' metro"),
+            ({"Brno": ["Vienna"], "Vienna": ["Bratislava"]},
+             "'Vienna' is the parent of its own metro, but is also listed in 'Brno' metro"),
+            ({"Vienna": ["Vienna"]}, "'Vienna' is listed as a subsidiary of its own metro")]:
+        with pytest.raises(ValueError) as info:
+            _parse_metros(metros)
+        assert str(info.value) == f"Invalid metros in settings: {message}"
@@ -0,0 +1,132 @@
+"""
+
+    tests.test_ingest
+    ~~~~~~~~~~~~~~~~~
+    Streaming towers data dumps into stores
+
+"""
+
+import io
+import json
+
+import pytest
+
+from scraperscrape.errors import InvalidCityError
+from scraperscrape.ingest import DumpReader, ingest, iter_dump, iter_ndjson
+from scraperscrape.store import CompactStore, JsonStore, SqliteStore
+
+CITIES = ["Vienna", "Bratislava", "São Paulo", "Dubai"]
+
+
+@pytest.fixture(scope="module")
+def dump():
+    source = JsonStore()
+    return {city: source.read_city(city)["towers"] for city in CITIES}
+
+
+def read(text, chunk_size):
+    return list(DumpReader(io.StringIO(text), chunk_size).iter_cities())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 20])
+def test_reader_matches_json(dump, chunk_size):
+    text = json.dumps(dump, ensure_ascii=False, indent=2)
+    assert read(text, chunk_size) == list(dump.items())
+    wrapped = json.dumps({"data": dump}, ensure_ascii=False)
+    assert read(wrapped, chunk_size) == list(dump.items())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 5, 1 << 20])
+def test_reader_edge_cases(chunk_size):
+    assert read("{}", chunk_size) == []
+    assert read(" { } ", chunk_size) == []
+    assert read('{"data": {}}', chunk_size) == []
+    # values that aren't lists of towers are skipped, numbers may span chunks
+    text = '{"meta": 12345.678, "A": [], "B": [{"height": 123456789}], "C": "x", "D": [1.5e3]}'
+    assert read(text, chunk_size) == [("A", []), ("B", [{"height": 123456789}]), ("D", [1.5e3])]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 1 << 20])
+def test_reader_wrapped(dump, chunk_size):
+    # members other than "data" aren't cities, even if they're lists
+    text = json.dumps({"meta": [1, 2], "data": {"Vienna": dump["Vienna"]}, "errors": ["x"]})
+    assert read(text, chunk_size) == [("Vienna", dump["Vienna"])]
+    text = json.dumps({"version": 2, "data": {"Vienna": dump["Vienna"]}})
+    assert read(text, chunk_size) == [("Vienna", dump["Vienna"])]
+    # too much for anything but cities to come before "data"
+    text = '{"A": [1, 2, 3], "B": [4, 5, 6], "data": {"C": [7]}}'
+    assert list(DumpReader(io.StringIO(text), chunk_size, max_readahead=20).iter_cities()) == [
+        ("C", [7])]
+    with pytest.raises(ValueError, match="comes after cities"):
+        list(DumpReader(io.StringIO(text), chunk_size, max_readahead=10).iter_cities())
+
+
+@pytest.mark.parametrize("text", ['[]', '{"A": [] "B": []}', '{"A": [}', '{"A": [1, 2'])
+def test_reader_malformed(text):
+    with pytest.raises(ValueError):
+        read(text, 2)
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.read_chars = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.read_chars += len(chunk)
+        return chunk
+
+
+@pytest.mark.parametrize("corrupt", ['[1, 2, x' + ", 3" * 100000 + "]}",
+                                     '[1, 2, "x' + ", 3" * 100000 + "]}",
+                                     "1" * 300000 + "}"])
+def test_reader_stops_on_malformed_value(corrupt):
+    valid = '{"A": [' + ", ".join(["1"] * 100) + "], "
+    f = CountingReader(valid + '"B": ' + corrupt)
+    reader = DumpReader(f, chunk_size=64, max_readahead=256)
+    with pytest.raises(ValueError, match=f"offset {len(valid) + 5}"):
+        list(reader.iter_cities())
+    # no further than needed to tell the value's malformed
+    assert f.read_chars < len(valid) + 2 * (300 + 256) + 64
+
+
+def test_ndjson(dump):
+    lines = [json.dumps({"timestamp": "2019-Jan-20 16:05:16", "towers": dump["Vienna"]}), "",
+             json.dumps({"timestamp": "2019-Jan-20 16:05:16", "towers": []}),
+             json.dumps({"Bratislava": dump["Bratislava"], "meta": 1, "Dubai": dump["Dubai"]})]
+    assert list(iter_ndjson(io.StringIO("\n".join(lines)))) == [
+        ("Vienna", dump["Vienna"]), ("Bratislava", dump["Bratislava"]), ("Dubai", dump["Dubai"])]
+
+
+def test_iter_dump_guesses_format(tmp_path, dump):
+    path = tmp_path / "dump.ndjson"
+    path.write_text("\n".join(json.dumps({city: towers}) for city, towers in dump.items()),
+                    encoding="utf-8")
+    assert list(iter_dump(str(path))) == list(dump.items())
+    path = tmp_path / "dump.json"
+    path.write_text(json.dumps(dump), encoding="utf-8")
+    assert list(iter_dump(str(path), chunk_size=100)) == list(dump.items())
+
+
+@pytest.mark.parametrize("kind", ["json", "sqlite", "compact"])
+def test_ingest_roundtrip(tmp_path, dump, kind):
+    src = tmp_path / "dump.json"
+    src.write_text(json.dumps({**dump, "Atlantis": []}, ensure_ascii=False), encoding="utf-8")
+    if kind == "json":
+        (tmp_path / "json").mkdir()
+        store = JsonStore(str(tmp_path / "json"))
+    elif kind == "sqlite":
+        store = SqliteStore(str(tmp_path / "towers.db"))
+    else:
+        store = CompactStore(str(tmp_path / "towers.compact"))
+
+    assert ingest(str(src), store, chunk_size=4096) == len(dump) + 1
+    for city, towers in dump.items():
+        assert store.read_city(city)["towers"] == towers
+    # cities without towers are only kept in stores of a file per city
+    if kind == "json":
+        assert store.read_city("Atlantis")["towers"] == []
+    else:
+        with pytest.raises(InvalidCityError):
+            store.read_city("Atlantis")
@@ -0,0 +1,72 @@
+"""
+
+    tests.test_manifest
+    ~~~~~~~~~~~~~~~~~~~
+    Resuming scrapes from a manifest
+
+"""
+
+import json
+
+import pytest
+
+from scraperscrape.manifest import Manifest, storekey
+from scraperscrape.scraper import Scraper
+from scraperscrape.standin import StandIn
+from scraperscrape.store import JsonStore
+
+
+@pytest.fixture(scope="module")
+def standin():
+    with StandIn(port=0, latency=0, jitter=0, error_rate=0, seed=0) as standin:
+        yield standin
+
+
+def scrape(standin, store, manifest, start=1, end=4):
+    scraper = Scraper(rate=None, url=standin.url, cache=False, transport="live")
+    scraper.scrape_allcities(start, end, store=store, ttl=24, manifest=manifest)
+
+
+def test_records_are_kept_per_store(tmp_path):
+    first, second = JsonStore(str(tmp_path / "first")), JsonStore(str(tmp_path / "second"))
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    manifest.record(first, "Vienna", "abc")
+    assert manifest.isfresh(first, "Vienna", 24)
+    assert not manifest.isfresh(second, "Vienna", 24)
+    assert not manifest.ischanged(first, "Vienna", "abc")
+    assert manifest.ischanged(second, "Vienna", "abc")
+
+
+def test_saves_are_batched(tmp_path):
+    store, path = JsonStore(str(tmp_path)), tmp_path / "manifest.json"
+    manifest = Manifest(str(path), save_every=3)
+    manifest.record(store, "Vienna", "abc")
+    manifest.record(store, "Bratislava", "abc")
+    assert not path.exists()
+    manifest.record(store, "Istanbul", "abc")
+    assert len(json.loads(path.read_text())[storekey(store)]) == 3
+    manifest.record(store, "Dubai", "abc")
+    assert len(Manifest(str(path)).entries[storekey(store)]) == 3
+    manifest.save()
+    assert len(Manifest(str(path)).entries[storekey(store)]) == 4
+
+
+def test_scrape_resumes_per_store(tmp_path, standin):
+    first, second = tmp_path / "first", tmp_path / "second"
+    first.mkdir()
+    second.mkdir()
+    path = str(tmp_path / "manifest.json")
+
+    scrape(standin, JsonStore(str(first)), Manifest(path, save_every=100))
+    scraped = sorted(p.name for p in first.iterdir())
+    assert scraped
+    # saved when the run ended, even though fewer cities were scraped than 'save_every'
+    assert len(Manifest(path).entries[storekey(JsonStore(str(first)))]) >= len(scraped)
+
+    requests = standin.stats["requests"]
+    scrape(standin, JsonStore(str(first)), Manifest(path))
+    assert standin.stats["requests"] == requests  # all fresh
+
+    scrape(standin, JsonStore(str(second)), Manifest(path))
+    assert standin.stats["requests"] > requests
+    assert sorted(p.name for p in second.iterdir()) == scraped
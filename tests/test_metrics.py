@@ -0,0 +1,78 @@
+"""
+
+    tests.test_metrics
+    ~~~~~~~~~~~~~~~~~~
+    Metrics recorded only when enabled, and profiles dumped only when asked for
+
+"""
+
+import json
+
+import pytest
+
+import main
+from scraperscrape.metrics import METRICS, Metrics
+
+
+def record(metrics):
+    with metrics.timer("load"):
+        pass
+    metrics.addtime("parse", 0.5)
+    metrics.count("files")
+    metrics.count("files", 2)
+    metrics.observe("towers", 12)
+    chunks = metrics.timed_iter("download", iter(["a", "b"]))
+    assert list(chunks) == ["a", "b"]
+    return chunks
+
+
+def test_disabled_records_nothing():
+    metrics = Metrics(enabled=False)
+    chunks = record(metrics)
+    assert not hasattr(chunks, "waited")  # passed through as it is
+    assert metrics.todict() == {"timers": {}, "counters": {}, "histograms": {}}
+
+
+def test_enabled_records_everything():
+    metrics = Metrics(enabled=True)
+    record(metrics)
+    recorded = metrics.todict()
+    assert sorted(recorded["timers"]) == ["download", "load", "parse"]
+    assert recorded["timers"]["parse"]["sum"] == 0.5
+    assert recorded["counters"] == {"files": 3}
+    assert recorded["histograms"]["towers"]["max"] == 12
+    metrics.reset()
+    assert metrics.todict() == {"timers": {}, "counters": {}, "histograms": {}}
+
+
+@pytest.fixture
+def script(monkeypatch, tmp_path):
+    """The script with its run standing in for scraping, and its outputs written to tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main, "main", lambda: METRICS.count("main.runs"))
+    monkeypatch.setattr(METRICS, "enabled", False)
+    yield main
+    METRICS.reset()
+
+
+def test_run_without_switches(script, tmp_path, capsys):
+    script.run([])
+    assert list(tmp_path.iterdir()) == []
+    assert capsys.readouterr().out == ""
+    assert METRICS.todict()["counters"] == {}
+
+
+def test_run_profiled(script, tmp_path, capsys):
+    script.run(["--profile"])
+    assert [path.name for path in tmp_path.iterdir()] == [main.PROFILE_PATH]
+    assert f"Profile written to: {main.PROFILE_PATH}" in capsys.readouterr().out
+    script.run(["--profile", str(tmp_path / "other.prof")])
+    assert (tmp_path / "other.prof").stat().st_size > 0
+
+
+def test_run_with_metrics(script, tmp_path):
+    path = tmp_path / "metrics.json"
+    script.run(["--metrics", str(path)])
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f)["counters"] == {"main.runs": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["metrics.json"]  # and no profile
@@ -0,0 +1,122 @@
+"""
+
+    tests.test_query
+    ~~~~~~~~~~~~~~~~
+    Indexed top-N queries against brute-force sorts of all towers and cities
+
+"""
+
+import pytest
+
+from scraperscrape.errors import InvalidCountryError, InvalidRegionError, InvalidStatusError
+from scraperscrape.query import Dataset, parse_statuses
+from scraperscrape.scraper import (Tower, clearcache, getcities, merge_statustiers, mergemetros,
+                                   rate_tiers)
+
+FILTERS = [
+    {},
+    {"status": "UC"},
+    {"status": ["Completed", "STO"], "region": "Asia"},
+    {"region": ["Europe", "Middle East"], "function": "hotel"},
+    {"country": "United States", "function": ["office", "residential"]},
+    {"status": "UCT", "country": ["China", "Japan"]},
+]
+
+
+@pytest.fixture(scope="module")
+def cities():
+    clearcache()
+    return getcities(merge_subcities=False)
+
+
+@pytest.fixture(scope="module")
+def dataset(cities):
+    return Dataset(cities)
+
+
+def ident(tower):
+    return id(tower.table), tower.row
+
+
+def brute_towers(cities, by, status=None, region=None, country=None, function=None):
+    statuses = set(parse_statuses(status))
+    regions = {region} if isinstance(region, str) else set(region or ())
+    countries = {country} if isinstance(country, str) else set(country or ())
+    functions = {function} if isinstance(function, str) else set(function or ())
+    towers = []
+    for city in cities:
+        if ((regions and city.region not in regions)
+                or (countries and city.country not in countries)):
+            continue
+        for row in range(len(city.table)):
+            tower = Tower.fromrow(city.table, row)
+            value = getattr(tower, by)
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if statuses and tower.status not in statuses:
+                continue
+            if functions and (not tower.functions
+                              or functions.isdisjoint(tower.functions.split(" / "))):
+                continue
+            towers.append(tower)
+    return sorted(towers, key=lambda tower: getattr(tower, by), reverse=True)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+@pytest.mark.parametrize("by", ["height", "floors", "completed", "start"])
+def test_top_towers(cities, dataset, by, filters):
+    expected = brute_towers(cities, by, **filters)
+    assert [ident(t) for t in dataset.top_towers(by=by, **filters)] == [ident(t) for t in expected]
+    assert [ident(t) for t in dataset.top_towers(25, by=by, **filters)] == [
+        ident(t) for t in expected[:25]]
+    ascending = [getattr(t, by) for t in dataset.top_towers(25, by=by, ascending=True, **filters)]
+    assert ascending == [getattr(t, by) for t in reversed(expected)][:25]
+
+
+@pytest.mark.parametrize("filters", FILTERS[:3])
+def test_top_towers_by_callable(cities, dataset, filters):
+    key = lambda tower: (tower.floors if isinstance(tower.floors, int) else 0, tower.name)
+    expected = brute_towers(cities, "height", **filters)
+    found = list(dataset.top_towers(10, by=key, **filters))
+    assert [key(t) for t in found] == sorted(map(key, expected), reverse=True)[:10]
+
+
+def brute_cities(cities, by, status=None, region=None, country=None):
+    statuses = parse_statuses(status)
+    regions = {region} if isinstance(region, str) else set(region or ())
+    countries = {country} if isinstance(country, str) else set(country or ())
+    histogram = lambda city: merge_statustiers(city.statustiers, *statuses)
+    key = {"rating": lambda city: rate_tiers(histogram(city)),
+           "towers": lambda city: sum(histogram(city))}[by]
+    selected = [city for city in mergemetros(cities)
+                if (not regions or city.region in regions)
+                and (not countries or city.country in countries)]
+    return [(city.name, key(city)) for city in sorted(selected, key=key, reverse=True)], key
+
+
+@pytest.mark.parametrize("filters", [f for f in FILTERS if "function" not in f])
+@pytest.mark.parametrize("by", ["rating", "towers"])
+def test_top_cities(cities, dataset, by, filters):
+    expected, key = brute_cities(cities, by, **filters)
+    assert [(c.name, key(c)) for c in dataset.top_cities(by=by, **filters)] == expected
+    assert [(c.name, key(c)) for c in dataset.top_cities(10, by=by, **filters)] == expected[:10]
+    ascending = [key(c) for c in dataset.top_cities(10, by=by, ascending=True, **filters)]
+    assert ascending == sorted(value for _, value in expected)[:10]
+
+
+def test_top_cities_match_getcities(cities, dataset):
+    # cities tied on rating may come in another order
+    ranked, metros = list(dataset.top_cities()), getcities()
+    assert [c.rating for c in ranked] == [c.rating for c in metros]
+    assert sorted(c.name for c in ranked) == sorted(c.name for c in metros)
+
+
+def test_invalid_filters(dataset):
+    with pytest.raises(InvalidStatusError):
+        list(dataset.top_towers(status="Demolished"))
+    with pytest.raises(InvalidRegionError):
+        list(dataset.top_towers(region="Atlantis"))
+    with pytest.raises(InvalidCountryError):
+        list(dataset.top_cities(country="Atlantis"))
+    with pytest.raises(ValueError):
+        list(dataset.top_towers(by="rank"))
@@ -0,0 +1,50 @@
+"""
+
+    tests.test_replay
+    ~~~~~~~~~~~~~~~~~
+    Cities scraped from replayed fixtures against ones scraped while recording them
+
+"""
+
+import pytest
+import requests
+
+from scraperscrape.replay import Fixtures, ReplayAdapter, gettransport
+from scraperscrape.scraper import City, Scraper
+from scraperscrape.standin import StandIn
+
+
+@pytest.fixture(scope="module")
+def standin():
+    with StandIn(port=0, latency=0, jitter=0, error_rate=0, seed=0) as standin:
+        yield standin
+
+
+def scraper(standin, transport):
+    return Scraper(rate=None, url=standin.url, cache=False, transport=transport)
+
+
+def test_record_and_replay(tmp_path, standin, capsys):
+    fixtures = Fixtures(str(tmp_path))
+    recorded = list(scraper(standin, gettransport("record", fixtures))._scrape_cities(0, 4))
+    assert len(recorded) == 4 and any(towers for _, _, towers in recorded)
+
+    requests_made = standin.stats["requests"]
+    replayer = scraper(standin, ReplayAdapter(fixtures))
+    replayed = list(replayer._scrape_cities(0, 4))
+    assert standin.stats["requests"] == requests_made  # nothing's been sent
+    assert replayed == recorded
+    for (_, city, towers), (_, _, replayed_towers) in zip(recorded, replayed):
+        if towers:
+            data = {"timestamp": "2019-Jan-20 16:05:16", "towers": towers}
+            original, parsed = City(data), City({**data, "towers": replayed_towers})
+            assert (parsed.name, parsed.rating, parsed.statustiers) == (
+                original.name, original.rating, original.statustiers), city
+
+    # a city that hasn't been recorded fails to be scraped (and is reported as such)
+    missing = [city for city in Scraper.CITYCODE_MAP if city != "All"][4]
+    with pytest.raises(requests.ConnectionError, match="No response recorded"):
+        replayer.scrape_city(missing)
+    capsys.readouterr()
+    assert list(replayer._scrape_cities(0, 5)) == recorded
+    assert f"Failed to scrape '{missing}'" in capsys.readouterr().out
@@ -0,0 +1,105 @@
+"""
+
+    tests.test_schema
+    ~~~~~~~~~~~~~~~~~
+    Inferring schema of towers data and detecting its drift
+
+"""
+
+import json
+import shutil
+
+from scraperscrape.schema import (check_columns, detect_drift, diff_schemas, infer_citydata,
+                                  infer_schema, merge_schemas, null_rate)
+from scraperscrape.store import JsonStore, citypath
+
+EARLY, LATE = "2019-Jan-20 16:05:16", "2019-Feb-03 09:00:00"
+
+
+def citydata(city, towers, stamp=EARLY):
+    return {"timestamp": stamp, "towers": [{"city": city, **tower} for tower in towers]}
+
+
+def test_infer_citydata():
+    schema = infer_citydata(citydata("Vienna", [
+        {"height": 220, "floors": 60, "name": "DC Tower I"},
+        {"height": 202.5, "floors": "-", "name": ""},
+        {"height": None},
+    ]))
+    props = schema["properties"]
+    assert schema["towers"] == 3
+    assert props["height"] == {"count": 3, "nulls": 1, "types": {"int": 1, "float": 1},
+                               "first": [EARLY, "Vienna"], "last": [EARLY, "Vienna"]}
+    assert (props["floors"]["count"], props["floors"]["nulls"]) == (2, 1)
+    assert props["name"]["types"] == {"str": 1}
+    assert null_rate(schema, "floors") == 2 / 3
+    assert null_rate(schema, "image") == 1.0
+
+
+def test_infer_city_without_towers():
+    assert infer_citydata({"timestamp": EARLY, "towers": []}) == {"towers": 0, "properties": {}}
+
+
+def test_merge_schemas():
+    vienna = citydata("Vienna", [{"height": 220}, {"height": "-"}], LATE)
+    dubai = citydata("Dubai", [{"height": 828.0, "image": "burj.jpg"}], EARLY)
+    merged = merge_schemas([infer_citydata(vienna), infer_citydata(dubai)])
+    height = merged["properties"]["height"]
+    assert merged["towers"] == 3
+    assert (height["count"], height["nulls"], height["types"]) == (3, 1, {"int": 1, "float": 1})
+    assert (height["first"], height["last"]) == ([EARLY, "Dubai"], [LATE, "Vienna"])
+    assert merged["properties"]["image"]["count"] == 1
+    assert merge_schemas([]) == {"towers": 0, "properties": {}}
+
+
+def test_diff_and_check():
+    old = infer_citydata(citydata("Vienna", [{"height": 220, "floors": 60}]))
+    new = infer_citydata(citydata("Vienna", [{"height": "220 m", "rank": 1}]))
+    assert diff_schemas(old, new) == {"added": ["rank"], "removed": ["floors"],
+                                      "retyped": {"height": [["int"], ["str"]]}}
+    assert diff_schemas(old, old) == {"added": [], "removed": [], "retyped": {}}
+    checked = check_columns(new, [("height", "NUMERIC"), ("city", "TEXT"), ("url", "TEXT")])
+    assert checked == {"unstored": ["rank"], "unseen": ["url"], "mistyped": {"height": ["str"]}}
+
+
+def test_stored_data_fits_columns():
+    assert check_columns(infer_schema(JsonStore())) == {"unstored": [], "unseen": [],
+                                                         "mistyped": {}}
+
+
+def test_infer_schema_matches_single_pass(tmp_path):
+    source = JsonStore()
+    for city in ["Vienna", "Bratislava", "Dubai"]:
+        shutil.copy(citypath(city, source.path), str(tmp_path))
+    store = JsonStore(str(tmp_path))
+    expected = merge_schemas(infer_citydata(data) for data in store.iter_citydata())
+    assert infer_schema(store, workers=1) == expected
+    assert infer_schema(store, workers=1) == expected  # from cache
+
+    # a changed file gets inferred anew
+    path = citypath("Vienna", store.path)
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    data["towers"] = data["towers"][:5]
+    with open(path, mode="w", encoding="utf-8") as f:
+        json.dump(data, f)
+    assert infer_schema(store, workers=1) == merge_schemas(
+        infer_citydata(data) for data in store.iter_citydata())
+
+
+def test_drift_is_detected_per_store(tmp_path):
+    source = JsonStore()
+    stores = []
+    for name, cities in [("first", ["Vienna", "Dubai"]), ("second", ["Bratislava"])]:
+        (tmp_path / name).mkdir()
+        for city in cities:
+            shutil.copy(citypath(city, source.path), str(tmp_path / name))
+        stores.append(JsonStore(str(tmp_path / name)))
+    first, second = stores
+
+    assert detect_drift(first, workers=1)["snapshot"] is None
+    assert detect_drift(second, workers=1)["snapshot"] is None
+    # compared with the first store's own schema rather than the one inferred last
+    unchanged = {"added": [], "removed": [], "retyped": {}}
+    assert detect_drift(first, workers=1)["snapshot"] == unchanged
+    assert detect_drift(second, workers=1)["snapshot"] == unchanged
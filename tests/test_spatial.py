@@ -0,0 +1,128 @@
+"""
+
+    tests.test_spatial
+    ~~~~~~~~~~~~~~~~~~
+    Spatial queries against brute-force scans of all towers
+
+"""
+
+import random
+
+import pytest
+
+from scraperscrape.scraper import City, clearcache, getcities
+from scraperscrape.spatial import SpatialIndex, haversine
+from scraperscrape.store import JsonStore
+
+
+def ident(tower):
+    return id(tower.table), tower.row
+
+
+def located(index):
+    """All towers indexed with their coordinates"""
+    return [(index.tower(point), index.lats[point], index.lons[point])
+            for point in range(len(index))]
+
+
+def brute_radius(towers, lat, lon, km, min_height=None):
+    found = [(haversine(lat, lon, tlat, tlon), tower) for tower, tlat, tlon in towers
+             if min_height is None or (tower.height is not None and tower.height >= min_height)]
+    return sorted(((d, t) for d, t in found if d <= km), key=lambda pair: pair[0])
+
+
+def brute_bbox(towers, south, west, north, east):
+    if east < west:  # crossing the antimeridian
+        inlon = lambda lon: lon >= west or lon <= east
+    else:
+        inlon = lambda lon: west <= lon <= east
+    return {ident(tower) for tower, lat, lon in towers if south <= lat <= north and inlon(lon)}
+
+
+def assert_same(found, expected):
+    # equidistant towers may come in either order
+    assert sorted(ident(t) for _, t in found) == sorted(ident(t) for _, t in expected)
+    assert [d for d, _ in found] == pytest.approx([d for d, _ in expected])
+
+
+@pytest.fixture(scope="module")
+def index():
+    clearcache()
+    return SpatialIndex(getcities(merge_subcities=False))
+
+
+@pytest.fixture(scope="module")
+def towers(index):
+    return located(index)
+
+
+@pytest.fixture(scope="module")
+def points(towers):
+    rng = random.Random(0)
+    picked = rng.sample(towers, 15)
+    return [(lat + rng.uniform(-0.05, 0.05), lon + rng.uniform(-0.05, 0.05))
+            for _, lat, lon in picked] + [(0.0, 0.0), (89.0, 10.0), (-60.0, -179.9)]
+
+
+def test_unlocated_towers_are_left_out(index):
+    cities = getcities(merge_subcities=False)
+    count = sum(1 for city in cities for row in range(len(city.table))
+                if isinstance(city.table.get("latitude", row), (int, float))
+                and isinstance(city.table.get("longitude", row), (int, float))
+                and (city.table.get("latitude", row), city.table.get("longitude", row)) != (0, 0))
+    assert len(index) == count
+
+
+@pytest.mark.parametrize("km", [0.5, 5, 50, 2000])
+def test_radius(index, towers, points, km):
+    for lat, lon in points:
+        assert_same(index.radius(lat, lon, km), brute_radius(towers, lat, lon, km))
+    lat, lon = points[0]
+    assert_same(index.radius(lat, lon, km, min_height=200),
+                brute_radius(towers, lat, lon, km, min_height=200))
+
+
+@pytest.mark.parametrize("k", [1, 10, 100])
+def test_nearest(index, towers, points, k):
+    for lat, lon in points:
+        found = index.nearest(lat, lon, k)
+        expected = brute_radius(towers, lat, lon, float("inf"))[:k]
+        assert [d for d, _ in found] == pytest.approx([d for d, _ in expected])
+
+
+def test_bbox(index, towers, points):
+    for lat, lon in points:
+        for size in (0.1, 1, 10):
+            box = lat - size, lon - size, lat + size, lon + size
+            assert {ident(t) for t in index.bbox(*box)} == brute_bbox(towers, *box)
+    box = -50, 170, 10, -170  # across the antimeridian
+    assert {ident(t) for t in index.bbox(*box)} == brute_bbox(towers, *box)
+
+
+def test_bulk(index, points):
+    assert [[ident(t) for _, t in found] for found in index.radius_bulk(points, 10)] == [
+        [ident(t) for _, t in index.radius(lat, lon, 10)] for lat, lon in points]
+    dense = [(points[0][0] + dlat, points[0][1] + dlon) for dlat in (-0.03, 0, 0.03)
+             for dlon in (-0.03, 0, 0.03)]
+    for found, (lat, lon) in zip(index.radius_bulk(dense, 3), dense):
+        assert_same(found, index.radius(lat, lon, 3))
+    assert [[ident(t) for _, t in found] for found in index.nearest_bulk(points[:5], 3)] == [
+        [ident(t) for _, t in index.nearest(lat, lon, 3)] for lat, lon in points[:5]]
+
+
+def test_edges_of_the_map():
+    template = JsonStore().read_city("Vienna")["towers"][0]
+    spots = [(0.5, 179.99), (0.5, -179.99), (-0.5, 179.5), (89.99, 0), (89.99, 180), (-89.5, -90),
+             (45, -180), (45, 180)]
+    towers = [{**template, "id": i, "name": f"Tower {i}", "latitude": lat, "longitude": lon}
+              for i, (lat, lon) in enumerate(spots)]
+    index = SpatialIndex([City({"timestamp": "2019-Jan-20 16:05:16", "towers": towers})])
+    everything = located(index)
+    assert len(index) == len(spots)
+    for lat, lon in [(0.5, 180), (0, -179.5), (90, 0), (-90, 0), (45, 179.999)]:
+        for km in (1, 50, 200, 5000):
+            assert_same(index.radius(lat, lon, km), brute_radius(everything, lat, lon, km))
+        assert [d for d, _ in index.nearest(lat, lon, 3)] == pytest.approx(
+            [d for d, _ in brute_radius(everything, lat, lon, float("inf"))[:3]])
+    box = 0, 179, 1, -179
+    assert {ident(t) for t in index.bbox(*box)} == brute_bbox(everything, *box) != set()
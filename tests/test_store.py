@@ -0,0 +1,85 @@
+"""
+
+    tests.test_store
+    ~~~~~~~~~~~~~~~~
+    Round trips of scraped data through stores
+
+"""
+
+import pytest
+
+from scraperscrape.errors import InvalidCityError
+from scraperscrape.store import CompactStore, JsonStore, SqliteStore
+
+CITIES = ["Vienna", "Bratislava", "Istanbul", "Dubai"]
+
+
+@pytest.fixture(scope="module")
+def citydata():
+    source = JsonStore()
+    return [(city, source.read_city(city)) for city in CITIES]
+
+
+def test_json_roundtrip(tmp_path, citydata):
+    store = JsonStore(str(tmp_path))
+    for city, data in citydata:
+        store.write_city(city, data)
+    for city, data in citydata:
+        assert store.has_city(city)
+        assert store.read_city(city) == data
+    assert sorted(store.iter_citydata(), key=lambda d: d["towers"][0]["city"]) == sorted(
+        (data for _, data in citydata), key=lambda d: d["towers"][0]["city"])
+
+
+def test_sqlite_roundtrip(tmp_path, citydata):
+    store = SqliteStore(str(tmp_path / "towers.db"), batch_size=7)
+    name = store.write_snapshot(citydata)
+    assert store.snapshots() == [name]
+    assert store.version() == name
+    assert list(store.iter_citydata()) == [data for _, data in citydata]
+    for city, data in citydata:
+        assert store.read_city(city) == data
+    with pytest.raises(InvalidCityError):
+        store.read_city("Atlantis")
+
+
+def test_sqlite_snapshots_within_a_second(tmp_path, citydata):
+    store = SqliteStore(str(tmp_path / "towers.db"))
+    names = [store.write_snapshot(citydata[:1]), store.write_snapshot(citydata[1:2]),
+             store.write_snapshot(citydata[2:3])]
+    assert len(set(names)) == 3
+    assert store.snapshots() == names
+    assert list(store.iter_citydata()) == [citydata[2][1]]
+    assert list(SqliteStore(store.path, snapshot=names[0]).iter_citydata()) == [citydata[0][1]]
+
+
+def test_compact_roundtrip(tmp_path, citydata):
+    store = CompactStore(str(tmp_path / "towers.compact"))
+    assert store.write_snapshot(iter(citydata)) == len(citydata)
+    assert list(store.iter_citydata()) == [data for _, data in citydata]
+    for city, data in reversed(citydata):
+        assert store.has_city(city)
+        assert store.read_city(city) == data
+    assert not store.has_city("Atlantis")
+    with pytest.raises(InvalidCityError):
+        store.read_city("Atlantis")
+
+
+def test_compact_city_without_towers(tmp_path, citydata):
+    store = CompactStore(str(tmp_path / "towers.compact"))
+    empty = {"timestamp": "2019-Jan-20 16:05:16", "towers": []}
+    assert store.write_snapshot([("Atlantis", empty), *citydata[:1], ("Atlantis", empty)]) == 1
+    with pytest.raises(InvalidCityError):
+        store.read_city("Atlantis")
+    assert store.read_city(citydata[0][0]) == citydata[0][1]
+    assert list(store.iter_citydata()) == [citydata[0][1]]
+
+
+def test_compact_city_written_twice(tmp_path, citydata):
+    store = CompactStore(str(tmp_path / "towers.compact"))
+    store.write_snapshot(citydata[:1])
+    with pytest.raises(ValueError):
+        store.write_snapshot([*citydata[:2], citydata[0]])
+    # what was stored before is left intact
+    assert list(store.iter_citydata()) == [citydata[0][1]]
+    assert not (tmp_path / "towers.compact.tmp").exists()
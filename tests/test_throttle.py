@@ -0,0 +1,145 @@
+"""
+
+    tests.test_throttle
+    ~~~~~~~~~~~~~~~~~~~
+    Rate limits held by throttled requests (against a fake clock) and order of concurrent scrapes
+
+"""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from scraperscrape.errors import PageWrongFormatError
+from scraperscrape.scraper import Scraper
+from scraperscrape.throttle import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """A clock that only moves when slept on (or never, if frozen)"""
+
+    def __init__(self, frozen=False):
+        self.now = 0.0
+        self.frozen = frozen
+        self.lock = threading.Lock()
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if not self.frozen:
+            with self.lock:
+                self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr("scraperscrape.throttle.time",
+                        SimpleNamespace(monotonic=clock.monotonic, sleep=clock.sleep))
+    return clock
+
+
+def assert_limited(grants, rate, capacity):
+    """Check that no more than 'capacity' + 'rate' * T calls were let through in any T seconds"""
+    grants = sorted(grants)
+    for k, grant in enumerate(grants):
+        assert grant >= (k - capacity + 1) / rate - 1e-9, grants
+
+
+def test_bucket_spaces_calls(clock):
+    bucket = TokenBucket(rate=4, capacity=3)
+    grants = []
+    for _ in range(10):
+        bucket.acquire()
+        grants.append(clock.now)
+    assert grants == pytest.approx([0, 0, 0, 0.25, 0.5, 0.75, 1, 1.25, 1.5, 1.75])
+
+    # a pause refills the bucket, but no further than its capacity
+    clock.now += 10
+    start, grants = clock.now, []
+    for _ in range(5):
+        bucket.acquire()
+        grants.append(clock.now - start)
+    assert grants == pytest.approx([0, 0, 0, 0.25, 0.5])
+
+
+def test_concurrent_callers_queue_up(clock):
+    clock.frozen = True  # every caller asks at the same instant
+    limiter = RateLimiter(rate=5, capacity=2)
+    urls = ["http://first.example/{}".format(i) for i in range(12)] + [
+        "http://second.example/{}".format(i) for i in range(6)]
+    grants = {}
+    lock = threading.Lock()
+
+    def call(url):
+        delay = limiter.wait(url)
+        with lock:
+            grants.setdefault(url.split("/")[2], []).append(clock.now + delay)
+
+    threads = [threading.Thread(target=call, args=(url,)) for url in urls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # hosts are limited separately, so each gets its own burst
+    assert sorted(grants["first.example"]) == pytest.approx([0, 0] + [k / 5 for k in range(1, 11)])
+    assert sorted(grants["second.example"]) == pytest.approx([0, 0] + [k / 5 for k in range(1, 5)])
+    for host_grants in grants.values():
+        assert_limited(host_grants, 5, 2)
+
+
+def test_no_limit(clock):
+    limiter = RateLimiter(rate=None)
+    assert [limiter.wait("http://first.example/") for _ in range(100)] == [0.0] * 100
+    assert clock.now == 0
+
+
+@pytest.fixture
+def cities():
+    return [city for city in Scraper.CITYCODE_MAP if city != "All"][:13]
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scraped_in_order(clock, cities, workers):
+    clock.frozen = True
+    scraper = Scraper(workers=workers, rate=10, cache=False, transport="live")
+    done = {city: threading.Event() for city in cities}
+    finished = []
+    grants = []
+    lock = threading.Lock()
+
+    def scrape_city(city):
+        index = cities.index(city)
+        # each city but the last of 'workers' consecutive ones waits for the next one, so they
+        # finish in reverse order
+        if workers > 1 and index % workers != workers - 1 and index + 1 < len(cities):
+            assert done[cities[index + 1]].wait(5)
+        delay = scraper.fetcher.ratelimiter.wait(scraper.url)
+        with lock:
+            finished.append(city)
+            grants.append(clock.now + delay)
+        done[city].set()
+        if index == 2:
+            raise PageWrongFormatError(city)
+        if index == 5:
+            raise requests.ConnectionError(city)
+        return [{"city": city}]
+
+    def skip(city):
+        if city == cities[7]:
+            done[city].set()
+            return True
+        return False
+
+    scraper.scrape_city = scrape_city
+    results = list(scraper._scrape_cities(0, len(cities), skip=skip))
+    expected = [(i + 1, city, [] if i == 2 else None if i == 7 else [{"city": city}])
+                for i, city in enumerate(cities) if i != 5]  # failed to be fetched
+    assert results == expected
+    if workers > 1:
+        assert finished != [city for city in cities if city != cities[7]]
+    assert_limited(grants, 10, 1)
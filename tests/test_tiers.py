@@ -0,0 +1,92 @@
+"""
+
+    tests.test_tiers
+    ~~~~~~~~~~~~~~~~
+    Bisected tiers of heights against a chain of comparisons with each tier's boundaries
+
+"""
+
+import math
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from scraperscrape.constants import RATINGS_MATRIX, Tier
+from scraperscrape.scraper import (TIER_BOUNDARIES, TIERS, Tower, clearcache, count_statustiers,
+                                   count_tiers, get_tiers, getcities)
+
+
+def compared_tier(height):
+    """Tier of a height as it was got before bisecting"""
+    heightmap = {k: v[0] for k, v in RATINGS_MATRIX.items()}
+    if height >= heightmap[Tier.I] and height < heightmap[Tier.II]:
+        return Tier.I
+    elif height >= heightmap[Tier.II] and height < heightmap[Tier.III]:
+        return Tier.II
+    elif height >= heightmap[Tier.III] and height < heightmap[Tier.IV]:
+        return Tier.III
+    elif height >= heightmap[Tier.IV] and height < heightmap[Tier.V]:
+        return Tier.IV
+    elif height >= heightmap[Tier.V] and height < heightmap[Tier.VI]:
+        return Tier.V
+    elif height >= heightmap[Tier.VI]:
+        return Tier.VI
+    else:
+        raise ValueError("Unexpected height value (lesser than: {}) in parsed data".format(
+            int(heightmap[Tier.I])))
+
+
+def towers(heights):
+    return [SimpleNamespace(height=height) for height in heights]
+
+
+# each boundary, right below and right above it, and heights way past the last one
+HEIGHTS = sorted({height for boundary in TIER_BOUNDARIES for height in (
+    boundary, math.nextafter(boundary, math.inf), math.nextafter(boundary, -math.inf),
+    math.floor(boundary), math.ceil(boundary))} | {1000, 828.0, 1e6})
+
+
+def test_tiers_match_comparisons():
+    for height in HEIGHTS:
+        if height < TIER_BOUNDARIES[0]:
+            with pytest.raises(ValueError):
+                compared_tier(height)
+            with pytest.raises(ValueError):
+                get_tiers(towers([height]))
+        else:
+            assert get_tiers(towers([height])) == Counter([compared_tier(height)]), height
+    valid = [height for height in HEIGHTS if height >= TIER_BOUNDARIES[0]]
+    assert get_tiers(towers(valid)) == Counter(map(compared_tier, valid))
+
+
+def test_first_and_last_tiers():
+    first, last = TIER_BOUNDARIES[0], TIER_BOUNDARIES[-1]
+    assert count_tiers([first, math.nextafter(TIER_BOUNDARIES[1], -math.inf)]) == [2] + [0] * (
+        len(TIERS) - 1)
+    assert count_tiers([last, last * 10]) == [0] * (len(TIERS) - 1) + [2]
+    assert (TIERS[0], TIERS[-1]) == (compared_tier(first), compared_tier(last))
+    assert count_tiers([]) == [0] * len(TIERS)
+
+
+@pytest.mark.parametrize("height", [None, "-"])
+def test_towers_without_height(height):
+    # a height that isn't a number can't be compared, whether bisected or not
+    with pytest.raises(TypeError):
+        compared_tier(height)
+    with pytest.raises(TypeError):
+        get_tiers(towers([200, height]))
+    with pytest.raises(TypeError):
+        count_statustiers(["UC", "UC"], [200, height])
+
+
+def test_tiers_of_all_cities():
+    clearcache()
+    for city in getcities(merge_subcities=False):
+        heights = [Tower.fromrow(city.table, row).height for row in range(len(city.table))]
+        statuses = city.table.values("status")
+        assert get_tiers(towers(heights)) == Counter(map(compared_tier, heights)), city.name
+        for status, histogram in count_statustiers(statuses, heights).items():
+            expected = Counter(compared_tier(height) for height, towerstatus
+                               in zip(heights, statuses) if towerstatus == status)
+            assert histogram == [expected[tier] for tier in TIERS], city.name